@@ -0,0 +1,43 @@
+from typing import Dict
+from .delta_evaluator import TimetableProblem, DeltaEvaluator
+
+def _min_pairs(items: int, bins: int) -> int:
+    """Fewest same-bin pairs when spreading items over bins (pigeonhole)"""
+    if bins <= 0:
+        return items * (items - 1) // 2
+    per_bin, extra = divmod(items, bins)
+    return extra * (per_bin + 1) * per_bin // 2 + (bins - extra) * per_bin * (per_bin - 1) // 2
+
+def lower_bound(problem: TimetableProblem) -> Dict[str, float]:
+    """
+    Fast lower bound on every fitness component.
+
+    The fitness counts any two exams starting at the same time as a student
+    conflict, so the conflict graph is one clique over all courses, which
+    needs as many distinct start times as there are courses: at least
+    n - T student conflicts with T distinct times. Packing the exams into
+    the R x T (room, time) places leaves at least n - R*T room conflicts and
+    the pigeonhole number of same-room, same-time pairs as time conflicts.
+    The soft penalty can always reach zero, so its bound is trivial.
+    """
+    n_courses, n_times, n_rooms = problem.n_courses, problem.n_time_keys, problem.n_rooms
+    places = n_rooms * n_times
+
+    student_conflicts = max(0, n_courses - n_times)
+    room_conflicts = max(0, n_courses - places)
+    time_conflicts = _min_pairs(n_courses, places)
+    violations = student_conflicts + room_conflicts + time_conflicts
+    soft = 0.0
+
+    return {
+        'student_conflicts': student_conflicts,
+        'room_conflicts': room_conflicts,
+        'time_conflicts': time_conflicts,
+        'soft': soft,
+        'violations': violations,
+        'fitness': violations * DeltaEvaluator.HARD_WEIGHT + soft,
+    }
+
+def fitness_lower_bound(courses, rooms, time_slots) -> float:
+    """Lower bound on the fitness of any timetable of the given data"""
+    return lower_bound(TimetableProblem(courses, rooms, time_slots))['fitness']
@@ -0,0 +1,100 @@
+import math
+import time
+from typing import Dict
+
+class Deadline:
+    """
+    Wall-clock stopping condition shared by all optimizers.
+
+    Optimizers accept either an absolute ``deadline`` (a ``time.time()``
+    timestamp or another Deadline) or a relative ``time_budget`` in seconds,
+    check ``expired()`` at most once per generation or per batch of moves, and
+    return the best solution found so far together with a progress report.
+
+    A ``cancelled`` flag (a ``multiprocessing.Event`` set by the job worker)
+    makes the deadline expire at once, so cancelling a run costs the
+    optimizers nothing more than the check they already make.
+    """
+
+    def __init__(self, deadline: float = None, time_budget: float = None, cancelled=None):
+        self.started_at = time.time()
+        if deadline is None and time_budget is not None:
+            deadline = self.started_at + time_budget
+        self.deadline = deadline
+        self.cancelled = cancelled
+
+    @classmethod
+    def resolve(cls, deadline=None, time_budget: float = None) -> 'Deadline':
+        """Accept an existing Deadline, a timestamp or a time budget"""
+        if isinstance(deadline, Deadline):
+            return deadline
+        return cls(deadline=deadline, time_budget=time_budget)
+
+    def cancel_requested(self) -> bool:
+        """True once the run has been cancelled"""
+        return self.cancelled is not None and self.cancelled.is_set()
+
+    def expired(self) -> bool:
+        """True once the deadline has passed (never for an unbounded run) or the run was cancelled"""
+        return self.cancel_requested() or (self.deadline is not None and time.time() >= self.deadline)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline"""
+        if self.deadline is None:
+            return float('inf')
+        return max(0.0, self.deadline - time.time())
+
+    def elapsed(self) -> float:
+        """Seconds since the deadline was created"""
+        return time.time() - self.started_at
+
+    def split(self, fraction: float) -> 'Deadline':
+        """Deadline covering the given fraction of the remaining time"""
+        if self.deadline is None:
+            return Deadline(cancelled=self.cancelled)
+        return Deadline(time_budget=self.remaining() * fraction, cancelled=self.cancelled)
+
+    def progress(self, completed: int, planned: int, optimal: bool = False,
+                 fitness: float = None, lower_bound: float = None) -> Dict:
+        """
+        Report how far a run got before it stopped
+
+        With the best fitness and a lower bound the report includes the
+        optimality gap, and a closed gap counts as an optimal stop.
+        """
+        if fitness is not None and lower_bound is not None:
+            optimal = optimal or fitness <= lower_bound
+
+        if optimal:
+            stopped_by = 'optimal'
+        elif self.cancel_requested():
+            stopped_by = 'cancelled'
+        elif completed < planned and self.expired():
+            stopped_by = 'deadline'
+        else:
+            stopped_by = 'completed'
+
+        report = {
+            'iterations_completed': completed,
+            'iterations_planned': planned,
+            'elapsed_seconds': round(self.elapsed(), 3),
+            'stopped_by': stopped_by
+        }
+        if fitness is not None and lower_bound is not None:
+            report['best_fitness'] = fitness
+            report['lower_bound'] = lower_bound
+            report['gap'] = max(0.0, fitness - lower_bound)
+        return report
+
+def parse_time_budget(value, maximum: float) -> float:
+    """
+    Time budget of a request in seconds, capped at maximum; the maximum when
+    the request leaves it out. Raises ValueError unless it is a finite,
+    positive number (a NaN budget would never expire).
+    """
+    if value is None or value == '':
+        return float(maximum)
+    budget = float(value)
+    if not math.isfinite(budget) or budget <= 0:
+        raise ValueError(f'The time budget must be a positive number of seconds, not {value!r}.')
+    return min(budget, float(maximum))
@@ -0,0 +1,247 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from types import SimpleNamespace
+from typing import List, Dict, Tuple, Any
+from .delta_evaluator import TimetableProblem, DeltaEvaluator
+from .local_search import first_improvement_search
+from .exact import exact_repair, solver_available
+from .bounds import lower_bound
+from .portfolio import run_engine, snapshot
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+from .deadline import Deadline
+
+def partition_courses(courses, attributes: Tuple[str, ...] = ('program', 'department'),
+                      enrollments: Dict[Any, set] = None, min_shared_students: int = 1,
+                      max_blocks: int = 8, min_block_size: int = 5) -> List[Tuple[str, List[int]]]:
+    """
+    Split courses into weakly coupled blocks of course indexes.
+
+    With enrollment data (course id -> set of student ids) the blocks are the
+    connected components of the conflict graph, keeping only edges between
+    courses sharing at least min_shared_students students. Otherwise courses
+    are grouped by the first of the given attributes that is set. Blocks
+    smaller than min_block_size are pooled and the smallest blocks are merged
+    until at most max_blocks remain.
+    """
+    if enrollments:
+        parent = list(range(len(courses)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # Course indexes of every student: only courses sharing a student can share an edge
+        courses_of = {}
+        for i, course in enumerate(courses):
+            for student in enrollments.get(course.id, ()):
+                courses_of.setdefault(student, []).append(i)
+
+        if min_shared_students <= 1:
+            for members in courses_of.values():
+                for j in members[1:]:
+                    parent[find(members[0])] = find(j)
+        else:
+            shared = Counter(pair for members in courses_of.values() for pair in combinations(members, 2))
+            for (i, j), count in shared.items():
+                if count >= min_shared_students:
+                    parent[find(i)] = find(j)
+
+        groups = {}
+        for i in range(len(courses)):
+            groups.setdefault(find(i), []).append(i)
+        blocks = [(f"Component {n + 1}", members) for n, members in enumerate(groups.values())]
+    else:
+        groups = {}
+        for i, course in enumerate(courses):
+            label = next((getattr(course, name, None) for name in attributes if getattr(course, name, None)),
+                         'General')
+            groups.setdefault(label, []).append(i)
+        blocks = list(groups.items())
+
+    # Pool the small blocks, they are not worth a process of their own
+    small = [block for block in blocks if len(block[1]) < min_block_size]
+    blocks = [block for block in blocks if len(block[1]) >= min_block_size]
+    if small:
+        blocks.append(('Other', sorted(i for _, members in small for i in members)))
+
+    blocks.sort(key=lambda block: len(block[1]), reverse=True)
+    while len(blocks) > max(1, max_blocks):
+        (name1, members1), (name2, members2) = blocks.pop(), blocks.pop()
+        blocks.append((f"{name2} + {name1}", sorted(members1 + members2)))
+        blocks.sort(key=lambda block: len(block[1]), reverse=True)
+
+    return blocks
+
+def allocate_time_keys(problem: TimetableProblem, block_sizes: List[int]) -> List[List[int]]:
+    """
+    Share the distinct (day, start) times between blocks in proportion to
+    their course counts (largest remainder). Times are dealt session by
+    session across the days, so every block gets times spread over the
+    whole examination period.
+    """
+    first_slot = {}
+    for slot in range(problem.n_slots):
+        first_slot.setdefault(int(problem.slot_time_key[slot]), slot)
+
+    # Position of each time within its day, by start time
+    session = {}
+    by_day = {}
+    for key, slot in first_slot.items():
+        by_day.setdefault(int(problem.slot_day[slot]), []).append(key)
+    for keys in by_day.values():
+        for position, key in enumerate(sorted(keys, key=lambda key: problem.slot_starts[first_slot[key]])):
+            session[key] = position
+    order = sorted(first_slot, key=lambda key: (session[key], int(problem.slot_day[first_slot[key]])))
+
+    # Every block needs at least one time; the remaining times follow the course counts
+    total = sum(block_sizes)
+    shares = [problem.n_time_keys * size / total for size in block_sizes]
+    quotas = [max(1, int(share)) for share in shares]
+    by_remainder = sorted(range(len(block_sizes)), key=lambda b: shares[b] - int(shares[b]), reverse=True)
+    for b in by_remainder:
+        if sum(quotas) >= len(order):
+            break
+        quotas[b] += 1
+    while sum(quotas) > len(order):
+        largest = max(range(len(quotas)), key=lambda b: quotas[b])
+        quotas[largest] -= 1
+
+    allocation, start = [], 0
+    for quota in quotas:
+        allocation.append(order[start:start + quota])
+        start += quota
+    return allocation
+
+# Cancellation flag of a worker process (inherited, it cannot travel with the tasks)
+_cancelled = None
+
+def _init_worker(cancelled) -> None:
+    global _cancelled
+    _cancelled = cancelled
+
+def _solve_block(task: Tuple[str, List, List, List, Dict, float, Any], cancelled=None) -> Tuple[Dict, List[float]]:
+    """Solve one block with the chosen engine"""
+    engine, courses, rooms, time_slots, parameters, deadline, seed = task
+    clock = Deadline(deadline=deadline, cancelled=cancelled or _cancelled)
+    return run_engine(engine, courses, rooms, time_slots, parameters, deadline=clock, seed=seed)
+
+class DecompositionSolver:
+    """
+    Decomposition approach for examination timetabling optimization.
+
+    Courses are split into weakly coupled blocks (programs, departments or
+    components of the student conflict graph). Each block gets its own share
+    of the examination times and all rooms, so the blocks cannot clash with
+    each other and are solved independently, in parallel, with any engine.
+    The block timetables are then merged and a local search over the whole
+    problem repairs the remaining clashes and the day balance.
+    """
+
+    def __init__(self, courses, rooms, time_slots, constraints, enrollments: Dict[Any, set] = None,
+                 seed=None, callback=None):
+        self.labels = [SimpleNamespace(id=course.id, program=getattr(course, 'program', None),
+                                       department=getattr(course, 'department', None))
+                       for course in courses]
+        self.courses, self.rooms, self.time_slots = snapshot(courses, rooms, time_slots)
+        self.constraints = constraints
+        self.enrollments = enrollments
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
+        self.problem = TimetableProblem(self.courses, self.rooms, self.time_slots)
+        self.lower_bound = lower_bound(self.problem)['fitness']
+        self.best_solution = None
+        self.best_fitness = float('inf')
+
+    def optimize(self, engine: str = 'tabu', population_size: int = 50, generations: int = 100,
+                mutation_rate: float = 0.1, max_blocks: int = 8, workers: int = None,
+                repair_moves: int = 20000, exact_repair_variables: int = 0, deadline=None,
+                time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """
+        Solve the blocks in parallel, then merge and repair
+
+        Args:
+            engine: Engine used for every block
+            max_blocks: Maximum number of blocks
+            workers: Worker processes for the blocks (1 solves them in-process)
+            repair_moves: Maximum number of evaluated moves of the repair local search
+            exact_repair_variables: Size of the integer program re-solving the clashes left
+                                    between blocks first (0 disables it, needs pulp)
+        """
+        clock = Deadline.resolve(deadline, time_budget)
+        problem = self.problem
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+
+        blocks = partition_courses(self.labels, enrollments=self.enrollments,
+                                   max_blocks=min(max_blocks, problem.n_time_keys))
+        allocation = allocate_time_keys(problem, [len(members) for _, members in blocks])
+
+        # Blocks get most of the time, the repair pass the rest
+        solve_clock = clock.split(0.8)
+        parameters = {'population_size': population_size, 'generations': generations,
+                      'mutation_rate': mutation_rate}
+        tasks = []
+        streams = self.rng.spawn(len(blocks))
+        for (_, members), keys, stream in zip(blocks, allocation, streams):
+            keys = set(keys)
+            block_slots = [time_slot for slot, time_slot in enumerate(self.time_slots)
+                           if int(problem.slot_time_key[slot]) in keys]
+            tasks.append((engine, [self.courses[i] for i in members], self.rooms, block_slots,
+                          parameters, solve_clock.deadline, stream))
+
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker,
+                                     initargs=(clock.cancelled,)) as pool:
+                results = list(pool.map(_solve_block, tasks))
+        else:
+            results = [_solve_block(task, clock.cancelled) for task in tasks]
+
+        # Merge the block timetables into one solution of the whole problem
+        merged = {'assignments': [assignment for solution, _ in results for assignment in solution['assignments']]}
+        room_of, slot_of = problem.from_timetable(merged, self.rng)
+        evaluator = DeltaEvaluator(problem, room_of, slot_of)
+        merged_fitness = evaluator.fitness
+        fitness_history = [merged_fitness]
+        self.reporter.update(len(blocks), merged_fitness, violations=evaluator.violations, moves=0)
+
+        # Repair the clashes and day imbalance left between blocks
+        if merged_fitness > self.lower_bound and not clock.expired():
+            if exact_repair_variables and solver_available():
+                room_of, slot_of, _, _ = exact_repair(problem, room_of, slot_of, exact_repair_variables,
+                                                      deadline=clock, seed=self.rng)
+            room_of, slot_of, fitness, violations = first_improvement_search(
+                problem, room_of, slot_of, repair_moves, self.rng, deadline=clock)
+        else:
+            fitness, violations = merged_fitness, evaluator.violations
+        fitness_history.append(fitness)
+
+        self.reporter.update(len(blocks), fitness, violations=violations, moves=0, force=True)
+        self.best_fitness = fitness
+        self.best_solution = problem.to_timetable(room_of, slot_of, fitness, violations)
+        self.progress = clock.progress(sum(1 for solution, _ in results
+                                           if solution['progress']['stopped_by'] not in ('deadline', 'cancelled')),
+                                       len(blocks), fitness=self.best_fitness, lower_bound=self.lower_bound)
+        self.progress['merged_fitness'] = merged_fitness
+        self.progress['blocks'] = [{
+            'name': name,
+            'courses': len(members),
+            'time_slots': len(task[3]),
+            'fitness': solution['fitness'],
+            'constraint_violations': solution['constraint_violations']
+        } for (name, members), task, (solution, _) in zip(blocks, tasks, results)]
+        self.best_solution['progress'] = self.progress
+        return self.best_solution, fitness_history
+
+    def optimize_with_parameters(self, population_size: int = 50, generations: int = 100,
+                               mutation_rate: float = 0.1, temperature: float = 1000,
+                               cooling_rate: float = 0.95, deadline=None,
+                               time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """Optimize with parameters (compatibility with other algorithms)"""
+        return self.optimize(population_size=population_size, generations=generations,
+                             mutation_rate=mutation_rate, deadline=deadline, time_budget=time_budget)
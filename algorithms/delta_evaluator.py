@@ -0,0 +1,301 @@
+import numpy as np
+from typing import Dict, Tuple
+
+
+class TimetableProblem:
+    """
+    Index-based view of an examination timetabling instance.
+
+    Courses, rooms and time slots are mapped to dense integer indexes so that a
+    solution can be stored as two integer arrays (room and time slot per course)
+    instead of a list of assignment dictionaries. The object only holds plain
+    lists and arrays, so it can be shipped to worker processes.
+    """
+
+    def __init__(self, courses, rooms, time_slots):
+        self.course_ids = [course.id for course in courses]
+        self.course_names = [course.name for course in courses]
+        self.course_students = [course.students for course in courses]
+        self.course_durations = [course.duration for course in courses]
+
+        self.room_ids = [room.id for room in rooms]
+        self.room_names = [room.name for room in rooms]
+
+        self.slot_ids = [time_slot.id for time_slot in time_slots]
+        self.slot_days = [time_slot.day for time_slot in time_slots]
+        self.slot_starts = [str(time_slot.start_time) for time_slot in time_slots]
+        self.slot_ends = [str(time_slot.end_time) for time_slot in time_slots]
+
+        self.n_courses = len(self.course_ids)
+        self.n_rooms = len(self.room_ids)
+        self.n_slots = len(self.slot_ids)
+
+        self.course_index = {course_id: i for i, course_id in enumerate(self.course_ids)}
+        self.room_index = {room_id: i for i, room_id in enumerate(self.room_ids)}
+        self.slot_index = {slot_id: i for i, slot_id in enumerate(self.slot_ids)}
+
+        # Slots sharing a (day, start) clash with each other, exactly like the
+        # grouping used by the dictionary-based fitness functions
+        self.slot_time_key, self.n_time_keys = self._key_index(
+            zip(self.slot_days, self.slot_starts))
+        self.slot_end_key, self.n_end_keys = self._key_index(
+            zip(self.slot_days, self.slot_ends))
+        self.slot_span_key, self.n_span_keys = self._key_index(
+            zip(self.slot_days, self.slot_starts, self.slot_ends))
+        self.slot_day, self.n_days = self._key_index(self.slot_days)
+
+    @staticmethod
+    def _key_index(keys) -> Tuple[np.ndarray, int]:
+        """Map hashable keys to dense integer indexes"""
+        index = {}
+        mapped = [index.setdefault(key, len(index)) for key in keys]
+        return np.array(mapped, dtype=np.int64), len(index)
+
+    def random_solution(self, rng: np.random.Generator = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Assign each course to a random room and time slot"""
+        rng = np.random.default_rng(rng)
+        room_of = rng.integers(self.n_rooms, size=self.n_courses, dtype=np.int64)
+        slot_of = rng.integers(self.n_slots, size=self.n_courses, dtype=np.int64)
+        return room_of, slot_of
+
+    def from_timetable(self, timetable: Dict, rng: np.random.Generator = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert a dictionary timetable into room and slot index arrays (random for missing courses)"""
+        room_of, slot_of = self.random_solution(rng)
+        for assignment in timetable['assignments']:
+            course = self.course_index.get(assignment['course_id'])
+            room = self.room_index.get(assignment['room_id'])
+            slot = self.slot_index.get(assignment['time_slot_id'])
+            if course is None:
+                continue
+            if room is not None:
+                room_of[course] = room
+            if slot is not None:
+                slot_of[course] = slot
+        return room_of, slot_of
+
+    def to_timetable(self, room_of: np.ndarray, slot_of: np.ndarray,
+                     fitness: float, violations: int) -> Dict:
+        """Build the dictionary timetable used by the rest of the application"""
+        assignments = []
+        for course in range(self.n_courses):
+            room = int(room_of[course])
+            slot = int(slot_of[course])
+            assignments.append({
+                'course_id': self.course_ids[course],
+                'course_name': self.course_names[course],
+                'room_id': self.room_ids[room],
+                'room_name': self.room_names[room],
+                'time_slot_id': self.slot_ids[slot],
+                'day': self.slot_days[slot],
+                'start_time': self.slot_starts[slot],
+                'end_time': self.slot_ends[slot],
+                'students': self.course_students[course],
+                'duration': self.course_durations[course]
+            })
+
+        return {
+            'assignments': assignments,
+            'fitness': fitness,
+            'constraint_violations': violations
+        }
+
+
+class DeltaEvaluator:
+    """
+    Incremental fitness evaluation over an array-backed solution.
+
+    Keeps occupancy counters for every (time key), (room, time key),
+    (room, end key), (room, slot span) and day, so the fitness change of
+    moving one course is computed in O(1) (or O(rooms x slots) for a whole
+    neighbourhood at once) instead of re-scoring the full timetable. The
+    objective is identical to GeneticAlgorithm._calculate_fitness.
+    """
+
+    HARD_WEIGHT = 10000
+    TIME_DISTRIBUTION_WEIGHT = 0.2
+
+    def __init__(self, problem: TimetableProblem, room_of: np.ndarray, slot_of: np.ndarray):
+        self.problem = problem
+        self.reset(room_of, slot_of)
+
+    def reset(self, room_of: np.ndarray, slot_of: np.ndarray):
+        """Rebuild all counters for a new solution"""
+        p = self.problem
+        self.room_of = np.array(room_of, dtype=np.int64)
+        self.slot_of = np.array(slot_of, dtype=np.int64)
+
+        time_keys = p.slot_time_key[self.slot_of]
+        end_keys = p.slot_end_key[self.slot_of]
+        span_keys = p.slot_span_key[self.slot_of]
+
+        self.time_count = np.bincount(time_keys, minlength=p.n_time_keys)
+        self.room_time_count = np.zeros((p.n_rooms, p.n_time_keys), dtype=np.int64)
+        self.room_end_count = np.zeros((p.n_rooms, p.n_end_keys), dtype=np.int64)
+        self.room_span_count = np.zeros((p.n_rooms, p.n_span_keys), dtype=np.int64)
+        np.add.at(self.room_time_count, (self.room_of, time_keys), 1)
+        np.add.at(self.room_end_count, (self.room_of, end_keys), 1)
+        np.add.at(self.room_span_count, (self.room_of, span_keys), 1)
+        self.day_count = np.bincount(p.slot_day[self.slot_of], minlength=p.n_days)
+
+        self._recount()
+
+    def _recount(self):
+        """Recompute the aggregated violation counts from the counters"""
+        n = self.problem.n_courses
+        self.student_conflicts = n - int(np.count_nonzero(self.time_count))
+        self.room_conflicts = n - int(np.count_nonzero(self.room_time_count))
+        self.time_conflicts = (self._pairs(self.room_time_count) + self._pairs(self.room_end_count)
+                               - self._pairs(self.room_span_count))
+        self.day_imbalance = self._day_imbalance(self.day_count)
+
+    @staticmethod
+    def _pairs(counts: np.ndarray) -> int:
+        """Number of unordered pairs sharing a counter cell"""
+        return int(np.sum(counts * (counts - 1) // 2))
+
+    def _day_imbalance(self, day_count: np.ndarray) -> int:
+        """Days whose exam count deviates from the mean by more than two"""
+        used = day_count[day_count > 0]
+        if len(used) == 0:
+            return 0
+        average = self.problem.n_courses / len(used)
+        return int(np.count_nonzero(np.abs(used - average) > 2))
+
+    @property
+    def violations(self) -> int:
+        """Hard constraint violations of the current solution"""
+        return self.student_conflicts + self.room_conflicts + self.time_conflicts
+
+    @property
+    def fitness(self) -> float:
+        """Fitness of the current solution (lower is better)"""
+        return self._score(self.violations, self.day_imbalance)
+
+    def _score(self, violations, day_imbalance):
+        return 0.0 + violations * self.HARD_WEIGHT + day_imbalance * self.TIME_DISTRIBUTION_WEIGHT
+
+    def move_delta(self, course: int, room: int, slot: int) -> float:
+        """Fitness change of moving one course to (room, slot)"""
+        p = self.problem
+        old_room = self.room_of[course]
+        old_slot = self.slot_of[course]
+        old_time, new_time = p.slot_time_key[old_slot], p.slot_time_key[slot]
+        old_end, new_end = p.slot_end_key[old_slot], p.slot_end_key[slot]
+        old_span, new_span = p.slot_span_key[old_slot], p.slot_span_key[slot]
+
+        same_time = old_time == new_time
+        same_room_time = same_time and old_room == room
+        same_room_end = old_end == new_end and old_room == room
+        same_room_span = old_span == new_span and old_room == room
+
+        # Counts at the destination once the course has left its old cell
+        time_after = self.time_count[new_time] - same_time
+        room_time_after = self.room_time_count[room, new_time] - same_room_time
+        room_end_after = self.room_end_count[room, new_end] - same_room_end
+        room_span_after = self.room_span_count[room, new_span] - same_room_span
+
+        hard = (int(self.time_count[old_time] == 1) - int(time_after == 0)
+                + int(self.room_time_count[old_room, old_time] == 1) - int(room_time_after == 0)
+                - (self.room_time_count[old_room, old_time] - 1) + room_time_after
+                - (self.room_end_count[old_room, old_end] - 1) + room_end_after
+                + (self.room_span_count[old_room, old_span] - 1) - room_span_after)
+
+        soft = 0
+        old_day, new_day = p.slot_day[old_slot], p.slot_day[slot]
+        if old_day != new_day:
+            day_count = self.day_count.copy()
+            day_count[old_day] -= 1
+            day_count[new_day] += 1
+            soft = self._day_imbalance(day_count) - self.day_imbalance
+
+        return float(hard * self.HARD_WEIGHT + soft * self.TIME_DISTRIBUTION_WEIGHT)
+
+    def batch_deltas(self, course: int) -> np.ndarray:
+        """Fitness change of every (room, slot) move of one course as a rooms x slots array"""
+        p = self.problem
+        old_room = self.room_of[course]
+        old_slot = self.slot_of[course]
+        old_time = p.slot_time_key[old_slot]
+        old_end = p.slot_end_key[old_slot]
+        old_span = p.slot_span_key[old_slot]
+
+        # Counters with the course removed from its current cell
+        time_count = self.time_count.copy()
+        time_count[old_time] -= 1
+        room_time = self.room_time_count[:, p.slot_time_key].copy()
+        room_time[old_room, p.slot_time_key == old_time] -= 1
+        room_end = self.room_end_count[:, p.slot_end_key].copy()
+        room_end[old_room, p.slot_end_key == old_end] -= 1
+        room_span = self.room_span_count[:, p.slot_span_key].copy()
+        room_span[old_room, p.slot_span_key == old_span] -= 1
+
+        removed = (int(self.time_count[old_time] == 1)
+                   + int(self.room_time_count[old_room, old_time] == 1)
+                   - (self.room_time_count[old_room, old_time] - 1)
+                   - (self.room_end_count[old_room, old_end] - 1)
+                   + (self.room_span_count[old_room, old_span] - 1))
+        added = (-(time_count[p.slot_time_key] == 0).astype(np.int64)[np.newaxis, :]
+                 - (room_time == 0) + room_time + room_end - room_span)
+        hard = removed + added
+
+        # Day balance only depends on the destination day
+        day_count = self.day_count.copy()
+        day_count[p.slot_day[old_slot]] -= 1
+        day_imbalance = np.array([
+            self._day_imbalance(day_count + np.eye(p.n_days, dtype=np.int64)[day])
+            for day in range(p.n_days)
+        ])
+        soft = day_imbalance[p.slot_day] - self.day_imbalance
+
+        return (hard * self.HARD_WEIGHT + soft[np.newaxis, :] * self.TIME_DISTRIBUTION_WEIGHT).astype(float)
+
+    def apply_move(self, course: int, room: int, slot: int):
+        """Move one course to (room, slot) and update all counters"""
+        self._update(course, -1)
+        self.room_of[course] = room
+        self.slot_of[course] = slot
+        self._update(course, 1)
+        self.day_imbalance = self._day_imbalance(self.day_count)
+
+    def _update(self, course: int, sign: int):
+        """Remove (sign=-1) or add (sign=1) one course to the counters"""
+        p = self.problem
+        room = self.room_of[course]
+        slot = self.slot_of[course]
+        time_key = p.slot_time_key[slot]
+        end_key = p.slot_end_key[slot]
+        span_key = p.slot_span_key[slot]
+
+        if sign < 0:
+            self.student_conflicts += int(self.time_count[time_key] == 1)
+            self.room_conflicts += int(self.room_time_count[room, time_key] == 1)
+            self.time_conflicts -= int(self.room_time_count[room, time_key] - 1
+                                       + self.room_end_count[room, end_key] - 1
+                                       - (self.room_span_count[room, span_key] - 1))
+        else:
+            self.student_conflicts -= int(self.time_count[time_key] == 0)
+            self.room_conflicts -= int(self.room_time_count[room, time_key] == 0)
+            self.time_conflicts += int(self.room_time_count[room, time_key]
+                                       + self.room_end_count[room, end_key]
+                                       - self.room_span_count[room, span_key])
+
+        self.time_count[time_key] += sign
+        self.room_time_count[room, time_key] += sign
+        self.room_end_count[room, end_key] += sign
+        self.room_span_count[room, span_key] += sign
+        self.day_count[p.slot_day[slot]] += sign
+
+    def conflicting_courses(self) -> np.ndarray:
+        """Indexes of courses involved in at least one hard constraint violation"""
+        p = self.problem
+        clashing = (self.time_count[p.slot_time_key[self.slot_of]] > 1) | \
+                   (self.room_end_count[self.room_of, p.slot_end_key[self.slot_of]] > 1)
+        return np.flatnonzero(clashing)
+
+    def solution(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Copy of the current room and slot arrays"""
+        return self.room_of.copy(), self.slot_of.copy()
+
+    def to_timetable(self) -> Dict:
+        """Current solution in the dictionary timetable format"""
+        return self.problem.to_timetable(self.room_of, self.slot_of, self.fitness, self.violations)
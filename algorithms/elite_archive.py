@@ -0,0 +1,125 @@
+import json
+import hashlib
+import numpy as np
+from typing import List, Dict, Tuple, Any
+
+def problem_fingerprint(courses, rooms, time_slots) -> str:
+    """Stable hash of the data a timetable depends on (time slots by time, not id)"""
+    data = {
+        'courses': sorted((course.id, course.students, course.duration) for course in courses),
+        'rooms': sorted(room.id for room in rooms),
+        'time_slots': sorted(_slot_key(slot.day, slot.start_time, slot.end_time) for slot in time_slots),
+    }
+    return hashlib.sha256(json.dumps(data).encode()).hexdigest()
+
+def _slot_key(day, start_time, end_time) -> str:
+    return f"{day} {start_time}-{end_time}"
+
+def encode_solution(assignments: List[Dict], time_slots) -> Dict[str, List]:
+    """
+    Compact form of a timetable: parallel lists of course ids, room ids and
+    time slot keys. Slots are stored by day and time because slot ids do not
+    survive a refresh of the exam calendar.
+    """
+    slots = {slot.id: slot for slot in time_slots}
+    encoded = {'courses': [], 'rooms': [], 'slots': []}
+    for assignment in assignments:
+        slot = slots.get(assignment['time_slot_id'])
+        if slot is None:
+            continue
+        encoded['courses'].append(assignment['course_id'])
+        encoded['rooms'].append(assignment['room_id'])
+        encoded['slots'].append(_slot_key(slot.day, slot.start_time, slot.end_time))
+    return encoded
+
+def decode_solution(encoded: Dict[str, List], courses, rooms, time_slots,
+                    rng: np.random.Generator = None) -> Tuple[Dict[Any, Tuple[Any, Any]], float]:
+    """
+    Remap a compact solution onto the current courses, rooms and time slots.
+
+    Slots are matched by day and time, or else by the same session on the day
+    at the same position in the exam period. Courses, rooms or slots that
+    cannot be matched get a random assignment drawn from rng. Returns course id ->
+    (room id, time slot id) and the fraction of courses carried over intact.
+    """
+    rng = np.random.default_rng(rng)
+    room_ids = {room.id for room in rooms}
+    by_key = {_slot_key(slot.day, slot.start_time, slot.end_time): slot.id for slot in time_slots}
+
+    # Fall back to matching days by their position in the exam period
+    current_days = sorted({str(slot.day) for slot in time_slots})
+    archived_days = sorted({key.split(' ', 1)[0] for key in encoded['slots']})
+    day_map = dict(zip(archived_days, current_days))
+
+    archived = dict(zip(encoded['courses'], zip(encoded['rooms'], encoded['slots'])))
+    mapping = {}
+    intact = 0
+    for course in courses:
+        room_id, slot_id = None, None
+        if course.id in archived:
+            room_id, key = archived[course.id]
+            day, times = key.split(' ', 1)
+            slot_id = by_key.get(key) or by_key.get(f"{day_map.get(day)} {times}")
+            if room_id not in room_ids:
+                room_id = None
+
+        if room_id is not None and slot_id is not None:
+            intact += 1
+        mapping[course.id] = (room_id if room_id is not None else rooms[rng.integers(len(rooms))].id,
+                              slot_id if slot_id is not None else time_slots[rng.integers(len(time_slots))].id)
+
+    return mapping, intact / max(1, len(courses))
+
+def solution_distance(first: Dict[str, List], second: Dict[str, List]) -> float:
+    """Fraction of courses placed differently by two compact solutions"""
+    a = dict(zip(first['courses'], zip(first['rooms'], first['slots'])))
+    b = dict(zip(second['courses'], zip(second['rooms'], second['slots'])))
+    courses = set(a) | set(b)
+    if not courses:
+        return 0.0
+    return sum(1 for course in courses if a.get(course) != b.get(course)) / len(courses)
+
+class EliteArchive:
+    """
+    Bounded archive of the best, mutually different solutions of a problem.
+
+    A candidate closer than min_distance to an archived solution competes
+    only with that solution; a distinct candidate is added while there is
+    room and otherwise replaces the worst solution if it is better. This
+    keeps the archive from filling up with copies of one local optimum.
+    """
+
+    def __init__(self, entries: List[Dict] = None, capacity: int = 10, min_distance: float = 0.1):
+        self.entries = list(entries or [])
+        self.capacity = capacity
+        self.min_distance = min_distance
+
+    def offer(self, cost: float, solution: Dict[str, List]) -> Tuple[str, int]:
+        """
+        Decide what a candidate does to the archive (lower cost is better).
+
+        Returns ('add', None), ('replace', index of the replaced entry) or
+        (None, None) when the candidate is rejected; the entries are updated
+        accordingly.
+        """
+        candidate = {'cost': cost, 'solution': solution}
+        for index, entry in enumerate(self.entries):
+            if solution_distance(entry['solution'], solution) < self.min_distance:
+                if cost < entry['cost']:
+                    self.entries[index] = candidate
+                    return 'replace', index
+                return None, None
+
+        if len(self.entries) < self.capacity:
+            self.entries.append(candidate)
+            return 'add', None
+
+        worst = max(range(len(self.entries)), key=lambda i: self.entries[i]['cost'])
+        if cost < self.entries[worst]['cost']:
+            self.entries[worst] = candidate
+            return 'replace', worst
+        return None, None
+
+    def best(self, limit: int) -> List[Dict]:
+        """Archived entries, best first"""
+        return sorted(self.entries, key=lambda entry: entry['cost'])[:limit]
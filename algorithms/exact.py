@@ -0,0 +1,250 @@
+import time
+import numpy as np
+from typing import List, Dict, Tuple
+from .delta_evaluator import TimetableProblem, DeltaEvaluator
+from .bounds import lower_bound
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+from .deadline import Deadline
+
+def solver_available() -> bool:
+    """True when PuLP and its bundled CBC solver can be used"""
+    try:
+        import pulp
+    except ImportError:
+        return False
+    return pulp.PULP_CBC_CMD(msg=False).available()
+
+def _require_pulp():
+    try:
+        import pulp
+    except ImportError:
+        raise ImportError('Exact mode requires the pulp package. Please install it: pip install pulp')
+    return pulp
+
+def _variable(pulp, model, name: str, **kwargs):
+    """New model variable (PuLP 3 attaches variables to the model, PuLP 2 cannot)"""
+    if hasattr(model, 'add_variable'):
+        return model.add_variable(name, **kwargs)
+    return pulp.LpVariable(name, **kwargs)
+
+def solve_assignment(problem: TimetableProblem, free: List[int], room_of: np.ndarray, slot_of: np.ndarray,
+                     candidate_rooms: Dict[int, List[int]] = None,
+                     time_limit: float = 60) -> Tuple[np.ndarray, np.ndarray, str]:
+    """
+    Assign the free courses exactly with an integer program, keeping all
+    other courses where they are.
+
+    x[c, r, s] places free course c in room r and slot s. A binary per
+    (day, start) time and per (room, time) marks it as used, so student and
+    room conflicts are the courses beyond the used cells; time conflicts are
+    the same-room, same-end pairs, modelled by the tangents of m(m-1)/2
+    (exact when every start time of a day has one end time, as in the exam
+    calendar). Day balance assumes every day is used. The current placement
+    is passed to CBC as a warm start, so a timeout still returns at least
+    that incumbent. Returns the new arrays and the solver status.
+    """
+    pulp = _require_pulp()
+    free = [int(course) for course in free]
+    free_set = set(free)
+    fixed = [course for course in range(problem.n_courses) if course not in free_set]
+    if candidate_rooms is None:
+        candidate_rooms = {}
+
+    time_key, end_key, day = problem.slot_time_key, problem.slot_end_key, problem.slot_day
+    fixed_time = np.bincount(time_key[slot_of[fixed]], minlength=problem.n_time_keys)
+    fixed_room_time = np.zeros((problem.n_rooms, problem.n_time_keys), dtype=np.int64)
+    fixed_room_end = np.zeros((problem.n_rooms, problem.n_end_keys), dtype=np.int64)
+    np.add.at(fixed_room_time, (room_of[fixed], time_key[slot_of[fixed]]), 1)
+    np.add.at(fixed_room_end, (room_of[fixed], end_key[slot_of[fixed]]), 1)
+    fixed_day = np.bincount(day[slot_of[fixed]], minlength=problem.n_days)
+
+    model = pulp.LpProblem('exam_timetable', pulp.LpMinimize)
+    x, by_course = {}, {}
+    by_time, by_room_time, by_room_end, by_day = {}, {}, {}, {}
+    for course in free:
+        for room in candidate_rooms.get(course) or range(problem.n_rooms):
+            for slot in range(problem.n_slots):
+                var = _variable(pulp, model, f"x_{course}_{room}_{slot}", cat='Binary')
+                var.setInitialValue(int(room_of[course] == room and slot_of[course] == slot))
+                x[course, room, slot] = var
+                by_course.setdefault(course, []).append(var)
+                by_time.setdefault(int(time_key[slot]), []).append(var)
+                by_room_time.setdefault((room, int(time_key[slot])), []).append(var)
+                by_room_end.setdefault((room, int(end_key[slot])), []).append(var)
+                by_day.setdefault(int(day[slot]), []).append(var)
+
+    for course in free:
+        model += pulp.lpSum(by_course[course]) == 1
+
+    # Cells already used by a fixed course are used whatever the free courses do
+    used_times = []
+    for key, variables in by_time.items():
+        if fixed_time[key] == 0:
+            used = _variable(pulp, model, f"t_{key}", cat='Binary')
+            model += used <= pulp.lpSum(variables)
+            used_times.append(used)
+    used_rooms = []
+    for (room, key), variables in by_room_time.items():
+        if fixed_room_time[room, key] == 0:
+            used = _variable(pulp, model, f"r_{room}_{key}", cat='Binary')
+            model += used <= pulp.lpSum(variables)
+            used_rooms.append(used)
+
+    # Same-room, same-end pairs: m(m-1)/2 is convex, so its tangents are exact at integers
+    pairs = []
+    for (room, key), variables in by_room_end.items():
+        count = fixed_room_end[room, key] + pulp.lpSum(variables)
+        most = int(fixed_room_end[room, key]) + len(free)
+        pair = _variable(pulp, model, f"p_{room}_{key}", lowBound=0)
+        for j in range(1, most):
+            model += pair >= j * count - j * (j + 1) // 2
+        pairs.append(pair)
+
+    average = problem.n_courses / max(1, problem.n_days)
+    imbalanced = []
+    for key, variables in by_day.items():
+        count = fixed_day[key] + pulp.lpSum(variables)
+        unbalanced = _variable(pulp, model, f"d_{key}", cat='Binary')
+        model += count - average <= 2 + problem.n_courses * unbalanced
+        model += average - count <= 2 + problem.n_courses * unbalanced
+        imbalanced.append(unbalanced)
+
+    model += (DeltaEvaluator.HARD_WEIGHT * (pulp.lpSum(pairs) - pulp.lpSum(used_times) - pulp.lpSum(used_rooms))
+              + DeltaEvaluator.TIME_DISTRIBUTION_WEIGHT * pulp.lpSum(imbalanced))
+
+    started = time.time()
+    try:
+        model.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=max(1, int(time_limit)), warmStart=True))
+    except pulp.PulpSolverError:
+        # Some CBC builds crash reading the start solution of large models; solve cold instead
+        remaining = time_limit - (time.time() - started)
+        model.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=max(1, int(remaining))))
+
+    room_of, slot_of = room_of.copy(), slot_of.copy()
+    for (course, room, slot), var in x.items():
+        if var.varValue is not None and var.varValue > 0.5:
+            room_of[course], slot_of[course] = room, slot
+    return room_of, slot_of, pulp.LpSolution[model.sol_status]
+
+def exact_repair(problem: TimetableProblem, room_of: np.ndarray, slot_of: np.ndarray,
+                 max_variables: int = 500, deadline=None, seed=None) -> Tuple[np.ndarray, np.ndarray, float, int]:
+    """
+    Re-solve the courses in conflict exactly, at most max_variables
+    placement variables, with everything else fixed. Keeps the given
+    solution when the integer program finds nothing better.
+    """
+    clock = Deadline.resolve(deadline)
+    evaluator = DeltaEvaluator(problem, room_of, slot_of)
+    conflicting = list(evaluator.conflicting_courses())
+    size = max(1, max_variables // max(1, problem.n_rooms * problem.n_slots))
+    if not conflicting or clock.remaining() < 1:
+        return evaluator.room_of, evaluator.slot_of, evaluator.fitness, evaluator.violations
+
+    free = np.random.default_rng(seed).choice(conflicting, min(size, len(conflicting)), replace=False)
+    new_rooms, new_slots, _ = solve_assignment(problem, free, evaluator.room_of, evaluator.slot_of,
+                                               time_limit=min(60, clock.remaining()))
+    repaired = DeltaEvaluator(problem, new_rooms, new_slots)
+    if repaired.fitness < evaluator.fitness:
+        evaluator = repaired
+    return evaluator.room_of, evaluator.slot_of, evaluator.fitness, evaluator.violations
+
+class ExactSolver:
+    """
+    Exact integer programming mode for small examination timetabling instances.
+
+    Formulates the course-room-slot assignment as an integer program with
+    student, room and time conflicts and room seating capacity, and solves it
+    with the CBC solver bundled with PuLP (an optional dependency). A greedy
+    construction provides the warm start, so the run always returns an
+    incumbent when the time limit is reached before optimality is proven.
+    """
+
+    def __init__(self, courses, rooms, time_slots, constraints, seed=None, callback=None):
+        self.courses = courses
+        self.rooms = rooms
+        self.time_slots = time_slots
+        self.constraints = constraints
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
+        self.problem = TimetableProblem(courses, rooms, time_slots)
+        self.lower_bound = lower_bound(self.problem)['fitness']
+        self.best_solution = None
+        self.best_fitness = float('inf')
+
+    def _candidate_rooms(self) -> Dict[int, List[int]]:
+        """Rooms seating each course, or every room when none is large enough"""
+        candidates = {}
+        for course, students in enumerate(self.problem.course_students):
+            fitting = [r for r, room in enumerate(self.rooms) if (room.capacity or 0) >= (students or 0)]
+            candidates[course] = fitting or list(range(self.problem.n_rooms))
+        return candidates
+
+    def _greedy_start(self, candidates: Dict[int, List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Place the courses one by one, largest first, at their cheapest allowed position"""
+        problem = self.problem
+        evaluator = DeltaEvaluator(problem, *problem.random_solution(self.rng))
+        for course in sorted(range(problem.n_courses), key=lambda c: problem.course_students[c], reverse=True):
+            deltas = evaluator.batch_deltas(course)
+            allowed = np.full(problem.n_rooms, np.inf)
+            allowed[candidates.get(course) or list(range(problem.n_rooms))] = 0
+            deltas = deltas + allowed[:, np.newaxis]
+            room, slot = np.unravel_index(int(deltas.argmin()), deltas.shape)
+            evaluator.apply_move(course, room, slot)
+        return evaluator.solution()
+
+    def optimize(self, time_limit: float = 60, respect_capacity: bool = True, max_variables: int = 20000,
+                deadline=None, time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """
+        Solve the whole instance as one integer program
+
+        Args:
+            time_limit: Solver time limit in seconds (the deadline, if sooner, wins)
+            respect_capacity: Only place courses in rooms seating all their students
+            max_variables: Largest model accepted; bigger instances need a metaheuristic
+        """
+        _require_pulp()
+        clock = Deadline.resolve(deadline, time_budget)
+        problem = self.problem
+
+        candidates = self._candidate_rooms() if respect_capacity else {}
+        variables = sum(len(candidates.get(course) or range(problem.n_rooms))
+                        for course in range(problem.n_courses)) * problem.n_slots
+        if variables > max_variables:
+            raise ValueError(f'Instance too large for exact mode ({variables} variables, limit {max_variables}). '
+                             'Use a metaheuristic or the decomposition solver instead.')
+
+        room_of, slot_of = self._greedy_start(candidates)
+        start = DeltaEvaluator(problem, room_of, slot_of)
+        fitness_history = [start.fitness]
+        self.reporter.update(0, start.fitness, violations=start.violations, moves=problem.n_courses, force=True)
+
+        status = 'Not Solved'
+        evaluator = start
+        time_limit = min(time_limit, clock.remaining())
+        if start.fitness > self.lower_bound and time_limit >= 1:
+            room_of, slot_of, status = solve_assignment(problem, range(problem.n_courses), room_of, slot_of,
+                                                        candidates, time_limit)
+            solved = DeltaEvaluator(problem, room_of, slot_of)
+            if solved.fitness <= start.fitness:
+                evaluator = solved
+        fitness_history.append(evaluator.fitness)
+        self.reporter.update(1, evaluator.fitness, violations=evaluator.violations, moves=0, force=True)
+
+        self.best_fitness = evaluator.fitness
+        self.best_solution = evaluator.to_timetable()
+        self.progress = clock.progress(int(status == 'Optimal Solution Found'), 1, fitness=self.best_fitness,
+                                       lower_bound=self.lower_bound)
+        if status == 'Solution Found' and self.progress['stopped_by'] == 'completed':
+            self.progress['stopped_by'] = 'deadline'  # solver time limit before proving optimality
+        self.progress['solver_status'] = status
+        self.best_solution['progress'] = self.progress
+        return self.best_solution, fitness_history
+
+    def optimize_with_parameters(self, population_size: int = 50, generations: int = 100,
+                               mutation_rate: float = 0.1, temperature: float = 1000,
+                               cooling_rate: float = 0.95, deadline=None,
+                               time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """Optimize with parameters (compatibility with other algorithms)"""
+        return self.optimize(deadline=deadline, time_budget=time_budget)
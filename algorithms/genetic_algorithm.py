@@ -1,8 +1,11 @@
-import random
 import numpy as np
 from typing import List, Dict, Tuple, Any
 import copy
 import json
+from .bounds import fitness_lower_bound
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+from .deadline import Deadline
 
 class GeneticAlgorithm:
     """
@@ -12,11 +15,15 @@ class GeneticAlgorithm:
     and mutation operations to find optimal solutions.
     """
     
-    def __init__(self, courses, rooms, time_slots, constraints):
+    def __init__(self, courses, rooms, time_slots, constraints, seed=None, callback=None):
         self.courses = courses
         self.rooms = rooms
         self.time_slots = time_slots
         self.constraints = constraints
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
+        self.lower_bound = fitness_lower_bound(courses, rooms, time_slots)
         self.population = []
         self.best_solution = None
         self.best_fitness = float('inf')
@@ -41,8 +48,8 @@ class GeneticAlgorithm:
         
         # Assign each course to a random room and time slot
         for course in self.courses:
-            room = random.choice(self.rooms)
-            time_slot = random.choice(self.time_slots)
+            room = self.rooms[self.rng.integers(len(self.rooms))]
+            time_slot = self.time_slots[self.rng.integers(len(self.time_slots))]
             
             assignment = {
                 'course_id': course.id,
@@ -229,16 +236,17 @@ class GeneticAlgorithm:
     
     def _tournament_selection(self, population: List[Dict], tournament_size: int) -> Dict:
         """Select individual using tournament selection"""
-        tournament = random.sample(population, min(tournament_size, len(population)))
+        picks = self.rng.choice(len(population), min(tournament_size, len(population)), replace=False)
+        tournament = [population[i] for i in picks]
         return min(tournament, key=lambda x: x['fitness'])
     
     def crossover(self, parent1: Dict, parent2: Dict, crossover_rate: float = 0.8) -> Tuple[Dict, Dict]:
         """Perform crossover between two parents"""
-        if random.random() > crossover_rate:
+        if self.rng.random() > crossover_rate:
             return copy.deepcopy(parent1), copy.deepcopy(parent2)
         
         # Single-point crossover
-        crossover_point = random.randint(1, len(parent1['assignments']) - 1)
+        crossover_point = int(self.rng.integers(1, len(parent1['assignments'])))
         
         child1 = {
             'assignments': parent1['assignments'][:crossover_point] + parent2['assignments'][crossover_point:],
@@ -263,13 +271,13 @@ class GeneticAlgorithm:
         mutated = copy.deepcopy(individual)
         
         for assignment in mutated['assignments']:
-            if random.random() < mutation_rate:
+            if self.rng.random() < mutation_rate:
                 # Randomly change room or time slot
-                if random.random() < 0.5:
-                    assignment['room_id'] = random.choice(self.rooms).id
+                if self.rng.random() < 0.5:
+                    assignment['room_id'] = self.rooms[self.rng.integers(len(self.rooms))].id
                     assignment['room_name'] = assignment['room_id']
                 else:
-                    new_time_slot = random.choice(self.time_slots)
+                    new_time_slot = self.time_slots[self.rng.integers(len(self.time_slots))]
                     assignment['time_slot_id'] = new_time_slot.id
                     assignment['day'] = new_time_slot.day
                     assignment['start_time'] = str(new_time_slot.start_time)
@@ -281,12 +289,24 @@ class GeneticAlgorithm:
     
     def optimize(self, population_size: int = 50, generations: int = 100, 
                 mutation_rate: float = 0.1, crossover_rate: float = 0.8,
-                tournament_size: int = 3) -> Tuple[Dict, List[float]]:
-        """Main optimization loop"""
-        
-        # Initialize population
+                tournament_size: int = 3, deadline=None,
+                time_budget: float = None, initial_solutions: List[Dict] = None) -> Tuple[Dict, List[float]]:
+        """Main optimization loop
+        
+        Stops after the given number of generations or once the deadline
+        (timestamp or Deadline) / time budget in seconds is reached, whichever
+        comes first, and returns the best solution found so far. Timetables in
+        initial_solutions (e.g. from the elite archive) replace up to half of
+        the random initial population.
+        """
+        clock = Deadline.resolve(deadline, time_budget)
+        
+        # Initialize population, seeded with known good timetables
         population = self.initialize_population(population_size)
+        for index, solution in enumerate((initial_solutions or [])[:population_size // 2]):
+            population[index] = copy.deepcopy(solution)
         fitness_history = []
+        generations_completed = 0
         
         # Evolution loop
         for generation in range(generations):
@@ -325,9 +345,21 @@ class GeneticAlgorithm:
             
             # Trim to exact population size
             population = new_population[:population_size]
+            generations_completed += 1
+            self.reporter.update(generations_completed, self.best_fitness, avg_fitness,
+                                 self.best_solution['constraint_violations'], moves=population_size)
+            
+            # Early stopping once no better solution can exist
+            if self.best_fitness <= self.lower_bound:
+                break
             
-            # Early stopping if perfect solution found
-            if self.best_fitness == 0:
+            # Stop with the best solution so far once the deadline passes
+            if clock.expired():
                 break
         
+        self.reporter.update(generations_completed, self.best_fitness,
+                             violations=self.best_solution['constraint_violations'], moves=0, force=True)
+        self.progress = clock.progress(generations_completed, generations, fitness=self.best_fitness,
+                                       lower_bound=self.lower_bound)
+        self.best_solution['progress'] = self.progress
         return self.best_solution, fitness_history
@@ -1,8 +1,14 @@
-import random
 import copy
 from typing import List, Dict, Tuple, Any
 from .genetic_algorithm import GeneticAlgorithm
 from .simulated_annealing import SimulatedAnnealing
+from .delta_evaluator import TimetableProblem
+from .local_search import first_improvement_search
+from .exact import exact_repair, solver_available
+from .bounds import lower_bound
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+from .deadline import Deadline
 
 class HybridOptimizer:
     """
@@ -12,22 +18,30 @@ class HybridOptimizer:
     the best solutions using SA for local optimization.
     """
     
-    def __init__(self, courses, rooms, time_slots, constraints):
+    def __init__(self, courses, rooms, time_slots, constraints, seed=None, callback=None):
         self.courses = courses
         self.rooms = rooms
         self.time_slots = time_slots
         self.constraints = constraints
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
         
-        # Initialize individual algorithms
-        self.ga = GeneticAlgorithm(courses, rooms, time_slots, constraints)
-        self.sa = SimulatedAnnealing(courses, rooms, time_slots, constraints)
+        # Initialize individual algorithms, each on its own spawned stream
+        ga_stream, sa_stream = self.rng.spawn(2)
+        self.ga = GeneticAlgorithm(courses, rooms, time_slots, constraints, seed=ga_stream, callback=self.reporter)
+        self.sa = SimulatedAnnealing(courses, rooms, time_slots, constraints, seed=sa_stream, callback=self.reporter)
+        self.problem = TimetableProblem(courses, rooms, time_slots)
+        self.lower_bound = lower_bound(self.problem)['fitness']
         
         self.best_solution = None
         self.best_fitness = float('inf')
         
     def optimize(self, population_size: int = 50, generations: int = 100,
                 mutation_rate: float = 0.1, temperature: float = 1000,
-                cooling_rate: float = 0.95, hybrid_ratio: float = 0.7) -> Tuple[Dict, List[float]]:
+                cooling_rate: float = 0.95, hybrid_ratio: float = 0.7, deadline=None,
+                time_budget: float = None, initial_solutions: List[Dict] = None,
+                exact_repair_variables: int = 0) -> Tuple[Dict, List[float]]:
         """
         Main optimization loop combining GA and SA
         
@@ -38,7 +52,14 @@ class HybridOptimizer:
             temperature: SA initial temperature
             cooling_rate: SA cooling rate
             hybrid_ratio: Ratio of GA vs SA iterations (0.7 = 70% GA, 30% SA)
+            deadline: Absolute stopping time (timestamp or Deadline)
+            time_budget: Time budget in seconds, split between the phases by hybrid_ratio
+            initial_solutions: Known good timetables seeding the GA population
+            exact_repair_variables: Size of the integer program re-solving the remaining
+                                    conflicts before the local search (0 disables it,
+                                    needs the optional pulp package)
         """
+        clock = Deadline.resolve(deadline, time_budget)
         
         fitness_history = []
         
@@ -51,8 +72,11 @@ class HybridOptimizer:
             generations=ga_generations,
             mutation_rate=mutation_rate,
             crossover_rate=0.8,
-            tournament_size=3
+            tournament_size=3,
+            deadline=clock.split(hybrid_ratio),
+            initial_solutions=initial_solutions
         )
+        ga_progress = self.ga.progress
         
         fitness_history.extend(ga_fitness_history)
         
@@ -75,8 +99,10 @@ class HybridOptimizer:
             initial_temperature=temperature,
             cooling_rate=cooling_rate,
             iterations_per_temp=max(1, sa_iterations // 10),
-            max_iterations=sa_iterations * 10
+            max_iterations=sa_iterations * 10,
+            deadline=clock
         )
+        sa_progress = self.sa.progress
         
         fitness_history.extend(sa_fitness_history)
         
@@ -87,115 +113,41 @@ class HybridOptimizer:
         
         print(f"SA Phase completed. Best fitness: {self.best_fitness}")
         
-        # Phase 3: Iterative refinement (optional)
-        if self.best_fitness > 0:  # If not perfect solution
-            print("Phase 3: Running iterative refinement...")
-            refined_solution = self._iterative_refinement()
+        # Phase 3: Local search refinement (optional, only with time to spare)
+        if self.best_fitness > self.lower_bound and not clock.expired():  # Gap still open
+            print("Phase 3: Running local search refinement...")
+            refined_solution = self._iterative_refinement(clock=clock,
+                                                          exact_repair_variables=exact_repair_variables)
             
             if refined_solution['fitness'] < self.best_fitness:
-                self.best_solution = copy.deepcopy(refined_solution)
+                self.best_solution = refined_solution
                 self.best_fitness = refined_solution['fitness']
                 print(f"Refinement completed. Final fitness: {self.best_fitness}")
         
-        return self.best_solution, fitness_history
-    
-    def _iterative_refinement(self, max_iterations: int = 50) -> Dict:
-        """Iterative refinement using both algorithms in alternating fashion"""
-        
-        current_solution = copy.deepcopy(self.best_solution)
-        current_fitness = current_solution['fitness']
-        
-        for iteration in range(max_iterations):
-            # Alternate between small GA and SA improvements
-            if iteration % 2 == 0:
-                # Small GA improvement
-                improved_solution = self._small_ga_improvement(current_solution)
-            else:
-                # Small SA improvement
-                improved_solution = self._small_sa_improvement(current_solution)
-            
-            if improved_solution['fitness'] < current_fitness:
-                current_solution = improved_solution
-                current_fitness = improved_solution['fitness']
-                
-                # Early stopping if perfect solution found
-                if current_fitness == 0:
-                    break
-        
-        return current_solution
-    
-    def _small_ga_improvement(self, base_solution: Dict) -> Dict:
-        """Run a small GA to improve the given solution"""
-        # Create a small population starting with the base solution
-        small_population = [copy.deepcopy(base_solution)]
-        
-        # Add some random variations
-        for _ in range(4):  # Small population size
-            variation = self._create_variation(base_solution)
-            small_population.append(variation)
-        
-        # Run a few generations
-        for _ in range(5):  # Small number of generations
-            # Selection
-            parent1, parent2 = self.ga.select_parents(small_population, tournament_size=2)
-            
-            # Crossover
-            child1, child2 = self.ga.crossover(parent1, parent2, crossover_rate=0.9)
-            
-            # Mutation
-            child1 = self.ga.mutate(child1, mutation_rate=0.2)
-            child2 = self.ga.mutate(child2, mutation_rate=0.2)
-            
-            # Update population
-            small_population = [parent1, parent2, child1, child2]
-            
-            # Sort by fitness
-            small_population.sort(key=lambda x: x['fitness'])
-        
-        return small_population[0]  # Return best solution
-    
-    def _small_sa_improvement(self, base_solution: Dict) -> Dict:
-        """Run a small SA to improve the given solution"""
-        # Use the base solution as starting point
-        self.sa.best_solution = copy.deepcopy(base_solution)
-        self.sa.best_fitness = base_solution['fitness']
-        
-        # Run SA with low temperature for local search
-        improved_solution, _ = self.sa.optimize(
-            initial_temperature=100,  # Low temperature for local search
-            cooling_rate=0.9,
-            iterations_per_temp=10,
-            max_iterations=100
+        # Report overall progress together with each phase
+        self.reporter.update(ga_progress['iterations_completed'] + sa_progress['iterations_completed'],
+                             self.best_fitness, violations=self.best_solution['constraint_violations'],
+                             moves=0, force=True)
+        self.progress = clock.progress(
+            ga_progress['iterations_completed'] + sa_progress['iterations_completed'],
+            ga_progress['iterations_planned'] + sa_progress['iterations_planned'],
+            fitness=self.best_fitness,
+            lower_bound=self.lower_bound
         )
-        
-        return improved_solution
+        self.progress['phases'] = {'genetic': ga_progress, 'simulated_annealing': sa_progress}
+        self.best_solution['progress'] = self.progress
+        return self.best_solution, fitness_history
     
-    def _create_variation(self, base_solution: Dict) -> Dict:
-        """Create a variation of the base solution"""
-        variation = copy.deepcopy(base_solution)
-        
-        # Make a few random changes
-        num_changes = random.randint(1, 3)
-        for _ in range(num_changes):
-            assignment_idx = random.randint(0, len(variation['assignments']) - 1)
-            assignment = variation['assignments'][assignment_idx]
-            
-            if random.random() < 0.5:
-                # Change room
-                new_room = random.choice(self.rooms)
-                assignment['room_id'] = new_room.id
-                assignment['room_name'] = new_room.name
-            else:
-                # Change time slot
-                new_time_slot = random.choice(self.time_slots)
-                assignment['time_slot_id'] = new_time_slot.id
-                assignment['day'] = new_time_slot.day
-                assignment['start_time'] = str(new_time_slot.start_time)
-                assignment['end_time'] = str(new_time_slot.end_time)
-        
-        # Recalculate fitness
-        variation['fitness'] = self.ga._calculate_fitness(variation)
-        return variation
+    def _iterative_refinement(self, max_moves: int = 20000, clock: Deadline = None,
+                              exact_repair_variables: int = 0) -> Dict:
+        """Refine the best solution with one in-place local search on the array representation"""
+        room_of, slot_of = self.problem.from_timetable(self.best_solution, self.rng)
+        if exact_repair_variables and solver_available():
+            room_of, slot_of, _, _ = exact_repair(self.problem, room_of, slot_of, exact_repair_variables,
+                                                  deadline=clock, seed=self.rng)
+        room_of, slot_of, fitness, violations = first_improvement_search(
+            self.problem, room_of, slot_of, max_moves, self.rng, deadline=clock)
+        return self.problem.to_timetable(room_of, slot_of, fitness, violations)
     
     def get_algorithm_info(self) -> Dict:
         """Get information about the hybrid approach"""
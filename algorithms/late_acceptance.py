@@ -0,0 +1,72 @@
+from typing import List, Dict, Tuple
+from .delta_evaluator import DeltaEvaluator
+from .deadline import Deadline
+from .single_solution import SingleSolutionSearch
+
+class LateAcceptanceHillClimbing(SingleSolutionSearch):
+    """
+    Late Acceptance Hill Climbing for examination timetabling optimization.
+
+    A candidate move is accepted if it is no worse than the current solution or
+    than the solution from history_length iterations ago. The history is kept in
+    a fixed-size ring buffer, so the only parameter that matters is its length.
+    """
+
+    def optimize(self, max_iterations: int = 20000, history_length: int = 50,
+                deadline=None, time_budget: float = 2.0) -> Tuple[Dict, List[float]]:
+        """Main optimization loop using late acceptance hill climbing"""
+
+        clock = Deadline.resolve(deadline, time_budget)
+
+        problem = self.problem
+        evaluator = DeltaEvaluator(problem, *problem.random_solution(self.rng))
+        current_fitness = evaluator.fitness
+
+        best_rooms, best_slots = evaluator.solution()
+        self.best_fitness = current_fitness
+        best_violations = evaluator.violations
+
+        # Ring buffer of past current-solution fitness values
+        history = [current_fitness] * history_length
+        fitness_history = []
+        iterations_completed = 0
+        reported = 0
+
+        for iteration in range(max_iterations):
+            course, room, slot = self._random_move(evaluator)
+            candidate_fitness = current_fitness + evaluator.move_delta(course, room, slot)
+
+            position = iteration % history_length
+            if candidate_fitness <= current_fitness or candidate_fitness <= history[position]:
+                evaluator.apply_move(course, room, slot)
+                current_fitness = evaluator.fitness
+
+                if current_fitness < self.best_fitness:
+                    best_rooms, best_slots = evaluator.solution()
+                    self.best_fitness = current_fitness
+                    best_violations = evaluator.violations
+
+            history[position] = current_fitness
+
+            iterations_completed += 1
+
+            # Record one point per 100 moves and check the deadline
+            if iteration % 100 == 0:
+                fitness_history.append(current_fitness)
+                self.reporter.update(iterations_completed, self.best_fitness, violations=best_violations,
+                                     moves=iterations_completed - reported)
+                reported = iterations_completed
+                if clock.expired():
+                    break
+
+            # Early stopping once no better solution can exist
+            if self.best_fitness <= self.lower_bound:
+                break
+
+        self.reporter.update(iterations_completed, self.best_fitness, violations=best_violations,
+                             moves=iterations_completed - reported, force=True)
+        self.best_solution = problem.to_timetable(best_rooms, best_slots, self.best_fitness, best_violations)
+        self.progress = clock.progress(iterations_completed, max_iterations, fitness=self.best_fitness,
+                                       lower_bound=self.lower_bound)
+        self.best_solution['progress'] = self.progress
+        return self.best_solution, fitness_history
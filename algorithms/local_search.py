@@ -0,0 +1,42 @@
+import numpy as np
+from typing import Tuple
+from .delta_evaluator import TimetableProblem, DeltaEvaluator
+from .deadline import Deadline
+
+def first_improvement_search(problem: TimetableProblem, room_of: np.ndarray, slot_of: np.ndarray,
+                             max_moves: int, seed=None, deadline=None) -> Tuple[np.ndarray, np.ndarray, float, int]:
+    """
+    Bounded first-improvement local search over the array representation.
+
+    Courses are scanned in random order (conflicting courses only while the
+    solution is infeasible) and the first course with an improving move is
+    moved. Stops at a local optimum, after max_moves evaluated moves or once
+    the deadline passes (checked after every applied move). seed is an
+    integer seed or the Generator of the caller's random stream.
+    """
+    clock = Deadline.resolve(deadline)
+    rng = np.random.default_rng(seed)
+    evaluator = DeltaEvaluator(problem, room_of, slot_of)
+    moves = 0
+    improved = True
+
+    while improved and moves < max_moves and not clock.expired():
+        improved = False
+        courses = list(evaluator.conflicting_courses()) or list(range(problem.n_courses))
+        rng.shuffle(courses)
+
+        for course in courses:
+            deltas = evaluator.batch_deltas(course)
+            moves += deltas.size
+
+            improving = np.flatnonzero(deltas < 0)
+            if len(improving):
+                room, slot = np.unravel_index(rng.choice(improving), deltas.shape)
+                evaluator.apply_move(course, room, slot)
+                improved = True
+                break
+
+            if moves >= max_moves:
+                break
+
+    return evaluator.room_of, evaluator.slot_of, evaluator.fitness, evaluator.violations
@@ -0,0 +1,194 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple
+from .delta_evaluator import TimetableProblem, DeltaEvaluator
+from .local_search import first_improvement_search
+from .bounds import lower_bound
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+from .deadline import Deadline
+
+# Problem instance shared by every task of a worker process
+_worker_problem = None
+
+def _init_worker(problem: TimetableProblem):
+    global _worker_problem
+    _worker_problem = problem
+
+def _improve_in_worker(task: Tuple[np.ndarray, np.ndarray, int, np.random.Generator]):
+    room_of, slot_of, max_moves, rng = task
+    return first_improvement_search(_worker_problem, room_of, slot_of, max_moves, rng)
+
+class MemeticAlgorithm:
+    """
+    Memetic algorithm for examination timetabling optimization.
+
+    A genetic algorithm over array-backed solutions in which the best fraction
+    of every generation's offspring is improved by a short, bounded
+    first-improvement local search before entering the population. Local
+    searches of one generation run as a batch on a process pool.
+    """
+
+    def __init__(self, courses, rooms, time_slots, constraints, seed=None, callback=None):
+        self.courses = courses
+        self.rooms = rooms
+        self.time_slots = time_slots
+        self.constraints = constraints
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
+        self.problem = TimetableProblem(courses, rooms, time_slots)
+        self.lower_bound = lower_bound(self.problem)['fitness']
+        self.best_solution = None
+        self.best_fitness = float('inf')
+
+    def _individual(self, room_of: np.ndarray, slot_of: np.ndarray) -> Dict:
+        """Evaluate an array solution and wrap it as a population member"""
+        evaluator = DeltaEvaluator(self.problem, room_of, slot_of)
+        return {
+            'rooms': evaluator.room_of,
+            'slots': evaluator.slot_of,
+            'fitness': evaluator.fitness,
+            'constraint_violations': evaluator.violations
+        }
+
+    def _tournament_selection(self, population: List[Dict], tournament_size: int) -> Dict:
+        """Select individual using tournament selection"""
+        picks = self.rng.choice(len(population), min(tournament_size, len(population)), replace=False)
+        tournament = [population[i] for i in picks]
+        return min(tournament, key=lambda x: x['fitness'])
+
+    def _crossover(self, parent1: Dict, parent2: Dict,
+                   crossover_rate: float) -> Tuple[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+        """Single-point crossover on the room and slot arrays"""
+        if self.rng.random() > crossover_rate or self.problem.n_courses < 2:
+            return (parent1['rooms'].copy(), parent1['slots'].copy()), \
+                   (parent2['rooms'].copy(), parent2['slots'].copy())
+
+        point = int(self.rng.integers(1, self.problem.n_courses))
+        child1 = (np.concatenate([parent1['rooms'][:point], parent2['rooms'][point:]]),
+                  np.concatenate([parent1['slots'][:point], parent2['slots'][point:]]))
+        child2 = (np.concatenate([parent2['rooms'][:point], parent1['rooms'][point:]]),
+                  np.concatenate([parent2['slots'][:point], parent1['slots'][point:]]))
+        return child1, child2
+
+    def _mutate(self, room_of: np.ndarray, slot_of: np.ndarray, mutation_rate: float):
+        """Randomly change the room or time slot of some courses in place"""
+        mutated = self.rng.random(self.problem.n_courses) < mutation_rate
+        change_room = mutated & (self.rng.random(self.problem.n_courses) < 0.5)
+        change_slot = mutated & ~change_room
+        room_of[change_room] = self.rng.integers(self.problem.n_rooms, size=int(change_room.sum()))
+        slot_of[change_slot] = self.rng.integers(self.problem.n_slots, size=int(change_slot.sum()))
+
+    def _local_search(self, offspring: List[Tuple[np.ndarray, np.ndarray]], max_moves: int,
+                      pool: ProcessPoolExecutor) -> List[Dict]:
+        """Improve a batch of offspring, in parallel when a pool is available"""
+        # Every search gets its own spawned stream, so results do not depend on the worker count
+        streams = self.rng.spawn(len(offspring))
+        tasks = [(room_of, slot_of, max_moves, rng) for (room_of, slot_of), rng in zip(offspring, streams)]
+
+        if pool is None:
+            results = [first_improvement_search(self.problem, *task) for task in tasks]
+        else:
+            results = pool.map(_improve_in_worker, tasks)
+
+        return [{
+            'rooms': room_of,
+            'slots': slot_of,
+            'fitness': fitness,
+            'constraint_violations': violations
+        } for room_of, slot_of, fitness, violations in results]
+
+    def optimize(self, population_size: int = 30, generations: int = 50,
+                mutation_rate: float = 0.05, crossover_rate: float = 0.8,
+                tournament_size: int = 3, local_search_rate: float = 0.5,
+                local_search_moves: int = 20000, workers: int = None,
+                deadline=None, time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """
+        Main optimization loop
+
+        Args:
+            local_search_rate: Fraction of each generation's offspring (best first) that is locally improved
+            local_search_moves: Maximum number of evaluated moves per local search
+            workers: Worker processes for the local searches (1 runs them in-process)
+        """
+        clock = Deadline.resolve(deadline, time_budget)
+        problem = self.problem
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(problem,))
+
+        try:
+            # Initialize population from locally improved random solutions
+            population = self._local_search(
+                [problem.random_solution(self.rng) for _ in range(population_size)], local_search_moves, pool)
+            fitness_history = []
+            generations_completed = 0
+            best = min(population, key=lambda x: x['fitness'])
+
+            for generation in range(generations):
+                population.sort(key=lambda x: x['fitness'])
+                if population[0]['fitness'] < best['fitness']:
+                    best = population[0]
+
+                # Record average fitness
+                fitness_history.append(sum(ind['fitness'] for ind in population) / len(population))
+
+                # Early stopping once no better solution can exist
+                if best['fitness'] <= self.lower_bound:
+                    break
+
+                # Elitism: keep best 10% of individuals
+                elite_size = max(1, population_size // 10)
+                offspring = []
+                while len(offspring) < population_size - elite_size:
+                    parent1 = self._tournament_selection(population, tournament_size)
+                    parent2 = self._tournament_selection(population, tournament_size)
+                    for room_of, slot_of in self._crossover(parent1, parent2, crossover_rate):
+                        self._mutate(room_of, slot_of, mutation_rate)
+                        offspring.append(self._individual(room_of, slot_of))
+                offspring = sorted(offspring, key=lambda x: x['fitness'])[:population_size - elite_size]
+
+                # Local search on the best fraction of the offspring, as one parallel batch
+                improve_count = int(round(len(offspring) * local_search_rate))
+                improved = self._local_search(
+                    [(ind['rooms'], ind['slots']) for ind in offspring[:improve_count]], local_search_moves, pool)
+
+                population = population[:elite_size] + improved + offspring[improve_count:]
+                generations_completed += 1
+                leader = min(population + [best], key=lambda x: x['fitness'])
+                self.reporter.update(generations_completed, leader['fitness'], fitness_history[-1],
+                                     leader['constraint_violations'], moves=len(offspring))
+
+                # Stop with the best solution so far once the deadline passes
+                if clock.expired():
+                    break
+
+            population.sort(key=lambda x: x['fitness'])
+            if population[0]['fitness'] < best['fitness']:
+                best = population[0]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        self.reporter.update(generations_completed, best['fitness'], violations=best['constraint_violations'],
+                             moves=0, force=True)
+        self.best_fitness = best['fitness']
+        self.best_solution = problem.to_timetable(best['rooms'], best['slots'], best['fitness'],
+                                                  best['constraint_violations'])
+        self.progress = clock.progress(generations_completed, generations, fitness=self.best_fitness,
+                                       lower_bound=self.lower_bound)
+        self.best_solution['progress'] = self.progress
+        return self.best_solution, fitness_history
+
+    def optimize_with_parameters(self, population_size: int = 50, generations: int = 100,
+                               mutation_rate: float = 0.1, temperature: float = 1000,
+                               cooling_rate: float = 0.95, deadline=None,
+                               time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """Optimize with parameters (compatibility with other algorithms)"""
+        return self.optimize(population_size=population_size, generations=generations,
+                             mutation_rate=mutation_rate, deadline=deadline, time_budget=time_budget)
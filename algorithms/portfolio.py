@@ -0,0 +1,220 @@
+import copy
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from types import SimpleNamespace
+from typing import List, Dict, Tuple, Any
+from .genetic_algorithm import GeneticAlgorithm
+from .simulated_annealing import SimulatedAnnealing
+from .hybrid_optimizer import HybridOptimizer
+from .tabu_search import TabuSearch
+from .late_acceptance import LateAcceptanceHillClimbing
+from .great_deluge import GreatDeluge
+from .memetic_algorithm import MemeticAlgorithm
+from .exact import ExactSolver
+from .delta_evaluator import TimetableProblem, DeltaEvaluator
+from .bounds import lower_bound
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+from .deadline import Deadline
+
+# Engines the portfolio can race, by their /optimize algorithm name
+ENGINES = {
+    'genetic': GeneticAlgorithm,
+    'simulated_annealing': SimulatedAnnealing,
+    'hybrid': HybridOptimizer,
+    'tabu': TabuSearch,
+    'late_acceptance': LateAcceptanceHillClimbing,
+    'great_deluge': GreatDeluge,
+    'memetic': MemeticAlgorithm,
+    'exact': ExactSolver,
+}
+
+DEFAULT_ENGINES = ('genetic', 'simulated_annealing', 'hybrid', 'tabu', 'late_acceptance', 'great_deluge')
+
+class SharedDeadline(Deadline):
+    """
+    Deadline that also expires once the portfolio's shared incumbent reaches
+    the quality target, so that every racing engine stops at its next check.
+    """
+
+    def __init__(self, deadline: float = None, time_budget: float = None,
+                 incumbent=None, quality_target: float = None, cancelled=None):
+        super().__init__(deadline=deadline, time_budget=time_budget, cancelled=cancelled)
+        self.incumbent = incumbent
+        self.quality_target = quality_target
+
+    def target_reached(self) -> bool:
+        """True once some engine has published a solution meeting the target"""
+        return self.incumbent is not None and self.incumbent.value <= self.quality_target
+
+    def expired(self) -> bool:
+        return self.target_reached() or super().expired()
+
+    def split(self, fraction: float) -> 'SharedDeadline':
+        deadline = None if self.deadline is None else time.time() + self.remaining() * fraction
+        return SharedDeadline(deadline=deadline, incumbent=self.incumbent, quality_target=self.quality_target,
+                              cancelled=self.cancelled)
+
+# Problem snapshot, shared incumbent, move counter and cancellation flag of a worker process
+_worker_state = None
+_moves_published = 0
+
+def _init_worker(courses, rooms, time_slots, incumbent, quality_target, moves, cancelled):
+    global _worker_state
+    _worker_state = (courses, rooms, time_slots, incumbent, quality_target, moves, cancelled)
+
+def _publish(event: Dict) -> None:
+    """Progress callback of a racing engine: share its best fitness and move count while it runs"""
+    global _moves_published
+    _, _, _, incumbent, _, moves, _ = _worker_state
+    with incumbent.get_lock():
+        incumbent.value = min(incumbent.value, event['best_fitness'])
+    with moves.get_lock():
+        moves.value += event['moves'] - _moves_published
+    _moves_published = event['moves']
+
+def run_engine(engine: str, courses, rooms, time_slots, parameters: Dict[str, Any],
+               deadline=None, time_budget: float = None, seed=None, callback=None) -> Tuple[Dict, List[float]]:
+    """Run one engine by name with the dashboard parameters"""
+    optimizer = ENGINES[engine](courses, rooms, time_slots, [], seed=seed, callback=callback)
+    if engine == 'genetic':
+        return optimizer.optimize(population_size=parameters['population_size'],
+                                  generations=parameters['generations'],
+                                  mutation_rate=parameters['mutation_rate'],
+                                  deadline=deadline, time_budget=time_budget)
+    if engine == 'hybrid':
+        return optimizer.optimize(population_size=parameters['population_size'],
+                                  generations=parameters['generations'],
+                                  mutation_rate=parameters['mutation_rate'],
+                                  temperature=parameters.get('temperature', 1000),
+                                  cooling_rate=parameters.get('cooling_rate', 0.95),
+                                  deadline=deadline, time_budget=time_budget)
+    return optimizer.optimize_with_parameters(deadline=deadline, time_budget=time_budget, **parameters)
+
+def _run_engine(task: Tuple[str, Dict, float, Any]) -> Tuple[str, Dict, List[float]]:
+    """Run one engine on the snapshot and publish its best fitness"""
+    global _moves_published
+    engine, parameters, deadline, seed = task
+    courses, rooms, time_slots, incumbent, quality_target, _, cancelled = _worker_state
+    clock = SharedDeadline(deadline=deadline, incumbent=incumbent, quality_target=quality_target,
+                           cancelled=cancelled)
+
+    _moves_published = 0
+    solution, history = run_engine(engine, courses, rooms, time_slots, parameters, deadline=clock, seed=seed,
+                                   callback=_publish)
+
+    # Share the incumbent so that the other engines can stop early
+    with incumbent.get_lock():
+        incumbent.value = min(incumbent.value, solution['fitness'])
+
+    return engine, solution, history
+
+def snapshot(courses, rooms, time_slots) -> Tuple[List, List, List]:
+    """Plain copies of the attributes the engines read, safe to send to other processes"""
+    return (
+        [SimpleNamespace(id=course.id, name=course.name, students=course.students, duration=course.duration)
+         for course in courses],
+        [SimpleNamespace(id=room.id, name=room.name, capacity=room.capacity) for room in rooms],
+        [SimpleNamespace(id=time_slot.id, day=time_slot.day, start_time=time_slot.start_time,
+                         end_time=time_slot.end_time)
+         for time_slot in time_slots]
+    )
+
+class PortfolioSolver:
+    """
+    Algorithm portfolio for examination timetabling optimization.
+
+    Races several engines concurrently, one process each, on the same
+    problem snapshot. Engines publish their best fitness to a shared
+    incumbent; as soon as a solution meets the quality target, or
+    the deadline passes, the remaining engines stop at their next deadline
+    check and the best solution overall is returned together with the name
+    of the engine that found it.
+    """
+
+    def __init__(self, courses, rooms, time_slots, constraints, seed=None, callback=None):
+        self.courses, self.rooms, self.time_slots = snapshot(courses, rooms, time_slots)
+        self.constraints = constraints
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
+        self.lower_bound = lower_bound(TimetableProblem(self.courses, self.rooms, self.time_slots))['fitness']
+        self.best_solution = None
+        self.best_fitness = float('inf')
+        self.winner = None
+
+    def optimize(self, engines: Tuple[str, ...] = DEFAULT_ENGINES, population_size: int = 50,
+                generations: int = 100, mutation_rate: float = 0.1, quality_target: float = None,
+                deadline=None, time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """
+        Race the engines and return the best solution found
+
+        Args:
+            engines: Names of the engines to race
+            quality_target: Fitness at or below which a solution ends the race (defaults to
+                            any solution with as few hard violations as the lower bound)
+        """
+        clock = Deadline.resolve(deadline, time_budget)
+        if quality_target is None:
+            quality_target = self.lower_bound + DeltaEvaluator.HARD_WEIGHT / 2
+
+        parameters = {'population_size': population_size, 'generations': generations,
+                      'mutation_rate': mutation_rate}
+        incumbent = multiprocessing.Value('d', float('inf'))
+        moves = multiprocessing.Value('q', 0)
+        results = {}
+
+        with ProcessPoolExecutor(max_workers=len(engines), initializer=_init_worker,
+                                 initargs=(self.courses, self.rooms, self.time_slots,
+                                           incumbent, quality_target, moves, clock.cancelled)) as pool:
+            # Every engine races on its own spawned stream
+            pending = {pool.submit(_run_engine, (engine, parameters, clock.deadline, stream))
+                       for engine, stream in zip(engines, self.rng.spawn(len(engines)))}
+            reported = 0
+            while pending:
+                done, pending = wait(pending, timeout=self.reporter.min_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    engine, solution, history = future.result()
+                    results[engine] = (solution, history)
+
+                    if solution['fitness'] < self.best_fitness:
+                        self.best_solution = copy.deepcopy(solution)
+                        self.best_fitness = solution['fitness']
+                        self.winner = engine
+
+                # Report the race as a whole from the shared incumbent
+                best = min(incumbent.value, self.best_fitness)
+                self.reporter.update(len(results), best, violations=best // DeltaEvaluator.HARD_WEIGHT,
+                                     moves=moves.value - reported, force=not pending)
+                reported = moves.value
+
+        self.progress = clock.progress(len(results), len(engines), fitness=self.best_fitness,
+                                       lower_bound=self.lower_bound)
+        if self.progress['stopped_by'] == 'completed':
+            # Every engine returns, so report what made them stop
+            if incumbent.value <= quality_target:
+                self.progress['stopped_by'] = 'target'
+            elif clock.expired():
+                self.progress['stopped_by'] = 'deadline'
+        self.progress['winner'] = self.winner
+        self.progress['engines'] = {
+            engine: {
+                'fitness': solution['fitness'],
+                'constraint_violations': solution['constraint_violations'],
+                'stopped_by': solution['progress']['stopped_by']
+            }
+            for engine, (solution, _) in results.items()
+        }
+
+        self.best_solution['progress'] = self.progress
+        self.best_solution['winner'] = self.winner
+        return self.best_solution, results[self.winner][1]
+
+    def optimize_with_parameters(self, population_size: int = 50, generations: int = 100,
+                               mutation_rate: float = 0.1, temperature: float = 1000,
+                               cooling_rate: float = 0.95, deadline=None,
+                               time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """Optimize with parameters (compatibility with other algorithms)"""
+        return self.optimize(population_size=population_size, generations=generations,
+                             mutation_rate=mutation_rate, deadline=deadline, time_budget=time_budget)
@@ -0,0 +1,65 @@
+import time
+from typing import Callable, Dict
+
+class ProgressReporter:
+    """
+    Rate-limited progress hook of an optimizer run.
+
+    Engines call ``update()`` wherever they check their deadline, i.e. once
+    per generation or batch of moves. The callback receives at most one
+    event per ``min_interval`` seconds, plus the forced final one, so a run
+    without a listener pays two additions and a comparison per call and a
+    streamed run a handful of events per second however fast its loop is. The
+    reported best is the best of the whole run, so sub-optimizers sharing a
+    reporter (the phases of the hybrid) never make it go back up.
+    """
+
+    def __init__(self, callback: Callable[[Dict], None] = None, min_interval: float = 0.5):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.started_at = time.time()
+        self.last_sent = 0.0
+        self.moves = 0
+        self.best_fitness = float('inf')
+        self.violations = None
+
+    @classmethod
+    def resolve(cls, callback=None) -> 'ProgressReporter':
+        """Accept an existing reporter (shared by sub-optimizers), a callback or None"""
+        if isinstance(callback, ProgressReporter):
+            return callback
+        return cls(callback)
+
+    def update(self, iteration: int, best_fitness: float, average_fitness: float = None,
+               violations: int = None, moves: int = 1, force: bool = False) -> None:
+        """
+        Count the moves evaluated since the last call and publish an event when due
+
+        Args:
+            iteration: Generation or iteration of the reporting engine
+            best_fitness: Best fitness found so far (lower is better)
+            average_fitness: Population average, for population-based engines
+            violations: Hard constraint violations of the best solution
+            moves: Candidate moves or evaluations since the last call
+            force: Publish regardless of the rate limit (final event)
+        """
+        self.moves += moves
+        if best_fitness < self.best_fitness:
+            self.best_fitness, self.violations = best_fitness, violations
+        if self.callback is None or self.best_fitness == float('inf'):
+            return
+        now = time.time()
+        if not force and now - self.last_sent < self.min_interval:
+            return
+        self.last_sent = now
+
+        elapsed = now - self.started_at
+        self.callback({
+            'iteration': int(iteration),
+            'best_fitness': float(self.best_fitness),
+            'average_fitness': None if average_fitness is None else float(average_fitness),
+            'violations': None if self.violations is None else int(self.violations),
+            'moves': self.moves,
+            'moves_per_second': round(self.moves / elapsed, 1) if elapsed > 0 else 0.0,
+            'elapsed_seconds': round(elapsed, 3),
+        })
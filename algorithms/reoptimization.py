@@ -0,0 +1,131 @@
+import numpy as np
+from typing import List, Dict, Tuple, Any
+from .delta_evaluator import TimetableProblem, DeltaEvaluator
+from .bounds import lower_bound
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+from .deadline import Deadline
+
+class Reoptimizer:
+    """
+    Minimal-perturbation re-optimization of an existing timetable.
+
+    The stored assignments are the warm start. Courses whose room or time
+    slot no longer exists, new courses and explicitly changed courses are
+    unpinned and placed greedily; afterwards only those courses and the
+    exams they clash with are moved. Every pinned exam that leaves its
+    published place costs perturbation_weight, which is far below a hard
+    violation but far above the soft constraints, so published exams only
+    move to remove a clash.
+    """
+
+    def __init__(self, courses, rooms, time_slots, constraints, seed=None, callback=None):
+        self.courses = courses
+        self.rooms = rooms
+        self.time_slots = time_slots
+        self.constraints = constraints
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
+        self.problem = TimetableProblem(courses, rooms, time_slots)
+        self.lower_bound = lower_bound(self.problem)['fitness']
+        self.best_solution = None
+        self.best_fitness = float('inf')
+
+    def _warm_start(self, assignments: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Published room and slot index per course, -1 where it cannot be kept"""
+        problem = self.problem
+        original_room = np.full(problem.n_courses, -1, dtype=np.int64)
+        original_slot = np.full(problem.n_courses, -1, dtype=np.int64)
+        for assignment in assignments:
+            course = problem.course_index.get(assignment['course_id'])
+            room = problem.room_index.get(assignment['room_id'])
+            slot = problem.slot_index.get(assignment['time_slot_id'])
+            if course is not None and room is not None and slot is not None:
+                original_room[course] = room
+                original_slot[course] = slot
+        return original_room, original_slot
+
+    def _penalty(self, course: int, original_room: np.ndarray, original_slot: np.ndarray,
+                 perturbation_weight: float) -> np.ndarray:
+        """Perturbation cost of every (room, slot) position of a course"""
+        problem = self.problem
+        if original_room[course] < 0:
+            return np.zeros((problem.n_rooms, problem.n_slots))
+        penalty = np.full((problem.n_rooms, problem.n_slots), perturbation_weight)
+        penalty[original_room[course], original_slot[course]] = 0
+        return penalty
+
+    def optimize(self, assignments: List[Dict], changed_courses: List[Any] = (),
+                perturbation_weight: float = 100, max_iterations: int = 1000,
+                deadline=None, time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """
+        Repair the published timetable after data edits
+
+        Args:
+            assignments: Published assignments (course_id, room_id, time_slot_id)
+            changed_courses: Ids of courses to unpin, e.g. after enrollment changes
+            perturbation_weight: Cost of moving one published exam
+            max_iterations: Maximum number of applied moves after the initial placement
+        """
+        clock = Deadline.resolve(deadline, time_budget)
+        problem = self.problem
+
+        original_room, original_slot = self._warm_start(assignments)
+        for course_id in changed_courses:
+            course = problem.course_index.get(course_id)
+            if course is not None:
+                original_room[course] = original_slot[course] = -1
+        free = np.flatnonzero(original_room < 0)
+
+        evaluator = DeltaEvaluator(problem, np.maximum(original_room, 0), np.maximum(original_slot, 0))
+
+        # Place unpinned courses greedily, largest first
+        for course in sorted(free, key=lambda c: problem.course_students[c], reverse=True):
+            deltas = evaluator.batch_deltas(course)
+            best = np.flatnonzero(deltas == deltas.min())
+            room, slot = np.unravel_index(self.rng.choice(best), deltas.shape)
+            evaluator.apply_move(course, room, slot)
+
+        fitness_history = [evaluator.fitness]
+        unpinned = set(int(course) for course in free)
+        iterations_completed = 0
+
+        # Best-improvement moves over the unpinned courses and the exams in clash
+        for iteration in range(max_iterations):
+            if clock.expired():
+                break
+
+            best_move, best_delta = None, 0.0
+            for course in unpinned | set(int(c) for c in evaluator.conflicting_courses()):
+                penalty = self._penalty(course, original_room, original_slot, perturbation_weight)
+                current = penalty[evaluator.room_of[course], evaluator.slot_of[course]]
+                deltas = evaluator.batch_deltas(course) + penalty - current
+                lowest = deltas.min()
+                if lowest < best_delta:
+                    room, slot = np.unravel_index(int(deltas.argmin()), deltas.shape)
+                    best_move, best_delta = (course, room, slot), lowest
+
+            if best_move is None:
+                break
+
+            evaluator.apply_move(*best_move)
+            fitness_history.append(evaluator.fitness)
+            iterations_completed += 1
+            self.reporter.update(iterations_completed, evaluator.fitness, violations=evaluator.violations,
+                                 moves=problem.n_rooms * problem.n_slots)
+
+        self.reporter.update(iterations_completed, evaluator.fitness, violations=evaluator.violations,
+                             moves=0, force=True)
+        pinned = original_room >= 0
+        moved = pinned & ((evaluator.room_of != original_room) | (evaluator.slot_of != original_slot))
+
+        self.best_fitness = evaluator.fitness
+        self.best_solution = evaluator.to_timetable()
+        self.progress = clock.progress(iterations_completed, max_iterations, fitness=self.best_fitness,
+                                       lower_bound=self.lower_bound)
+        self.progress['placed'] = len(free)
+        self.progress['moved'] = int(moved.sum())
+        self.progress['kept'] = int(pinned.sum() - moved.sum())
+        self.best_solution['progress'] = self.progress
+        return self.best_solution, fitness_history
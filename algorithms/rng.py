@@ -0,0 +1,28 @@
+import numpy as np
+
+def new_seed() -> int:
+    """Fresh seed for a run that was not given one, small enough for an SQL integer column"""
+    return int(np.random.default_rng().integers(2 ** 63))
+
+def parse_seed(value) -> int:
+    """
+    Seed of a request: a fresh one when it is left out. Raises ValueError
+    unless it is an integer in [0, 2**63), the range NumPy accepts that also
+    fits a signed 64-bit SQL column.
+    """
+    if value is None or value == '':
+        return new_seed()
+    seed = int(value)
+    if not 0 <= seed < 2 ** 63:
+        raise ValueError(f'The seed must be an integer from 0 to 2**63 - 1, not {value!r}.')
+    return seed
+
+def make_rng(seed=None) -> np.random.Generator:
+    """
+    Random generator of an optimizer run.
+
+    Accepts an integer seed, a SeedSequence or an existing Generator (which
+    is returned unchanged, so that sub-optimizers can share their parent's
+    stream when they run in sequence).
+    """
+    return np.random.default_rng(seed)
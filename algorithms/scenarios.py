@@ -0,0 +1,221 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import time as clock_time
+from types import SimpleNamespace
+from typing import List, Dict, Tuple, Any
+from .portfolio import ENGINES, run_engine, snapshot
+from .delta_evaluator import TimetableProblem
+from .bounds import lower_bound
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+from .deadline import Deadline
+
+# Engines a scenario can use: the single-process ones. The portfolio, the
+# decomposition and the memetic algorithm start pools of their own and would
+# compete with the sweep's workers for the processors
+SCENARIO_ENGINES = tuple(name for name in ENGINES if name != 'memetic')
+ENTITIES = ('courses', 'rooms', 'time_slots')
+
+# Seconds a scenario takes besides its solver time: process start-up, overrides and lower bound
+SCENARIO_OVERHEAD = 2.0
+
+def apply_overrides(courses, rooms, time_slots, overrides: Dict[str, Dict]) -> Tuple[List, List, List]:
+    """
+    The problem of a scenario: the base records with its overrides applied.
+
+    Each of 'courses', 'rooms' and 'time_slots' may hold 'remove' (ids),
+    'update' ({id: {attribute: value}}) and 'add' (attribute dicts). Added
+    records get negative ids so they never collide with stored ones; times
+    may be given as 'HH:MM'. Records that are not changed are shared with
+    the base, not copied.
+    """
+    base = {'courses': courses, 'rooms': rooms, 'time_slots': time_slots}
+    result = {}
+    next_id = -1
+    for entity in ENTITIES:
+        changes = overrides.get(entity) or {}
+        removed = set(changes.get('remove', []))
+        updates = {int(record_id): values for record_id, values in (changes.get('update') or {}).items()}
+        records = []
+        for record in base[entity]:
+            if record.id in removed:
+                continue
+            if record.id in updates:
+                record = SimpleNamespace(**{**vars(record), **_values(updates[record.id])})
+            records.append(record)
+        for values in changes.get('add', []):
+            records.append(SimpleNamespace(**{**_defaults(entity), **_values(values), 'id': next_id}))
+            next_id -= 1
+        result[entity] = records
+    return result['courses'], result['rooms'], result['time_slots']
+
+def _defaults(entity: str) -> Dict[str, Any]:
+    """Attributes of an added record the request leaves out"""
+    return {
+        'courses': {'name': 'New course', 'students': 0, 'duration': 120},
+        'rooms': {'name': 'New room', 'capacity': 0},
+        'time_slots': {},
+    }[entity]
+
+def _values(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Request values as record attributes ('HH:MM' times become time objects)"""
+    values = dict(values)
+    for name in ('start_time', 'end_time'):
+        if isinstance(values.get(name), str):
+            values[name] = clock_time.fromisoformat(values[name])
+    return values
+
+# Base problem and cancellation flag of a sweep worker process, sent once per process
+_worker_state = None
+
+def _init_worker(courses, rooms, time_slots, cancelled):
+    global _worker_state
+    _worker_state = (courses, rooms, time_slots, cancelled)
+
+def _run_scenario(task: Tuple[int, Dict, float, Any]) -> Tuple[int, Dict]:
+    """Solve one scenario on the base problem of the worker and summarize its best solution"""
+    index, scenario, deadline, seed = task
+    courses, rooms, time_slots, cancelled = _worker_state
+    courses, rooms, time_slots = apply_overrides(courses, rooms, time_slots, scenario)
+    return index, solve_scenario(scenario, courses, rooms, time_slots, deadline, seed, cancelled)
+
+def solve_scenario(scenario: Dict, courses, rooms, time_slots, deadline=None, seed=None,
+                   cancelled=None) -> Dict[str, Any]:
+    """Comparison row of a scenario: size, best fitness, violations and gap to its lower bound"""
+    row = {'name': scenario['name'], 'algorithm': scenario['algorithm'],
+           'courses': len(courses), 'rooms': len(rooms), 'time_slots': len(time_slots)}
+    if not courses or not rooms or not time_slots:
+        row['error'] = 'The scenario leaves no courses, rooms or time slots to schedule.'
+        return row
+
+    # The scenario's budget starts when a worker takes it up; the sweep's deadline only caps it
+    budget = scenario.get('time_budget')
+    own_end = None if budget is None else time.time() + budget
+    ends_at = [value for value in (deadline, own_end) if value is not None]
+    clock = Deadline(deadline=min(ends_at) if ends_at else None, cancelled=cancelled)
+    try:
+        solution, _ = run_engine(scenario['algorithm'], courses, rooms, time_slots, scenario['parameters'],
+                                 deadline=clock, seed=seed)
+    except Exception as e:
+        row['error'] = f'{type(e).__name__}: {e}'
+        return row
+    stopped_by = solution['progress']['stopped_by']
+    # A run stopped before its own budget was spent is not comparable with the others
+    cut_short = stopped_by == 'cancelled' or (
+        stopped_by == 'deadline' and deadline is not None and (own_end is None or deadline < own_end))
+
+    bound = lower_bound(TimetableProblem(courses, rooms, time_slots))['fitness']
+    assignments = solution['assignments']
+    row.update({
+        'fitness': solution['fitness'],
+        'constraint_violations': solution['constraint_violations'],
+        'lower_bound': bound,
+        'gap': max(0.0, solution['fitness'] - bound),
+        'rooms_used': len({assignment['room_id'] for assignment in assignments}),
+        'time_slots_used': len({assignment['time_slot_id'] for assignment in assignments}),
+        'elapsed_seconds': round(clock.elapsed(), 3),
+        'time_budget': budget,
+        'stopped_by': stopped_by,
+        'valid': not cut_short,
+    })
+    if cut_short:
+        row['invalid_reason'] = (f"Stopped by the sweep after {clock.elapsed():.1f} of its {budget:.1f} seconds."
+                                 if budget is not None and stopped_by == 'deadline' else
+                                 f"Stopped ({stopped_by}) after {clock.elapsed():.1f} seconds.")
+    return row
+
+def scenario_budgets(scenarios: List[Dict], workers: int, time_budget: float = None) -> List[float]:
+    """
+    Solver seconds of each scenario of a sweep. The scenarios run in waves of
+    ``workers``; each wave gets an equal share of time_budget, which caps the
+    budget a scenario asks for and is the budget of those that ask for none.
+    """
+    budgets = [scenario.get('time_budget') for scenario in scenarios]
+    if time_budget is None or not scenarios:
+        return budgets
+    share = time_budget / math.ceil(len(scenarios) / max(1, workers))
+    return [share if budget is None else min(budget, share) for budget in budgets]
+
+class ScenarioSweep:
+    """
+    Batch of what-if scenarios over one base problem.
+
+    Every scenario is a set of overrides on the courses, rooms and time slots
+    of the base problem (see ``apply_overrides``) plus its own engine and
+    parameters. The scenarios are fanned out over a process pool; the base
+    problem is sent to each worker process once, at start-up, and a task
+    carries only the overrides of its scenario. The result is a comparison
+    table, one row per scenario in request order, relative to the first one.
+    """
+
+    def __init__(self, courses, rooms, time_slots, constraints, seed=None, callback=None):
+        self.courses, self.rooms, self.time_slots = snapshot(courses, rooms, time_slots)
+        self.constraints = constraints
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
+
+    def optimize(self, scenarios: List[Dict[str, Any]], workers: int = 2,
+                 deadline=None, time_budget: float = None) -> Tuple[List[Dict], Dict]:
+        """
+        Solve all scenarios and return their comparison rows with the progress report
+
+        Args:
+            scenarios: Dicts with 'name', 'algorithm', 'parameters', optional
+                       'time_budget' and the overrides
+            workers: Processes solving scenarios at once (1 solves them in this process)
+            deadline: Deadline carrying the cancellation flag, optionally with an absolute cap
+            time_budget: Seconds of the whole sweep, shared out by ``scenario_budgets``
+
+        Every scenario gets its full budget from the moment a worker takes it
+        up. The sweep's own deadline leaves room for all waves and only stops
+        runs that overrun; rows stopped before their budget are marked
+        invalid and left out of the comparison.
+        """
+        workers = max(1, min(workers, len(scenarios)))
+        budgets = scenario_budgets(scenarios, workers, time_budget)
+        scenarios = [{**scenario, 'time_budget': budget} for scenario, budget in zip(scenarios, budgets)]
+        clock = Deadline.resolve(deadline)
+        if scenarios and None not in budgets:
+            waves = math.ceil(len(scenarios) / workers)
+            ends_at = time.time() + waves * (max(budgets) + SCENARIO_OVERHEAD)
+            clock = Deadline(deadline=ends_at if clock.deadline is None else min(clock.deadline, ends_at),
+                             cancelled=clock.cancelled)
+        streams = self.rng.spawn(len(scenarios))
+        rows = [None] * len(scenarios)
+
+        def finished(index, row):
+            rows[index] = row
+            done = [row for row in rows if row is not None and 'fitness' in row]
+            best = min((row['fitness'] for row in done), default=float('inf'))
+            self.reporter.update(sum(row is not None for row in rows), best, moves=0,
+                                 force=all(row is not None for row in rows))
+
+        if workers <= 1:
+            for index, scenario in enumerate(scenarios):
+                courses, rooms, time_slots = apply_overrides(self.courses, self.rooms, self.time_slots, scenario)
+                finished(index, solve_scenario(scenario, courses, rooms, time_slots, clock.deadline,
+                                               streams[index], clock.cancelled))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.courses, self.rooms, self.time_slots, clock.cancelled)) as pool:
+                pending = {pool.submit(_run_scenario, (index, scenario, clock.deadline, streams[index]))
+                           for index, scenario in enumerate(scenarios)}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finished(*future.result())
+
+        # Differences to the first scenario, the reference of the comparison, between full runs only
+        reference = rows[0] if rows and rows[0].get('valid') else None
+        for row in rows:
+            if reference is not None and row.get('valid'):
+                row['fitness_change'] = row['fitness'] - reference['fitness']
+                row['violations_change'] = row['constraint_violations'] - reference['constraint_violations']
+
+        solved = sum('fitness' in row for row in rows)
+        self.progress = clock.progress(solved, len(scenarios))
+        if self.progress['stopped_by'] == 'completed' and any(row.get('stopped_by') == 'deadline' for row in rows):
+            self.progress['stopped_by'] = 'deadline'
+        return rows, self.progress
@@ -1,8 +1,11 @@
-import random
 import math
 import copy
 from typing import List, Dict, Tuple, Any
 import json
+from .bounds import fitness_lower_bound
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+from .deadline import Deadline
 
 class SimulatedAnnealing:
     """
@@ -12,11 +15,15 @@ class SimulatedAnnealing:
     accepting worse solutions with decreasing probability as temperature cools.
     """
     
-    def __init__(self, courses, rooms, time_slots, constraints):
+    def __init__(self, courses, rooms, time_slots, constraints, seed=None, callback=None):
         self.courses = courses
         self.rooms = rooms
         self.time_slots = time_slots
         self.constraints = constraints
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
+        self.lower_bound = fitness_lower_bound(courses, rooms, time_slots)
         self.best_solution = None
         self.best_fitness = float('inf')
         
@@ -30,8 +37,8 @@ class SimulatedAnnealing:
         
         # Assign each course to a room and time slot
         for course in self.courses:
-            room = random.choice(self.rooms)
-            time_slot = random.choice(self.time_slots)
+            room = self.rooms[self.rng.integers(len(self.rooms))]
+            time_slot = self.time_slots[self.rng.integers(len(self.time_slots))]
             
             assignment = {
                 'course_id': course.id,
@@ -198,18 +205,18 @@ class SimulatedAnnealing:
         neighbor = copy.deepcopy(current_solution)
         
         # Randomly select an assignment to modify
-        assignment_idx = random.randint(0, len(neighbor['assignments']) - 1)
+        assignment_idx = int(self.rng.integers(len(neighbor['assignments'])))
         assignment = neighbor['assignments'][assignment_idx]
         
         # Randomly choose what to change: room or time slot
-        if random.random() < 0.5:
+        if self.rng.random() < 0.5:
             # Change room
-            new_room = random.choice(self.rooms)
+            new_room = self.rooms[self.rng.integers(len(self.rooms))]
             assignment['room_id'] = new_room.id
             assignment['room_name'] = new_room.name
         else:
             # Change time slot
-            new_time_slot = random.choice(self.time_slots)
+            new_time_slot = self.time_slots[self.rng.integers(len(self.time_slots))]
             assignment['time_slot_id'] = new_time_slot.id
             assignment['day'] = new_time_slot.day
             assignment['start_time'] = str(new_time_slot.start_time)
@@ -230,8 +237,14 @@ class SimulatedAnnealing:
     
     def optimize(self, initial_temperature: float = 1000, cooling_rate: float = 0.95,
                 min_temperature: float = 0.1, iterations_per_temp: int = 100,
-                max_iterations: int = 10000) -> Tuple[Dict, List[float]]:
-        """Main optimization loop using simulated annealing"""
+                max_iterations: int = 10000, deadline=None,
+                time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """Main optimization loop using simulated annealing
+        
+        The deadline (timestamp or Deadline) / time budget in seconds is
+        checked after every move, since each move evaluates a whole timetable.
+        """
+        clock = Deadline.resolve(deadline, time_budget)
         
         # Initialize solution
         current_solution = self._generate_initial_solution()
@@ -248,6 +261,7 @@ class SimulatedAnnealing:
         fitness_history = []
         
         iteration = 0
+        reported = 0
         
         while temperature > min_temperature and iteration < max_iterations:
             # Perform iterations at current temperature
@@ -257,7 +271,7 @@ class SimulatedAnnealing:
                 neighbor_fitness = neighbor['fitness']
                 
                 # Decide whether to accept the neighbor
-                if self._acceptance_probability(current_fitness, neighbor_fitness, temperature) > random.random():
+                if self._acceptance_probability(current_fitness, neighbor_fitness, temperature) > self.rng.random():
                     current_solution = neighbor
                     current_fitness = neighbor_fitness
                     
@@ -270,26 +284,41 @@ class SimulatedAnnealing:
                 fitness_history.append(current_fitness)
                 iteration += 1
                 
-                # Early stopping if perfect solution found
-                if self.best_fitness == 0:
+                # Early stopping once no better solution can exist, or on the deadline
+                if self.best_fitness <= self.lower_bound or clock.expired():
                     break
             
             # Cool down temperature
             temperature *= cooling_rate
+            self.reporter.update(iteration, self.best_fitness, violations=self.best_solution['constraint_violations'],
+                                 moves=iteration - reported)
+            reported = iteration
+            
+            # Early stopping once no better solution can exist
+            if self.best_fitness <= self.lower_bound:
+                break
             
-            # Early stopping if perfect solution found
-            if self.best_fitness == 0:
+            # Stop with the best solution so far once the deadline passes
+            if clock.expired():
                 break
         
+        self.reporter.update(iteration, self.best_fitness, violations=self.best_solution['constraint_violations'],
+                             moves=iteration - reported, force=True)
+        self.progress = clock.progress(iteration, max_iterations, fitness=self.best_fitness,
+                                       lower_bound=self.lower_bound)
+        self.best_solution['progress'] = self.progress
         return self.best_solution, fitness_history
     
     def optimize_with_parameters(self, population_size: int = 50, generations: int = 100,
                                mutation_rate: float = 0.1, temperature: float = 1000,
-                               cooling_rate: float = 0.95) -> Tuple[Dict, List[float]]:
+                               cooling_rate: float = 0.95, deadline=None,
+                               time_budget: float = None) -> Tuple[Dict, List[float]]:
         """Optimize with parameters (compatibility with other algorithms)"""
         return self.optimize(
             initial_temperature=temperature,
             cooling_rate=cooling_rate,
             iterations_per_temp=generations // 10,  # Adjust iterations based on generations
-            max_iterations=generations * 10
+            max_iterations=generations * 10,
+            deadline=deadline,
+            time_budget=time_budget
         )
@@ -0,0 +1,51 @@
+from typing import List, Dict, Tuple
+from .delta_evaluator import TimetableProblem, DeltaEvaluator
+from .bounds import lower_bound
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+
+class SingleSolutionSearch:
+    """
+    Base of the single-solution engines that walk the array representation
+    one random move at a time (late acceptance, great deluge). Subclasses
+    implement optimize() with their acceptance rule.
+    """
+
+    def __init__(self, courses, rooms, time_slots, constraints, seed=None, callback=None):
+        self.courses = courses
+        self.rooms = rooms
+        self.time_slots = time_slots
+        self.constraints = constraints
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
+        self._draws = []
+        self.problem = TimetableProblem(courses, rooms, time_slots)
+        self.lower_bound = lower_bound(self.problem)['fitness']
+        self.best_solution = None
+        self.best_fitness = float('inf')
+
+    def _random_move(self, evaluator: DeltaEvaluator) -> Tuple[int, int, int]:
+        """Move one course to a random room or a random time slot"""
+        # Draw random numbers in blocks, one Generator call per move costs more than the move
+        if not self._draws:
+            self._draws = self.rng.random((1024, 3)).tolist()
+        pick, kind, target = self._draws.pop()
+
+        course = int(pick * self.problem.n_courses)
+        room = evaluator.room_of[course]
+        slot = evaluator.slot_of[course]
+
+        if kind < 0.5:
+            room = int(target * self.problem.n_rooms)
+        else:
+            slot = int(target * self.problem.n_slots)
+
+        return course, room, slot
+
+    def optimize_with_parameters(self, population_size: int = 50, generations: int = 100,
+                               mutation_rate: float = 0.1, temperature: float = 1000,
+                               cooling_rate: float = 0.95, deadline=None,
+                               time_budget: float = 2.0) -> Tuple[Dict, List[float]]:
+        """Optimize with parameters (compatibility with other algorithms)"""
+        return self.optimize(max_iterations=generations * 100, deadline=deadline, time_budget=time_budget)
@@ -0,0 +1,140 @@
+import numpy as np
+from typing import List, Dict, Tuple
+from .delta_evaluator import TimetableProblem, DeltaEvaluator
+from .bounds import lower_bound
+from .rng import new_seed, make_rng
+from .progress import ProgressReporter
+from .deadline import Deadline
+
+class TabuSearch:
+    """
+    Tabu Search implementation for examination timetabling optimization.
+
+    Each iteration scans the full (room, time slot) neighbourhood of the courses
+    that are currently in conflict, takes the best non-tabu move and forbids the
+    moved course from returning to the time slot it left for a number of
+    iterations. Tabu moves are still allowed when they improve on the best
+    solution found so far (aspiration criterion).
+    """
+
+    def __init__(self, courses, rooms, time_slots, constraints, seed=None, callback=None):
+        self.courses = courses
+        self.rooms = rooms
+        self.time_slots = time_slots
+        self.constraints = constraints
+        self.seed = new_seed() if seed is None else seed
+        self.rng = make_rng(self.seed)
+        self.reporter = ProgressReporter.resolve(callback)
+        self.problem = TimetableProblem(courses, rooms, time_slots)
+        self.lower_bound = lower_bound(self.problem)['fitness']
+        self.best_solution = None
+        self.best_fitness = float('inf')
+
+    def _select_candidates(self, evaluator: DeltaEvaluator, candidate_size: int) -> np.ndarray:
+        """Courses whose neighbourhood is scanned in this iteration"""
+        candidates = evaluator.conflicting_courses()
+
+        # Once feasible, keep working on the soft constraints over all courses
+        if len(candidates) == 0:
+            candidates = np.arange(self.problem.n_courses)
+
+        if len(candidates) > candidate_size:
+            candidates = self.rng.choice(candidates, candidate_size, replace=False)
+
+        return candidates
+
+    def _best_move(self, evaluator: DeltaEvaluator, candidates: np.ndarray,
+                   tabu_until: np.ndarray, iteration: int) -> Tuple[int, int, int, float]:
+        """Find the best admissible move over the candidate list"""
+        best_move = None
+        best_delta = float('inf')
+        current_fitness = evaluator.fitness
+
+        for course in candidates:
+            deltas = evaluator.batch_deltas(course)
+
+            # Staying in place is not a move
+            deltas[evaluator.room_of[course], evaluator.slot_of[course]] = np.inf
+
+            # Tabu slots are only admissible if they beat the best known solution
+            tabu = (tabu_until[course] > iteration)[np.newaxis, :]
+            aspiration = current_fitness + deltas < self.best_fitness
+            deltas = np.where(tabu & ~aspiration, np.inf, deltas)
+
+            lowest = deltas.min()
+            if lowest < best_delta:
+                # Break ties randomly to avoid cycling between equal moves
+                ties = np.flatnonzero(deltas == lowest)
+                room, slot = np.unravel_index(self.rng.choice(ties), deltas.shape)
+                best_move = (int(course), int(room), int(slot))
+                best_delta = lowest
+
+        if best_move is None:
+            return None
+        return best_move + (best_delta,)
+
+    def optimize(self, max_iterations: int = 1000, tabu_tenure: int = None,
+                candidate_size: int = 50, deadline=None,
+                time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """Main optimization loop using tabu search"""
+        clock = Deadline.resolve(deadline, time_budget)
+
+        problem = self.problem
+        if tabu_tenure is None:
+            tabu_tenure = min(20, 5 + problem.n_courses // 10)
+
+        # Initialize solution
+        evaluator = DeltaEvaluator(problem, *problem.random_solution(self.rng))
+        best_rooms, best_slots = evaluator.solution()
+        self.best_fitness = evaluator.fitness
+        best_violations = evaluator.violations
+
+        # Iteration until which each (course, time slot) pair is tabu
+        tabu_until = np.zeros((problem.n_courses, problem.n_slots), dtype=np.int64)
+
+        fitness_history = []
+        iterations_completed = 0
+
+        for iteration in range(max_iterations):
+            candidates = self._select_candidates(evaluator, candidate_size)
+            move = self._best_move(evaluator, candidates, tabu_until, iteration)
+
+            if move is not None:
+                course, room, slot, _ = move
+                old_slot = evaluator.slot_of[course]
+                evaluator.apply_move(course, room, slot)
+                tabu_until[course, old_slot] = iteration + tabu_tenure
+
+                # Update best solution if necessary
+                if evaluator.fitness < self.best_fitness:
+                    best_rooms, best_slots = evaluator.solution()
+                    self.best_fitness = evaluator.fitness
+                    best_violations = evaluator.violations
+
+            # Record fitness
+            fitness_history.append(evaluator.fitness)
+            iterations_completed += 1
+            self.reporter.update(iterations_completed, self.best_fitness, violations=best_violations,
+                                 moves=len(candidates) * problem.n_rooms * problem.n_slots)
+
+            # Early stopping once no better solution can exist
+            if self.best_fitness <= self.lower_bound:
+                break
+
+            # Each iteration scans a whole neighbourhood, so check the deadline every time
+            if clock.expired():
+                break
+
+        self.reporter.update(iterations_completed, self.best_fitness, violations=best_violations, moves=0, force=True)
+        self.best_solution = problem.to_timetable(best_rooms, best_slots, self.best_fitness, best_violations)
+        self.progress = clock.progress(iterations_completed, max_iterations, fitness=self.best_fitness,
+                                       lower_bound=self.lower_bound)
+        self.best_solution['progress'] = self.progress
+        return self.best_solution, fitness_history
+
+    def optimize_with_parameters(self, population_size: int = 50, generations: int = 100,
+                               mutation_rate: float = 0.1, temperature: float = 1000,
+                               cooling_rate: float = 0.95, deadline=None,
+                               time_budget: float = None) -> Tuple[Dict, List[float]]:
+        """Optimize with parameters (compatibility with other algorithms)"""
+        return self.optimize(max_iterations=generations * 10, deadline=deadline, time_budget=time_budget)
@@ -0,0 +1,186 @@
+import os
+import json
+import random
+from typing import List, Dict, Tuple, Any
+from .delta_evaluator import TimetableProblem
+from .portfolio import run_engine
+
+# Tuned profiles shipped with the package, written by tune.py
+PROFILES_PATH = os.path.join(os.path.dirname(__file__), 'tuning_profiles.json')
+
+# Search ranges of the dashboard parameters: (low, high, type)
+PARAMETER_SPACE = {
+    'population_size': (10, 200, int),
+    'generations': (20, 500, int),
+    'mutation_rate': (0.01, 0.5, float),
+    'temperature': (100, 10000, float),
+    'cooling_rate': (0.8, 0.99, float),
+}
+
+# Parameters each engine actually reads
+TUNED_PARAMETERS = {
+    'genetic': ('population_size', 'generations', 'mutation_rate'),
+    'simulated_annealing': ('generations', 'temperature', 'cooling_rate'),
+    'hybrid': ('population_size', 'generations', 'mutation_rate', 'temperature', 'cooling_rate'),
+    'memetic': ('population_size', 'generations', 'mutation_rate'),
+}
+
+# Values the dashboard falls back to, always raced as one of the configurations
+DEFAULT_PARAMETERS = {
+    'population_size': 50,
+    'generations': 100,
+    'mutation_rate': 0.1,
+    'temperature': 1000,
+    'cooling_rate': 0.95,
+}
+
+_profiles_cache = {}
+
+def instance_features(courses, rooms, time_slots) -> Dict[str, float]:
+    """
+    Features used to group instances into classes.
+
+    conflict_density is the number of courses per distinct (day, start) time,
+    above 1 some clashes are unavoidable; room_slack is the number of
+    (room, time) places available per course.
+    """
+    problem = TimetableProblem(courses, rooms, time_slots)
+    n_courses = max(1, problem.n_courses)
+    return {
+        'courses': problem.n_courses,
+        'conflict_density': round(problem.n_courses / max(1, problem.n_time_keys), 3),
+        'room_slack': round(problem.n_rooms * problem.n_time_keys / n_courses, 3),
+    }
+
+def instance_class(features: Dict[str, float]) -> str:
+    """Bucket instance features into a profile key such as 'small-sparse-loose'"""
+    if features['courses'] <= 50:
+        size = 'small'
+    elif features['courses'] <= 150:
+        size = 'medium'
+    else:
+        size = 'large'
+    density = 'sparse' if features['conflict_density'] <= 1 else 'dense'
+    slack = 'loose' if features['room_slack'] >= 2 else 'tight'
+    return f"{size}-{density}-{slack}"
+
+def sample_configuration(algorithm: str, rng: random.Random) -> Dict[str, Any]:
+    """Draw a random configuration of the parameters the engine reads"""
+    configuration = dict(DEFAULT_PARAMETERS)
+    for name in TUNED_PARAMETERS[algorithm]:
+        low, high, kind = PARAMETER_SPACE[name]
+        if kind is int:
+            configuration[name] = rng.randint(low, high)
+        else:
+            configuration[name] = round(rng.uniform(low, high), 3)
+    return configuration
+
+def run_configuration(algorithm: str, courses, rooms, time_slots, parameters: Dict[str, Any],
+                      time_budget: float, seed=None) -> Dict:
+    """Run one engine with the given dashboard parameters and return its best solution"""
+    solution, _ = run_engine(algorithm, courses, rooms, time_slots, parameters, time_budget=time_budget,
+                             seed=seed)
+    return solution
+
+def _mean_ranks(scores: List[List[Tuple[float, float]]]) -> List[float]:
+    """Mean rank of each configuration over the instances (lower is better)"""
+    ranks = [0.0] * len(scores)
+    for instance in range(len(scores[0])):
+        order = sorted(range(len(scores)), key=lambda c: scores[c][instance])
+        for rank, configuration in enumerate(order):
+            ranks[configuration] += rank / len(scores[0])
+    return ranks
+
+def successive_halving(algorithm: str, instances: List[Tuple[List, List, List]], configurations: int = 8,
+                       min_budget: float = 0.25, eta: int = 2, seed: int = 0) -> Tuple[Dict[str, Any], float]:
+    """
+    Race random configurations on the instances with successive halving.
+
+    Every surviving configuration runs on every instance with the same time
+    budget; configurations are ranked per instance by best fitness, then by
+    runtime, the best 1/eta by mean rank survive and the budget grows by eta.
+    Returns the winning configuration and the fitness it reached on the final
+    rung, averaged over the instances.
+    """
+    rng = random.Random(seed)
+    candidates = [dict(DEFAULT_PARAMETERS)]
+    candidates += [sample_configuration(algorithm, rng) for _ in range(configurations - 1)]
+    budget = min_budget
+
+    while True:
+        scores = []
+        for parameters in candidates:
+            results = []
+            for courses, rooms, time_slots in instances:
+                solution = run_configuration(algorithm, courses, rooms, time_slots, parameters, budget, seed)
+                results.append((solution['fitness'], solution['progress']['elapsed_seconds']))
+            scores.append(results)
+
+        ranks = _mean_ranks(scores)
+        order = sorted(range(len(candidates)), key=lambda c: ranks[c])
+        if len(candidates) == 1:
+            mean_fitness = sum(fitness for fitness, _ in scores[0]) / len(scores[0])
+            return candidates[0], mean_fitness
+
+        candidates = [candidates[c] for c in order[:max(1, len(candidates) // eta)]]
+        budget *= eta
+
+def tune(algorithms: List[str], instances: List[Tuple[List, List, List]], configurations: int = 8,
+         min_budget: float = 0.25, seed: int = 0) -> Dict[str, Dict[str, Dict]]:
+    """Tune every algorithm separately for each class of the given instances"""
+    classes = {}
+    for instance in instances:
+        features = instance_features(*instance)
+        classes.setdefault(instance_class(features), []).append((instance, features))
+
+    profiles = {}
+    for algorithm in algorithms:
+        profiles[algorithm] = {}
+        for key, members in classes.items():
+            parameters, fitness = successive_halving(algorithm, [instance for instance, _ in members],
+                                                     configurations, min_budget, seed=seed)
+            profiles[algorithm][key] = {
+                'parameters': parameters,
+                'features': {name: round(sum(features[name] for _, features in members) / len(members), 3)
+                             for name in members[0][1]},
+                'fitness': fitness,
+            }
+    return profiles
+
+def save_profiles(profiles: Dict, path: str = PROFILES_PATH):
+    """Write tuned profiles as JSON"""
+    with open(path, 'w') as f:
+        json.dump(profiles, f, indent=2, sort_keys=True)
+    _profiles_cache.pop(path, None)
+
+def load_profiles(path: str = PROFILES_PATH) -> Dict:
+    """Tuned profiles, read once per process (empty if none were generated)"""
+    if path not in _profiles_cache:
+        try:
+            with open(path) as f:
+                _profiles_cache[path] = json.load(f)
+        except (OSError, ValueError):
+            _profiles_cache[path] = {}
+    return _profiles_cache[path]
+
+def select_profile(algorithm: str, courses, rooms, time_slots, profiles: Dict = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Pick the tuned parameters for an instance.
+
+    Uses the profile of the instance's class, or the profile whose features
+    are closest when that class was not tuned. Returns (None, None) for
+    engines without tuned profiles.
+    """
+    candidates = (load_profiles() if profiles is None else profiles).get(algorithm)
+    if not candidates:
+        return None, None
+
+    features = instance_features(courses, rooms, time_slots)
+    key = instance_class(features)
+    if key not in candidates:
+        def distance(profile_key):
+            tuned = candidates[profile_key]['features']
+            return sum(abs(features[name] - tuned[name]) / max(abs(tuned[name]), 1e-9) for name in features)
+        key = min(candidates, key=distance)
+
+    return key, dict(candidates[key]['parameters'])
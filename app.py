@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, make_response, send_file
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, make_response, send_file, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -9,7 +9,18 @@ import json
 import csv
 import io
 import tempfile
+from collections.abc import Mapping
 from config import Config
+from algorithms.rng import parse_seed
+from algorithms.progress import ProgressReporter
+from algorithms.deadline import Deadline, parse_time_budget
+import jobs
+import timetable_codec
+from timetable_api import (timetable_page, strong_etag, not_modified, cached_response, requested_fields,
+                           field_value, list_response)
+from problem_snapshot import ProblemSnapshot, SnapshotCache
+import shared_cache
+import migrate
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -20,7 +31,15 @@ login_manager.init_app(app)
 login_manager.login_view = 'login'
 
 # Import models after db initialization
-from models import User, Course, Room, TimeSlot, Exam, Constraint, Timetable
+from models import User, Course, Room, TimeSlot, Exam, Constraint, Timetable, StudentCourse, OptimizationJob, OptimizationJobEvent, ProblemVersion
+
+# Problem snapshots, built once per deployment with a shared cache tier and dropped whenever courses, rooms, slots, constraints or enrollments change
+snapshot_cache = SnapshotCache(ProblemVersion, shared=shared_cache.shared_tier(app.config['CACHE_URL'], app.config['SECRET_KEY']))
+snapshot_cache.watch(Course, Room, TimeSlot, Constraint, StudentCourse)
+
+# Tables, columns and indexes of the models before the first request (gunicorn imports the app in every worker)
+with app.app_context():
+    migrate.upgrade(db)
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -115,8 +134,9 @@ def manage_courses():
         code = request.form.get('code')
         students = int(request.form.get('students', 0))
         duration = int(request.form.get('duration', 120))
+        program = request.form.get('program') or 'General'
         
-        course = Course(name=name, code=code, students=students, duration=duration)
+        course = Course(name=name, code=code, students=students, duration=duration, program=program)
         db.session.add(course)
         db.session.commit()
         flash('Course added successfully!')
@@ -205,59 +225,52 @@ def manage_constraints():
 @app.route('/optimize', methods=['POST'])
 @login_required
 def optimize_timetable():
-    """Run the optimization algorithms"""
+    """Queue an optimization run for the job workers; poll /jobs/<id> for the result"""
     try:
         # Get parameters from request
-        algorithm = request.form.get('algorithm', 'hybrid')
-        population_size = int(request.form.get('population_size', 50))
-        generations = int(request.form.get('generations', 100))
-        mutation_rate = float(request.form.get('mutation_rate', 0.1))
-        temperature = float(request.form.get('temperature', 1000))
-        cooling_rate = float(request.form.get('cooling_rate', 0.95))
-        
-        # Get data from database
-        courses = Course.query.all()
-        rooms = Room.query.all()
-        time_slots = TimeSlot.query.all()
-        constraints = Constraint.query.all()
-        
-        # Import algorithms here to avoid circular imports
-        if algorithm == 'genetic':
-            from algorithms.genetic_algorithm import GeneticAlgorithm
-            optimizer = GeneticAlgorithm(courses, rooms, time_slots, constraints)
-        elif algorithm == 'simulated_annealing':
-            from algorithms.simulated_annealing import SimulatedAnnealing
-            optimizer = SimulatedAnnealing(courses, rooms, time_slots, constraints)
-        else:
-            from algorithms.hybrid_optimizer import HybridOptimizer
-            optimizer = HybridOptimizer(courses, rooms, time_slots, constraints)
-        
-        # Run optimization
-        best_timetable, fitness_history = optimizer.optimize(
-            population_size=population_size,
-            generations=generations,
-            mutation_rate=mutation_rate,
-            temperature=temperature,
-            cooling_rate=cooling_rate
-        )
-        
-        # Save best timetable to database
-        timetable = Timetable(
-            data=json.dumps(best_timetable),
-            fitness_score=best_timetable['fitness'],
-            algorithm_used=algorithm,
-            created_by=current_user.id,
-            created_at=datetime.utcnow()
-        )
-        db.session.add(timetable)
-        db.session.commit()
-        
+        parameters = {
+            'algorithm': request.form.get('algorithm', 'hybrid'),
+            'population_size': int(request.form.get('population_size', 50)),
+            'generations': int(request.form.get('generations', 100)),
+            'mutation_rate': float(request.form.get('mutation_rate', 0.1)),
+            'temperature': float(request.form.get('temperature', 1000)),
+            'cooling_rate': float(request.form.get('cooling_rate', 0.95)),
+            'time_budget': parse_time_budget(request.form.get('time_budget'), app.config['OPTIMIZATION_TIME_BUDGET']),
+            'parameter_profile': request.form.get('parameter_profile', 'manual'),
+            'seed': parse_seed(request.form.get('seed'))
+        }
+        
+        pending = OptimizationJob.query.filter(OptimizationJob.created_by == current_user.id,
+                                               OptimizationJob.status.in_((jobs.QUEUED, jobs.RUNNING))).count()
+        if pending >= app.config['OPTIMIZATION_MAX_PENDING_PER_USER']:
+            return jsonify({
+                'success': False,
+                'error': f'You already have {pending} optimization runs queued or running.'
+            }), 429
+        
+        # Identical requests reuse a stored result or join the run already under way
+        priority = request.form.get('priority', 'interactive')
+        key = optimization_request_key(parameters, explicit_seed=bool(request.form.get('seed')))
+        job = jobs.enqueue(db, OptimizationJob, parameters, current_user.id, priority,
+                           key=key, reusable=reusable_result)
         return jsonify({
             'success': True,
-            'timetable': best_timetable,
-            'fitness_history': fitness_history,
-            'message': 'Optimization completed successfully!'
-        })
+            'job_id': job.id,
+            'status': job.status,
+            'cached': job.status == jobs.SUCCEEDED,
+            'merged': job.follows is not None and job.status != jobs.SUCCEEDED,
+            'priority': priority,
+            'queue_position': jobs.queue_position(db, OptimizationJob, job),
+            'status_url': url_for('optimization_job_status', job_id=job.id),
+            'seed': json.loads(db.session.get(OptimizationJob, job.follows).parameters)['seed']
+                    if job.follows else parameters['seed']
+        }), 202
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
         
     except Exception as e:
         return jsonify({
@@ -265,34 +278,265 @@ def optimize_timetable():
             'error': str(e)
         }), 500
 
+@app.route('/jobs/<job_id>')
+@login_required
+def optimization_job_status(job_id):
+    """Poll a queued optimization run"""
+    job = OptimizationJob.query.get_or_404(job_id)
+    if job.created_by != current_user.id and current_user.role != 'admin':
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify(jobs.job_status(job, jobs.queue_position(db, OptimizationJob, job)))
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_optimization_job(job_id):
+    """Cancel a queued run, or stop a running one at its next check"""
+    job = OptimizationJob.query.get_or_404(job_id)
+    if job.created_by != current_user.id and current_user.role != 'admin':
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if not jobs.request_cancel(db, OptimizationJob, job_id):
+        return jsonify({'success': False, 'error': 'The optimization run has already finished.'}), 409
+    db.session.refresh(job)
+    return jsonify(jobs.job_status(job))
+
+@app.route('/jobs/<job_id>/events')
+@login_required
+def optimization_job_events(job_id):
+    """Live progress of an optimization run as Server-Sent Events"""
+    job = OptimizationJob.query.get_or_404(job_id)
+    if job.created_by != current_user.id and current_user.role != 'admin':
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    last_event_id = int(request.headers.get('Last-Event-ID') or request.args.get('after') or 0)
+    stream = jobs.stream_events(db, OptimizationJob, OptimizationJobEvent, job_id, last_event_id,
+                                max_seconds=app.config['PROGRESS_STREAM_SECONDS'], events_of=job.follows)
+    return Response(stream_with_context(stream), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def problem_snapshot():
+    """Courses, rooms, time slots, active constraints and enrollments as a cached ProblemSnapshot"""
+    def build():
+        return ProblemSnapshot.from_database(db, Course, Room, TimeSlot, Constraint, enrollment_model=StudentCourse)
+    return snapshot_cache.get(db, 'all', build)
+
+def optimization_request_key(parameters, explicit_seed):
+    """
+    Content address of an optimization request: the problem data the run
+    reads, the algorithm and its parameters (the seed only when chosen)
+    """
+    return jobs.request_key({
+        'problem': problem_snapshot().digest,
+        'parameters': {name: value for name, value in parameters.items() if name != 'seed' or explicit_seed},
+    })
+
+def reusable_result(result):
+    """A stored result can answer a new request when its run was not cut short and its timetable still exists"""
+    return (result.get('progress', {}).get('stopped_by') in ('completed', 'optimal')
+            and db.session.get(Timetable, result.get('timetable_id')) is not None)
+
+def process_optimization_job(parameters, job, cancelled):
+    """Job worker handler: run the queued optimization, publishing its progress events, and return its response"""
+    return run_optimization(parameters, job.created_by,
+                            callback=lambda event: jobs.publish_event(db, OptimizationJobEvent, job.id, event),
+                            cancelled=cancelled)
+
+def job_worker(**kwargs):
+    """Entry point of an optimization worker process (see worker.py)"""
+    return jobs.run_worker(app, db, OptimizationJob, process_optimization_job,
+                           max_runtime=2 * app.config['OPTIMIZATION_TIME_BUDGET'] + 60,
+                           max_running=app.config['OPTIMIZATION_MAX_RUNNING'],
+                           max_running_per_user=app.config['OPTIMIZATION_MAX_RUNNING_PER_USER'],
+                           event_model=OptimizationJobEvent, **kwargs)
+
+def run_optimization(parameters, user_id, callback=None, cancelled=None):
+    """Run the optimization algorithms, passing progress events to callback; the cancelled flag stops them early"""
+    algorithm = parameters['algorithm']
+    population_size = parameters['population_size']
+    generations = parameters['generations']
+    mutation_rate = parameters['mutation_rate']
+    temperature = parameters['temperature']
+    cooling_rate = parameters['cooling_rate']
+    time_budget = parameters['time_budget']
+    seed = parameters['seed']
+    
+    # Plain records of the data, cached until it changes; the engines never touch the ORM
+    snapshot = problem_snapshot()
+    courses, rooms, time_slots = snapshot.courses, snapshot.rooms, snapshot.time_slots
+    constraints = list(snapshot.constraints)
+    
+    # Use the offline-tuned parameters for this class of instance when requested
+    if parameters['parameter_profile'] == 'auto':
+        from algorithms.tuning import select_profile
+        _, tuned = select_profile(algorithm, courses, rooms, time_slots)
+        if tuned:
+            population_size = tuned['population_size']
+            generations = tuned['generations']
+            mutation_rate = tuned['mutation_rate']
+            temperature = tuned['temperature']
+            cooling_rate = tuned['cooling_rate']
+    
+    # The published events are also the convergence curve of the result
+    events = []
+    def record(event):
+        events.append(event)
+        if callback:
+            callback(event)
+    reporter = ProgressReporter(record, app.config['PROGRESS_INTERVAL'])
+    
+    # Import algorithms here to avoid circular imports
+    if algorithm == 'genetic':
+        from algorithms.genetic_algorithm import GeneticAlgorithm
+        optimizer = GeneticAlgorithm(courses, rooms, time_slots, constraints, seed=seed, callback=reporter)
+    elif algorithm == 'simulated_annealing':
+        from algorithms.simulated_annealing import SimulatedAnnealing
+        optimizer = SimulatedAnnealing(courses, rooms, time_slots, constraints, seed=seed, callback=reporter)
+    elif algorithm == 'tabu':
+        from algorithms.tabu_search import TabuSearch
+        optimizer = TabuSearch(courses, rooms, time_slots, constraints, seed=seed, callback=reporter)
+    elif algorithm == 'late_acceptance':
+        from algorithms.late_acceptance import LateAcceptanceHillClimbing
+        optimizer = LateAcceptanceHillClimbing(courses, rooms, time_slots, constraints, seed=seed, callback=reporter)
+    elif algorithm == 'great_deluge':
+        from algorithms.great_deluge import GreatDeluge
+        optimizer = GreatDeluge(courses, rooms, time_slots, constraints, seed=seed, callback=reporter)
+    elif algorithm == 'memetic':
+        from algorithms.memetic_algorithm import MemeticAlgorithm
+        optimizer = MemeticAlgorithm(courses, rooms, time_slots, constraints, seed=seed, callback=reporter)
+    elif algorithm == 'portfolio':
+        from algorithms.portfolio import PortfolioSolver
+        optimizer = PortfolioSolver(courses, rooms, time_slots, constraints, seed=seed, callback=reporter)
+    elif algorithm == 'decomposition':
+        from algorithms.decomposition import DecompositionSolver
+        # Split along the student conflict graph when enrollments are recorded
+        optimizer = DecompositionSolver(courses, rooms, time_slots, constraints, enrollments=snapshot.enrollments,
+                                        seed=seed, callback=reporter)
+    elif algorithm == 'exact':
+        from algorithms.exact import ExactSolver
+        optimizer = ExactSolver(courses, rooms, time_slots, constraints, seed=seed, callback=reporter)
+    else:
+        from algorithms.hybrid_optimizer import HybridOptimizer
+        optimizer = HybridOptimizer(courses, rooms, time_slots, constraints, seed=seed, callback=reporter)
+    
+    # Run optimization
+    if algorithm in ('tabu', 'late_acceptance', 'great_deluge', 'memetic', 'portfolio', 'decomposition', 'exact'):
+        best_timetable, fitness_history = optimizer.optimize_with_parameters(
+            population_size=population_size,
+            generations=generations,
+            mutation_rate=mutation_rate,
+            deadline=Deadline(time_budget=time_budget, cancelled=cancelled)
+        )
+    else:
+        best_timetable, fitness_history = optimizer.optimize(
+            population_size=population_size,
+            generations=generations,
+            mutation_rate=mutation_rate,
+            temperature=temperature,
+            cooling_rate=cooling_rate,
+            deadline=Deadline(time_budget=time_budget, cancelled=cancelled)
+        )
+    
+    # Save best timetable to database
+    timetable = Timetable(
+        data=timetable_codec.encode(best_timetable),
+        fitness_score=best_timetable['fitness'],
+        algorithm_used=algorithm,
+        seed=seed,
+        created_by=user_id,
+        created_at=datetime.utcnow()
+    )
+    db.session.add(timetable)
+    db.session.commit()
+    
+    return {
+        'success': True,
+        'timetable': best_timetable,
+        'fitness_history': fitness_history,
+        'progress_events': events,
+        'progress': best_timetable.get('progress'),
+        'timetable_id': timetable.id,
+        'winner': best_timetable.get('winner'),
+        'seed': seed,
+        'message': 'Optimization completed successfully!'
+    }
+
+# Timetable columns of the API, in response order; ?fields= selects a subset
+TIMETABLE_FIELDS = ('id', 'name', 'algorithm_used', 'fitness_score', 'status', 'created_by', 'seed', 'created_at',
+                    'updated_at')
+
 @app.route('/timetables')
 @login_required
 def view_timetables():
-    """View all generated timetables"""
-    timetables = Timetable.query.order_by(Timetable.created_at.desc()).all()
-    return render_template('timetables.html', timetables=timetables)
+    """View generated timetables, newest first, one page at a time"""
+    after = request.args.get('after', type=int)
+    timetables, next_after = timetable_page(db, Timetable, after, app.config['TIMETABLES_PAGE_SIZE'],
+                                            ('name', 'algorithm_used', 'fitness_score'))
+    return render_template('timetables.html', timetables=timetables, next_after=next_after, after=after)
+
+@app.route('/api/timetables')
+@login_required
+def api_timetables():
+    """
+    JSON list of timetables, newest first. ?limit= (1-200) rows per page,
+    ?after= the cursor of the next page (given in 'next' and the Link
+    header), ?fields= a comma-separated subset of TIMETABLE_FIELDS.
+    """
+    return list_response(db, Timetable, TIMETABLE_FIELDS, app.config['TIMETABLES_PAGE_SIZE'])
+
+@app.route('/api/timetables/<int:timetable_id>')
+@login_required
+def api_timetable(timetable_id):
+    """JSON view of one timetable: ?fields= as for the list, ?include=entries adds its exam assignments"""
+    try:
+        fields = requested_fields(TIMETABLE_FIELDS)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    include_entries = 'entries' in request.args.get('include', '').split(',')
+    
+    updated_at = db.session.query(Timetable.updated_at).filter(Timetable.id == timetable_id).first()
+    if updated_at is None:
+        return jsonify({'success': False, 'error': 'Timetable not found'}), 404
+    # Entries show course, room and slot details, so their edits change the representation too
+    version = snapshot_cache.current_version(db) if include_entries else None
+    etag = strong_etag('detail', timetable_id, updated_at[0], fields, include_entries, version)
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+    
+    row = db.session.query(*[getattr(Timetable, name) for name in fields]).filter(Timetable.id == timetable_id).one()
+    payload = {name: field_value(row, name) for name in fields}
+    if include_entries:
+        data = db.session.query(Timetable.data).filter(Timetable.id == timetable_id).scalar()
+        entries = schedule_entries(timetable_codec.decode(data))
+        entries.sort(key=lambda entry: (entry['time_slot'].day, entry['time_slot'].start_time, entry['room'].name))
+        payload['entries'] = [{
+            'course_id': entry['course'].id, 'course_code': entry['course'].code, 'course_name': entry['course'].name,
+            'room_id': entry['room'].id, 'room_name': entry['room'].name,
+            'time_slot_id': entry['time_slot'].id, 'day': entry['time_slot'].day,
+            'start_time': entry['time_slot'].start_time.strftime('%H:%M'),
+            'end_time': entry['time_slot'].end_time.strftime('%H:%M')
+        } for entry in entries]
+    return cached_response(jsonify(payload), etag)
+
+def schedule_entries(timetable_data):
+    """Course, room and time slot rows of every exam of a stored timetable, with one query per table"""
+    course_ids, room_ids, slot_ids = timetable_codec.assignment_ids(timetable_data)
+    courses = {course.id: course for course in Course.query.filter(Course.id.in_(set(course_ids.tolist())))}
+    rooms = {room.id: room for room in Room.query.filter(Room.id.in_(set(room_ids.tolist())))}
+    time_slots = {slot.id: slot for slot in TimeSlot.query.filter(TimeSlot.id.in_(set(slot_ids.tolist())))}
+    
+    entries = []
+    for course_id, room_id, slot_id in zip(course_ids.tolist(), room_ids.tolist(), slot_ids.tolist()):
+        course, room, time_slot = courses.get(course_id), rooms.get(room_id), time_slots.get(slot_id)
+        if course and room and time_slot:
+            entries.append({'course': course, 'room': room, 'time_slot': time_slot})
+    return entries
 
 @app.route('/timetable/<int:timetable_id>')
 @login_required
 def view_timetable(timetable_id):
     """View a specific timetable"""
     timetable = Timetable.query.get_or_404(timetable_id)
-    timetable_data = json.loads(timetable.data)
-    
-    # Parse the timetable entries for display
-    entries = []
-    if 'schedule' in timetable_data:
-        for entry in timetable_data['schedule']:
-            course = Course.query.get(entry.get('course_id'))
-            room = Room.query.get(entry.get('room_id'))
-            time_slot = TimeSlot.query.get(entry.get('time_slot_id'))
-            
-            if course and room and time_slot:
-                entries.append({
-                    'course': course,
-                    'room': room,
-                    'time_slot': time_slot
-                })
+    timetable_data = timetable_codec.decode(timetable.data)
+    entries = schedule_entries(timetable_data)
     
     return render_template('timetable_detail.html', timetable=timetable, data=timetable_data, entries=entries)
 
@@ -305,11 +549,11 @@ def export_timetable(timetable_id):
     
     try:
         # Parse timetable data
-        timetable_data = json.loads(timetable.data)
+        timetable_data = timetable_codec.decode(timetable.data)
         
         # Debug logging
         print(f"Exporting timetable {timetable_id} in format {format_type}")
-        print(f"Timetable data keys: {timetable_data.keys() if isinstance(timetable_data, dict) else 'Not a dict'}")
+        print(f"Timetable data keys: {timetable_data.keys() if isinstance(timetable_data, Mapping) else 'Not a dict'}")
         
         if format_type.lower() == 'csv':
             return export_to_csv(timetable, timetable_data)
@@ -345,26 +589,20 @@ def export_to_csv(timetable, timetable_data):
     schedule_written = False
     
     # Try different possible data structures
-    if isinstance(timetable_data, dict):
-        if 'schedule' in timetable_data and isinstance(timetable_data['schedule'], list):
-            for entry in timetable_data['schedule']:
-                if isinstance(entry, dict):
-                    course = Course.query.get(entry.get('course_id'))
-                    room = Room.query.get(entry.get('room_id'))
-                    time_slot = TimeSlot.query.get(entry.get('time_slot_id'))
-                    
-                    if course and room and time_slot:
-                        writer.writerow([
-                            time_slot.day,
-                            f"{time_slot.start_time.strftime('%H:%M')} - {time_slot.end_time.strftime('%H:%M')}",
-                            course.code,
-                            course.name,
-                            room.name,
-                            room.building,
-                            course.students,
-                            course.duration
-                        ])
-                        schedule_written = True
+    if isinstance(timetable_data, Mapping):
+        for entry in schedule_entries(timetable_data):
+            course, room, time_slot = entry['course'], entry['room'], entry['time_slot']
+            writer.writerow([
+                time_slot.day,
+                f"{time_slot.start_time.strftime('%H:%M')} - {time_slot.end_time.strftime('%H:%M')}",
+                course.code,
+                course.name,
+                room.name,
+                room.building,
+                course.students,
+                course.duration
+            ])
+            schedule_written = True
         
         # If no schedule found, try to export available courses, rooms, and time slots
         if not schedule_written:
@@ -437,24 +675,19 @@ def export_to_excel(timetable, timetable_data):
         row = 9
         schedule_written = False
         
-        if isinstance(timetable_data, dict) and 'schedule' in timetable_data and isinstance(timetable_data['schedule'], list):
-            for entry in timetable_data['schedule']:
-                if isinstance(entry, dict):
-                    course = Course.query.get(entry.get('course_id'))
-                    room = Room.query.get(entry.get('room_id'))
-                    time_slot = TimeSlot.query.get(entry.get('time_slot_id'))
-                    
-                    if course and room and time_slot:
-                        ws.cell(row=row, column=1, value=time_slot.day)
-                        ws.cell(row=row, column=2, value=f"{time_slot.start_time.strftime('%H:%M')} - {time_slot.end_time.strftime('%H:%M')}")
-                        ws.cell(row=row, column=3, value=course.code)
-                        ws.cell(row=row, column=4, value=course.name)
-                        ws.cell(row=row, column=5, value=room.name)
-                        ws.cell(row=row, column=6, value=room.building)
-                        ws.cell(row=row, column=7, value=course.students)
-                        ws.cell(row=row, column=8, value=course.duration)
-                        row += 1
-                        schedule_written = True
+        if isinstance(timetable_data, Mapping):
+            for entry in schedule_entries(timetable_data):
+                course, room, time_slot = entry['course'], entry['room'], entry['time_slot']
+                ws.cell(row=row, column=1, value=time_slot.day)
+                ws.cell(row=row, column=2, value=f"{time_slot.start_time.strftime('%H:%M')} - {time_slot.end_time.strftime('%H:%M')}")
+                ws.cell(row=row, column=3, value=course.code)
+                ws.cell(row=row, column=4, value=course.name)
+                ws.cell(row=row, column=5, value=room.name)
+                ws.cell(row=row, column=6, value=room.building)
+                ws.cell(row=row, column=7, value=course.students)
+                ws.cell(row=row, column=8, value=course.duration)
+                row += 1
+                schedule_written = True
         
         # If no schedule data, add available courses
         if not schedule_written:
@@ -555,24 +788,19 @@ def export_to_pdf(timetable, timetable_data):
         schedule_data = [['Day', 'Time', 'Course', 'Room', 'Building', 'Students', 'Duration']]
         
         schedule_written = False
-        if isinstance(timetable_data, dict) and 'schedule' in timetable_data and isinstance(timetable_data['schedule'], list):
-            for entry in timetable_data['schedule']:
-                if isinstance(entry, dict):
-                    course = Course.query.get(entry.get('course_id'))
-                    room = Room.query.get(entry.get('room_id'))
-                    time_slot = TimeSlot.query.get(entry.get('time_slot_id'))
-                    
-                    if course and room and time_slot:
-                        schedule_data.append([
-                            time_slot.day,
-                            f"{time_slot.start_time.strftime('%H:%M')}-{time_slot.end_time.strftime('%H:%M')}",
-                            f"{course.code}\n{course.name}",
-                            room.name,
-                            room.building,
-                            str(course.students),
-                            f"{course.duration}m"
-                        ])
-                        schedule_written = True
+        if isinstance(timetable_data, Mapping):
+            for entry in schedule_entries(timetable_data):
+                course, room, time_slot = entry['course'], entry['room'], entry['time_slot']
+                schedule_data.append([
+                    time_slot.day,
+                    f"{time_slot.start_time.strftime('%H:%M')}-{time_slot.end_time.strftime('%H:%M')}",
+                    f"{course.code}\n{course.name}",
+                    room.name,
+                    room.building,
+                    str(course.students),
+                    f"{course.duration}m"
+                ])
+                schedule_written = True
         
         # If no schedule data, add available courses
         if not schedule_written:
@@ -678,35 +906,5 @@ def test_export():
     except Exception as e:
         return jsonify({'error': f'Test export failed: {str(e)}'}), 500
 
-@app.route('/export/<int:timetable_id>')
-@login_required
-def export_timetable(timetable_id):
-    timetable = Timetable.query.get_or_404(timetable_id)
-    format_type = request.args.get('format', 'csv')
-    
-    print(f"Export request: timetable_id={timetable_id}, format={format_type}")
-    
-    try:
-        timetable_data = json.loads(timetable.data) if timetable.data else {}
-        print(f"Timetable data loaded: {type(timetable_data)}")
-        
-        if format_type.lower() == 'csv':
-            return export_to_csv(timetable, timetable_data)
-        elif format_type.lower() == 'excel':
-            return export_to_excel(timetable, timetable_data)
-        elif format_type.lower() == 'pdf':
-            print("Attempting PDF export...")
-            return export_to_pdf(timetable, timetable_data)
-        else:
-            return jsonify({'error': 'Unsupported format. Use csv, excel, or pdf'}), 400
-            
-    except Exception as e:
-        print(f"Export route error: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': f'Export failed: {str(e)}'}), 500
-
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
     app.run(debug=True, host='0.0.0.0', port=5000)
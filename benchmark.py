@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark script comparing the optimization algorithms on synthetic instances
+of increasing size. Reports best fitness, hard constraint violations and
+runtime for each algorithm and instance.
+"""
+
+import random
+import time
+from datetime import time as clock
+from types import SimpleNamespace
+
+from algorithms.genetic_algorithm import GeneticAlgorithm
+from algorithms.simulated_annealing import SimulatedAnnealing
+from algorithms.hybrid_optimizer import HybridOptimizer
+from algorithms.tabu_search import TabuSearch
+from algorithms.late_acceptance import LateAcceptanceHillClimbing
+from algorithms.great_deluge import GreatDeluge
+from algorithms.memetic_algorithm import MemeticAlgorithm
+
+# Benchmark instances: (name, courses, rooms, exam days)
+INSTANCES = [
+    ('small', 30, 4, 5),
+    ('medium', 80, 8, 7),
+    ('large', 200, 15, 10),
+]
+
+# Daily examination sessions, matching the slots generated by the web application
+DAILY_SESSIONS = [
+    (clock(8, 0), clock(10, 0)),
+    (clock(10, 30), clock(12, 30)),
+    (clock(14, 0), clock(16, 0)),
+    (clock(16, 30), clock(18, 30)),
+]
+
+def build_instance(num_courses, num_rooms, num_days, seed=0):
+    """Create lightweight course, room and time slot objects"""
+    rng = random.Random(seed)
+    programs = ['Software Engineering', 'Cyber Security', 'Bachelor of Accountancy',
+                'Procurement and Supply', 'Engineering in Electrical and Electronics']
+
+    courses = [SimpleNamespace(id=i + 1, name=f"Course {i + 1}", code=f"BEN {i + 1:03d}",
+                               students=rng.randint(15, 120), duration=120, department='IT',
+                               program=programs[i % len(programs)])
+               for i in range(num_courses)]
+    rooms = [SimpleNamespace(id=i + 1, name=f"Room {i + 1}", capacity=rng.choice([40, 60, 80, 150]),
+                             building='Main Building')
+             for i in range(num_rooms)]
+
+    time_slots = []
+    for day in range(num_days):
+        for start, end in DAILY_SESSIONS:
+            time_slots.append(SimpleNamespace(id=len(time_slots) + 1, day=f"2025-01-{day + 1:02d}",
+                                              start_time=start, end_time=end))
+
+    return courses, rooms, time_slots
+
+# Algorithms under test with a comparable, small effort budget
+ALGORITHMS = {
+    'genetic': lambda c, r, t, seed: GeneticAlgorithm(c, r, t, [], seed=seed).optimize(population_size=20, generations=20),
+    'simulated_annealing': lambda c, r, t, seed: SimulatedAnnealing(c, r, t, [], seed=seed).optimize(max_iterations=500),
+    'hybrid': lambda c, r, t, seed: HybridOptimizer(c, r, t, [], seed=seed).optimize(population_size=20, generations=20),
+    'tabu': lambda c, r, t, seed: TabuSearch(c, r, t, [], seed=seed).optimize(max_iterations=200),
+    'late_acceptance': lambda c, r, t, seed: LateAcceptanceHillClimbing(c, r, t, [], seed=seed).optimize(),
+    'great_deluge': lambda c, r, t, seed: GreatDeluge(c, r, t, [], seed=seed).optimize(),
+    'memetic': lambda c, r, t, seed: MemeticAlgorithm(c, r, t, [], seed=seed).optimize(population_size=20, generations=10),
+}
+
+def run_benchmark(algorithms=None, instances=None, seed=0):
+    """Run every algorithm on every instance and return the result rows"""
+    results = []
+    for name, num_courses, num_rooms, num_days in (instances or INSTANCES):
+        courses, rooms, time_slots = build_instance(num_courses, num_rooms, num_days, seed)
+
+        for algorithm in (algorithms or ALGORITHMS):
+            start = time.time()
+            solution, _ = ALGORITHMS[algorithm](courses, rooms, time_slots, seed)
+            results.append({
+                'instance': name,
+                'algorithm': algorithm,
+                'fitness': solution['fitness'],
+                'violations': solution['constraint_violations'],
+                'seconds': time.time() - start,
+            })
+
+    return results
+
+if __name__ == '__main__':
+    print("Benchmarking optimization algorithms...")
+    print("=" * 70)
+    print(f"{'Instance':<10}{'Algorithm':<22}{'Fitness':>14}{'Violations':>12}{'Time (s)':>10}")
+    for row in run_benchmark():
+        print(f"{row['instance']:<10}{row['algorithm']:<22}{row['fitness']:>14.1f}"
+              f"{row['violations']:>12}{row['seconds']:>10.2f}")
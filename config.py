@@ -8,6 +8,15 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///timetabling.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Optimization runs execute in job worker processes (python worker.py), outside gunicorn's --timeout
+    OPTIMIZATION_TIME_BUDGET = int(os.environ.get('OPTIMIZATION_TIME_BUDGET') or 600)  # seconds per run
+    OPTIMIZATION_MAX_RUNNING = int(os.environ.get('OPTIMIZATION_MAX_RUNNING') or 2)  # over all job workers
+    OPTIMIZATION_MAX_RUNNING_PER_USER = int(os.environ.get('OPTIMIZATION_MAX_RUNNING_PER_USER') or 1)
+    OPTIMIZATION_MAX_PENDING_PER_USER = 5  # queued or running jobs a user may have
+    PROGRESS_INTERVAL = float(os.environ.get('PROGRESS_INTERVAL') or 0.5)  # seconds between progress events
+    PROGRESS_STREAM_SECONDS = 30  # a progress stream reconnects after this, freeing its web worker
+    CACHE_URL = os.environ.get('CACHE_URL')  # shared cache tier: redis://host:6379/0 or file:///directory
+    TIMETABLES_PAGE_SIZE = 50  # timetables per listing page
     
     # Session Configuration
     SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
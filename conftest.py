@@ -0,0 +1,66 @@
+"""
+Shared test fixtures: the applications on temporary SQLite databases, with
+their real models, emptied before every test
+"""
+
+import os
+import tempfile
+import pytest
+from werkzeug.security import generate_password_hash
+
+DATABASE_DIR = tempfile.mkdtemp()
+
+# Read when the applications are imported, so never the development database
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(DATABASE_DIR, 'simple_app.db')
+os.environ.pop('CACHE_URL', None)
+os.environ['SECRET_KEY'] = 'test secret key'  # the shared cache tier refuses the placeholder keys
+import simple_app
+
+def reset(module):
+    """Recreate the tables of an application module and drop its cached problem snapshots"""
+    with module.app.app_context():
+        module.db.session.remove()
+        module.db.drop_all()
+        module.db.create_all()
+    snapshot_cache = getattr(module, 'snapshot_cache', None)
+    if snapshot_cache is not None:
+        snapshot_cache.invalidate()
+    return module.app
+
+@pytest.fixture
+def app():
+    """simple_app with empty tables"""
+    return reset(simple_app)
+
+@pytest.fixture
+def legacy_app():
+    """app.py with the models of models.py, on a database of its own and with a file-backed shared cache tier"""
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(DATABASE_DIR, 'app.db')
+    os.environ['CACHE_URL'] = 'file://' + os.path.join(DATABASE_DIR, 'cache')
+    try:
+        import app as module
+    finally:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(DATABASE_DIR, 'simple_app.db')
+        del os.environ['CACHE_URL']
+    # Versions restart with the tables, so entries of earlier tests must not be found
+    cache = os.path.join(DATABASE_DIR, 'cache')
+    for name in os.listdir(cache) if os.path.isdir(cache) else ():
+        os.remove(os.path.join(cache, name))
+    return reset(module)
+
+@pytest.fixture
+def user(app):
+    """Id of a registered user of simple_app"""
+    with app.app_context():
+        account = simple_app.User(username='tester', email='tester@example.com',
+                                  password_hash=generate_password_hash('secret'))
+        simple_app.db.session.add(account)
+        simple_app.db.session.commit()
+        return account.id
+
+@pytest.fixture
+def client(app, user):
+    """Test client of simple_app, logged in as the user"""
+    client = app.test_client()
+    client.post('/login', data={'email': 'tester@example.com', 'password': 'secret'})
+    return client
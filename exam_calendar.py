@@ -0,0 +1,62 @@
+"""
+Exam-period calendar: the examination time slots of the configured exam window.
+
+Slots are keyed on (day, start time). The slots of a window are upserted
+once: only the missing ones are inserted, in a single statement, and
+existing rows are never deleted or rewritten. Slot ids therefore stay stable
+and entries of timetables generated for earlier windows keep pointing at
+their slots, while optimization runs only read the slots of the current
+window.
+"""
+
+from datetime import date, time, timedelta
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+# Daily examination sessions (start, end)
+SESSIONS = (
+    (time(8, 0), time(10, 0)),
+    (time(10, 30), time(12, 30)),
+    (time(14, 0), time(16, 0)),
+    (time(16, 30), time(18, 30)),
+)
+
+def exam_window(start=None, days=7):
+    """ISO dates (YYYY-MM-DD) of the exam window: days consecutive days from start (default today)"""
+    if start is None:
+        start = date.today()
+    elif isinstance(start, str):
+        start = date.fromisoformat(start)
+    return [(start + timedelta(days=offset)).isoformat() for offset in range(days)]
+
+def ensure_slots(db, slot_model, days, sessions=SESSIONS):
+    """Insert the slots of the given days that do not exist yet; returns how many were added"""
+    existing = set(db.session.query(slot_model.day, slot_model.start_time).filter(slot_model.day.in_(days)))
+    rows = [{'day': day, 'start_time': start, 'end_time': end, 'slot_type': 'Regular'}
+            for day in days for start, end in sessions if (day, start) not in existing]
+    if not rows:
+        return 0
+    try:
+        db.session.execute(insert(slot_model), rows)
+        db.session.commit()
+    except IntegrityError:
+        # Another process added them meanwhile (the (day, start_time) key is unique)
+        db.session.rollback()
+        return 0
+    return len(rows)
+
+def window_slots(db, slot_model, days, sessions=SESSIONS):
+    """
+    Time slots of the exam window ordered by day and time. Only when some are
+    missing (a new window) are they added first, so the usual call is one read.
+    """
+    def query():
+        return (slot_model.query.filter(slot_model.day.in_(days))
+                .order_by(slot_model.day, slot_model.start_time).all())
+
+    slots = query()
+    present = {(slot.day, slot.start_time) for slot in slots}
+    if any((day, start) not in present for day in days for start, _ in sessions):
+        ensure_slots(db, slot_model, days, sessions)
+        slots = query()
+    return slots
@@ -0,0 +1,388 @@
+"""
+Database-backed queue of optimization jobs.
+
+The web process only inserts a job row and answers at once; separate worker
+processes claim queued rows one at a time, run the optimizer and store the
+result on the same row, which clients poll. Solver runtime therefore no
+longer counts against gunicorn's request timeout or ties up a web worker.
+
+Claiming is a conditional UPDATE on the job status, which is atomic in
+SQLite and PostgreSQL alike, so any number of worker processes on any host
+sharing the database can poll the same table.
+
+While a job runs, the optimizer's rate-limited progress events are appended
+to an event table, which the web process streams to the browser as
+Server-Sent Events. They are deleted when the job completes: its result
+keeps the convergence curve, so the table only holds events of running jobs.
+
+Interactive jobs are claimed before overnight batch jobs, and caps on the
+jobs running at once, overall and per user, keep a few users' large runs
+from taking every worker. A running job is cancelled cooperatively: a
+thread of the worker polls the job row and sets a flag that the
+optimizer's deadline checks, so it stops at its next check with the best
+solution so far.
+
+Jobs are content addressed by a request key covering everything the run
+reads. A request whose result is already stored is answered with a copy of
+it, and one identical to a queued or running job follows that job instead
+of running again (single flight).
+"""
+
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# Priority classes, claimed lowest value first
+PRIORITIES = {'interactive': 0, 'batch': 10}
+
+def request_key(data) -> str:
+    """Content address of a request: SHA-256 of its data as canonical JSON"""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+def enqueue(db, job_model, parameters, created_by, priority='interactive', key=None, reusable=None):
+    """
+    Insert a queued job with its (JSON serializable) parameters and priority class.
+
+    With a request key, a stored result of the same key that reusable(result)
+    accepts is copied into a job that is finished at once, and a queued or
+    running job of the same key is followed: the new job takes over its
+    outcome instead of running again.
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{priority}', use one of: {', '.join(PRIORITIES)}")
+    job = job_model(
+        id=uuid.uuid4().hex,
+        status=QUEUED,
+        priority=PRIORITIES[priority],
+        parameters=json.dumps(parameters),
+        request_key=key,
+        created_by=created_by,
+        created_at=datetime.utcnow()
+    )
+    if key is None:
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    for _ in range(3):
+        cached = find_result(db, job_model, key, reusable)
+        if cached is not None:
+            job.status, job.result, job.follows = SUCCEEDED, cached.result, cached.id
+            job.started_at = job.finished_at = datetime.utcnow()
+            break
+        leader = db.session.query(job_model).filter(job_model.flight_key == key).first()
+        if leader is not None:
+            leader.priority = min(leader.priority, job.priority)
+            job.status, job.follows = leader.status, leader.id
+            break
+        # Lead the flight; the unique flight key lets only one identical request do so
+        job.flight_key = key
+        db.session.add(job)
+        try:
+            db.session.commit()
+            return job
+        except IntegrityError:
+            db.session.rollback()
+            job.flight_key = None
+    db.session.add(job)
+    db.session.commit()
+
+    # The leader may have finished before this job was stored
+    if job.follows is not None and job.status not in FINISHED:
+        leader = db.session.get(job_model, job.follows)
+        db.session.refresh(leader)
+        if leader.status in FINISHED:
+            _settle_followers(db, leader)
+            db.session.commit()
+            db.session.refresh(job)
+    return job
+
+def find_result(db, job_model, key, reusable=None):
+    """Latest succeeded job of a request key whose result reusable(result) accepts, or None"""
+    candidates = (db.session.query(job_model)
+                  .filter(job_model.request_key == key, job_model.status == SUCCEEDED)
+                  .order_by(job_model.finished_at.desc())
+                  .limit(5).all())
+    for job in candidates:
+        if job.result and (reusable is None or reusable(json.loads(job.result))):
+            return job
+    return None
+
+def _running_count(job_model, created_by=None):
+    """Scalar subquery counting running jobs (of one user), usable inside an UPDATE of the same table"""
+    running = aliased(job_model)
+    query = select(func.count(running.id)).where(running.status == RUNNING, running.follows.is_(None))
+    if created_by is not None:
+        query = query.where(running.created_by == created_by)
+    return query.scalar_subquery()
+
+def claim_next(db, job_model, worker, max_running=None, max_running_per_user=None):
+    """
+    Atomically take the next queued job for this worker: interactive before
+    batch, oldest first, skipping users already running max_running_per_user
+    jobs. None when the queue is empty or max_running jobs already run.
+    """
+    if max_running is not None and db.session.query(_running_count(job_model)).scalar() >= max_running:
+        return None
+    candidates = (db.session.query(job_model.id, job_model.created_by)
+                  .filter(job_model.status == QUEUED, job_model.follows.is_(None)))
+    if max_running_per_user is not None:
+        busy = (select(job_model.created_by).where(job_model.status == RUNNING, job_model.follows.is_(None))
+                .group_by(job_model.created_by).having(func.count(job_model.id) >= max_running_per_user))
+        candidates = candidates.filter(job_model.created_by.notin_(busy))
+    candidates = candidates.order_by(job_model.priority, job_model.created_at).limit(10).all()
+
+    for job_id, created_by in candidates:
+        # Only one worker can move a given row out of 'queued', and only while the caps allow it
+        conditions = [job_model.id == job_id, job_model.status == QUEUED]
+        if max_running is not None:
+            conditions.append(_running_count(job_model) < max_running)
+        if max_running_per_user is not None:
+            conditions.append(_running_count(job_model, created_by) < max_running_per_user)
+        claimed = (db.session.query(job_model)
+                   .filter(*conditions)
+                   .update({'status': RUNNING, 'worker': worker, 'started_at': datetime.utcnow()},
+                           synchronize_session=False))
+        if claimed:
+            # Jobs following this one show it running too
+            (db.session.query(job_model)
+             .filter(job_model.follows == job_id, job_model.status == QUEUED)
+             .update({'status': RUNNING, 'started_at': datetime.utcnow()}, synchronize_session=False))
+        db.session.commit()
+        if claimed:
+            return db.session.get(job_model, job_id)
+    return None
+
+def queue_position(db, job_model, job):
+    """Number of queued jobs that will be claimed before this one (None unless it is queued)"""
+    if job.status != QUEUED:
+        return None
+    if job.follows is not None:
+        return queue_position(db, job_model, db.session.get(job_model, job.follows))
+    return (db.session.query(func.count(job_model.id))
+            .filter(job_model.status == QUEUED, job_model.follows.is_(None),
+                    (job_model.priority < job.priority)
+                    | ((job_model.priority == job.priority) & (job_model.created_at < job.created_at)))
+            .scalar())
+
+def request_cancel(db, job_model, job_id):
+    """
+    Cancel a job: a queued job or one following another is cancelled at once,
+    a running one is flagged and stops at the optimizer's next deadline check.
+    False when it already finished.
+    """
+    cancelled = (db.session.query(job_model)
+                 .filter(job_model.id == job_id, job_model.status.notin_(FINISHED),
+                         (job_model.status == QUEUED) | job_model.follows.isnot(None))
+                 .update({'status': CANCELLED, 'cancel_requested': True, 'flight_key': None,
+                          'finished_at': datetime.utcnow()}, synchronize_session=False))
+    if not cancelled:
+        cancelled = (db.session.query(job_model)
+                     .filter(job_model.id == job_id, job_model.status == RUNNING)
+                     .update({'cancel_requested': True}, synchronize_session=False))
+    db.session.commit()
+    return bool(cancelled)
+
+def complete(db, job, result=None, error=None, cancelled=False, event_model=None):
+    """
+    Store the outcome of a claimed job (a cancelled run keeps its best solution
+    so far). With event_model, the progress events of the job are deleted in
+    the same transaction; its result holds the curve instead.
+    """
+    job.status = FAILED if error else CANCELLED if cancelled else SUCCEEDED
+    job.result = None if result is None else json.dumps(result)
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    job.flight_key = None
+    _settle_followers(db, job)
+    if event_model is not None:
+        db.session.query(event_model).filter(event_model.job_id == job.id).delete(synchronize_session=False)
+    db.session.commit()
+
+def _settle_followers(db, job):
+    """Hand the outcome of a finished job to the jobs following it; when it was cancelled they run on their own"""
+    job_model = type(job)
+    followers = db.session.query(job_model).filter(job_model.follows == job.id, job_model.status.notin_(FINISHED))
+    if job.status == CANCELLED:
+        followers.update({'status': QUEUED, 'follows': None, 'started_at': None}, synchronize_session=False)
+    else:
+        followers.update({'status': job.status, 'result': job.result, 'error': job.error,
+                          'finished_at': job.finished_at}, synchronize_session=False)
+
+def fail_stale_jobs(db, job_model, max_runtime, event_model=None):
+    """Mark jobs running for longer than max_runtime seconds as failed (their worker died)"""
+    cutoff = datetime.utcnow() - timedelta(seconds=max_runtime)
+    stale = (db.session.query(job_model)
+             .filter(job_model.status == RUNNING, job_model.follows.is_(None), job_model.started_at < cutoff)
+             .all())
+    for job in stale:
+        complete(db, job, error='Worker stopped before finishing the job', event_model=event_model)
+    return len(stale)
+
+def job_status(job, position=None):
+    """JSON view of a job for polling clients, with its queue position while queued"""
+    status = {
+        'job_id': job.id,
+        'status': job.status,
+        'priority': next((name for name, value in PRIORITIES.items() if value == job.priority), job.priority),
+        'cancel_requested': bool(job.cancel_requested),
+        'follows': job.follows,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if position is not None:
+        status['queue_position'] = position
+    if job.status in (SUCCEEDED, CANCELLED):
+        status['result'] = json.loads(job.result) if job.result else None
+    if job.status == FAILED:
+        status['error'] = job.error
+    return status
+
+def publish_event(db, event_model, job_id, event):
+    """
+    Append a progress event of a running job. Written on a connection of its
+    own, so it never commits what the job itself has pending in the session.
+    """
+    with db.engine.begin() as connection:
+        connection.execute(event_model.__table__.insert().values(
+            job_id=job_id, data=json.dumps(event), created_at=datetime.utcnow()))
+
+def stream_events(db, job_model, event_model, job_id, last_event_id=0, max_seconds=30, poll_interval=0.5,
+                  events_of=None):
+    """
+    Server-Sent Events of a job: one 'progress' event per stored event after
+    last_event_id, then a 'done' event with the job status once it finished.
+    events_of names the job whose events to stream, when the job follows another.
+    Events are deleted when the job completes, so a stream that ends after
+    that finds the whole curve in the result of the 'done' event.
+
+    The stream ends after max_seconds even while the job runs, so it only
+    holds a (sync) web worker briefly; EventSource reconnects by itself and
+    resumes after the Last-Event-ID it received.
+    """
+    yield 'retry: 1000\n\n'
+    started = time.time()
+    while True:
+        # Status first: events are stored before the job completes, so none can be missed
+        status = db.session.query(job_model.status).filter(job_model.id == job_id).scalar()
+        events = (db.session.query(event_model.id, event_model.data)
+                  .filter(event_model.job_id == (events_of or job_id), event_model.id > last_event_id)
+                  .order_by(event_model.id).all())
+        for event_id, data in events:
+            last_event_id = event_id
+            yield f"id: {event_id}\nevent: progress\ndata: {data}\n\n"
+
+        if status in FINISHED:
+            job = db.session.get(job_model, job_id)
+            yield f"id: {last_event_id}\nevent: done\ndata: {json.dumps(job_status(job))}\n\n"
+            return
+        # End the read transaction, so the next poll sees new events
+        db.session.rollback()
+        if time.time() - started >= max_seconds:
+            return
+        time.sleep(poll_interval)
+
+def _watch_cancellation(engine, table, job_id, cancelled, finished, interval):
+    """Set the cancellation flag of a running job once its cancellation is requested"""
+    query = select(table.c.cancel_requested).where(table.c.id == job_id)
+    while not finished.wait(interval):
+        with engine.connect() as connection:
+            if connection.execute(query).scalar():
+                cancelled.set()
+                return
+
+def run_worker(app, db, job_model, handler, poll_interval=1.0, max_jobs=None, stop_when_idle=False,
+               max_runtime=None, max_running=None, max_running_per_user=None, cancel_poll_interval=1.0,
+               event_model=None):
+    """
+    Worker loop: claim a job, run handler(parameters, job, cancelled) in the
+    app context and store its result dict (or the error message) on the job
+    row. cancelled is a multiprocessing.Event set once the job is cancelled,
+    for the handler to pass to the optimizer's Deadline.
+
+    Args:
+        poll_interval: Seconds to wait before polling an empty queue again
+        max_jobs: Exit after this many jobs (None runs forever)
+        stop_when_idle: Exit as soon as the queue is empty
+        max_runtime: Seconds after which a running job counts as lost (checked while idle)
+        max_running: Jobs running at once over all workers sharing the database
+        max_running_per_user: Jobs of one user running at once
+        cancel_poll_interval: Seconds between checks for a cancellation of the running job
+        event_model: Progress event model; the events of a job are deleted once it completes
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    with app.app_context():
+        # Never share database connections inherited from the parent process
+        db.engine.dispose()
+        while max_jobs is None or processed < max_jobs:
+            job = claim_next(db, job_model, worker, max_running, max_running_per_user)
+            if job is None:
+                if max_runtime:
+                    fail_stale_jobs(db, job_model, max_runtime, event_model)
+                if stop_when_idle:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            cancelled, finished = multiprocessing.Event(), threading.Event()
+            watcher = threading.Thread(target=_watch_cancellation, daemon=True,
+                                       args=(db.engine, job_model.__table__, job.id, cancelled, finished,
+                                             cancel_poll_interval))
+            watcher.start()
+            try:
+                result = handler(json.loads(job.parameters), job, cancelled)
+            except Exception as e:
+                db.session.rollback()
+                traceback.print_exc()
+                complete(db, job, error=str(e), event_model=event_model)
+            else:
+                complete(db, job, result=result, cancelled=cancelled.is_set(), event_model=event_model)
+            finally:
+                finished.set()
+                watcher.join()
+            processed += 1
+    return processed
+
+def start_workers(target, count, **kwargs):
+    """
+    Start count worker processes running target(**kwargs).
+
+    The processes are not daemonic, since optimizers such as the memetic
+    algorithm and the portfolio start process pools of their own; they are
+    terminated when the starting process exits instead.
+    """
+    processes = []
+    for index in range(count):
+        process = multiprocessing.Process(target=target, kwargs=kwargs, name=f"optimization-worker-{index + 1}")
+        process.start()
+        processes.append(process)
+    atexit.register(stop_workers, processes)
+    return processes
+
+def stop_workers(processes, timeout=5):
+    """Terminate worker processes (a job they were running is failed later as stale)"""
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout)
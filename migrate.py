@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for the SQLite database.
+
+Migrations are numbered steps applied in order; the versions applied are
+recorded in the schema_migrations table, so each one runs once per
+database and ``python migrate.py`` brings any database up to date. Every
+step checks what already exists, so databases changed by the former one-off
+scripts (add_seed_column.py and friends) or created by db.create_all() are
+simply recorded as migrated.
+
+The database is switched to WAL journaling, in which readers keep reading
+while a migration writes. Large backfills are applied in batches of rows,
+each committed on its own, so no single write transaction holds the file
+for long and an interrupted backfill continues where it stopped. Index
+creation holds a write lock on its table only for the time of the build.
+
+Both applications and worker.py call upgrade() at startup, which creates
+missing tables and applies the pending migrations of a SQLite database.
+
+Before and after migrating, the query plans of the application's hot
+lookups are printed, which shows the full table scans the indexes replace.
+
+Usage: python migrate.py [--db instance/timetabling.db] [--status] [--plans] [--batch-size 500]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+import timetable_codec
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock, start one process at a time
+    fcntl = None
+
+DEFAULT_DB_PATH = 'instance/timetabling.db'
+
+class Migration:
+    """Schema helpers of a migration step, on an autocommit connection"""
+
+    def __init__(self, conn, batch_size=500, pause=0.01):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.pause = pause
+
+    def tables(self):
+        return {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    def columns(self, table):
+        return [row[1] for row in self.conn.execute(f'PRAGMA table_info("{table}")')]
+
+    def indexes(self, table):
+        """Leading columns of every index of the table, by index name"""
+        indexes = {}
+        for row in self.conn.execute(f'PRAGMA index_list("{table}")'):
+            indexes[row[1]] = [info[2] for info in self.conn.execute(f'PRAGMA index_info("{row[1]}")')]
+        return indexes
+
+    def add_column(self, table, name, definition):
+        """Add a column unless the table lacks or already has it"""
+        if table not in self.tables():
+            print(f"  Table '{table}' not found; it is created with all columns on startup.")
+            return False
+        if name in self.columns(table):
+            print(f"  Column '{table}.{name}' already exists.")
+            return False
+        self.conn.execute(f'ALTER TABLE "{table}" ADD COLUMN {name} {definition}')
+        print(f"  Added column '{table}.{name}'.")
+        return True
+
+    def create_index(self, name, table, columns, unique=False):
+        """
+        Create an index unless its table or columns are missing, or an existing
+        index already starts with the same columns (and is unique when required)
+        """
+        if table not in self.tables() or not set(columns) <= set(self.columns(table)):
+            print(f"  Index '{name}' skipped: {table}({', '.join(columns)}) does not exist in this database.")
+            return False
+        existing = self.indexes(table)
+        if name not in existing and not unique:
+            covering = next((index for index, indexed in existing.items()
+                             if indexed[:len(columns)] == list(columns)), None)
+            if covering:
+                print(f"  Index '{name}' not needed: '{covering}' covers {table}({', '.join(columns)}).")
+                return False
+        self.conn.execute(f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS {name} '
+                          f'ON "{table}" ({", ".join(columns)})')
+        print(f"  Index '{name}' on {table}({', '.join(columns)}) is in place.")
+        return True
+
+    def backfill(self, table, assignment, condition, params=()):
+        """
+        UPDATE table SET assignment WHERE condition, batch_size rows per
+        transaction with a pause between batches for other writers; params fill
+        the placeholders of assignment and condition, in that order. The
+        condition must no longer hold for updated rows. Returns the rows updated.
+        """
+        total = 0
+        statement = (f'UPDATE "{table}" SET {assignment} WHERE rowid IN '
+                     f'(SELECT rowid FROM "{table}" WHERE {condition} LIMIT ?)')
+        while True:
+            with self.conn:
+                updated = self.conn.execute(statement, (*params, self.batch_size)).rowcount
+            total += updated
+            if updated < self.batch_size:
+                return total
+            time.sleep(self.pause)
+
+    def delete(self, table, condition, params=()):
+        """DELETE FROM table WHERE condition in batches like backfill(); returns the rows deleted"""
+        total = 0
+        statement = (f'DELETE FROM "{table}" WHERE rowid IN '
+                     f'(SELECT rowid FROM "{table}" WHERE {condition} LIMIT ?)')
+        while True:
+            with self.conn:
+                deleted = self.conn.execute(statement, (*params, self.batch_size)).rowcount
+            total += deleted
+            if deleted < self.batch_size:
+                return total
+            time.sleep(self.pause)
+
+    def rewrite(self, table, column, convert, condition):
+        """
+        Replace column with convert(value) in the rows matching condition,
+        batch_size rows per transaction in id order; rows whose value convert
+        rejects with ValueError are left as they are. Returns the rows rewritten.
+        """
+        total = 0
+        last_id = 0
+        while True:
+            rows = self.conn.execute(f'SELECT id, {column} FROM "{table}" WHERE {condition} AND id > ? '
+                                     f'ORDER BY id LIMIT ?', (last_id, self.batch_size)).fetchall()
+            if not rows:
+                return total
+            updates = []
+            for row_id, value in rows:
+                try:
+                    updates.append((convert(value), row_id))
+                except ValueError:
+                    print(f"  Row {row_id} of '{table}' left unchanged: its {column} cannot be converted.")
+            with self.conn:
+                self.conn.executemany(f'UPDATE "{table}" SET {column} = ? WHERE id = ?', updates)
+            total += len(updates)
+            last_id = rows[-1][0]
+            time.sleep(self.pause)
+
+def timetable_tables(migration):
+    """Timetable and timetable entry tables of databases older than the timetable store"""
+    migration.conn.execute("""
+        CREATE TABLE IF NOT EXISTS timetable (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(200) NOT NULL,
+            algorithm_used VARCHAR(50) NOT NULL,
+            fitness_score REAL NOT NULL,
+            constraint_violations INTEGER NOT NULL,
+            created_by INTEGER NOT NULL,
+            FOREIGN KEY (created_by) REFERENCES user(id)
+        )
+    """)
+    migration.conn.execute("""
+        CREATE TABLE IF NOT EXISTS timetable_entry (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timetable_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            room_id INTEGER NOT NULL,
+            time_slot_id INTEGER NOT NULL,
+            FOREIGN KEY (timetable_id) REFERENCES timetable(id),
+            FOREIGN KEY (course_id) REFERENCES course(id),
+            FOREIGN KEY (room_id) REFERENCES room(id),
+            FOREIGN KEY (time_slot_id) REFERENCES time_slot(id)
+        )
+    """)
+    print("  Timetable tables are in place.")
+
+# Programs of the courses added before the program column, by department
+DEPARTMENT_PROGRAMS = {
+    'IT': 'Software Engineering',
+    'CS': 'Software Engineering',
+    'SE': 'Software Engineering',
+    'CE': 'Engineering in Electrical and Electronics',
+    'EE': 'Engineering in Electrical and Electronics',
+    'TE': 'Engineering in Telecommunications and Electronics',
+    'CYB': 'Cyber Security',
+    'ACC': 'Bachelor of Accountancy',
+    'PROC': 'Procurement and Supply',
+    'General': 'General Studies',
+}
+
+def course_program(migration):
+    """Program of every course, derived from its department for existing courses"""
+    migration.add_column('course', 'program', "VARCHAR(200) DEFAULT 'General'")
+    if 'program' not in migration.columns('course'):
+        return
+    for department, program in DEPARTMENT_PROGRAMS.items():
+        updated = migration.backfill('course', 'program = ?',
+                                     "department = ? AND (program IS NULL OR program = 'General')",
+                                     (program, department))
+        if updated:
+            print(f"  Updated {updated} courses from department '{department}' to program '{program}'.")
+
+def timetable_seed(migration):
+    """Random seed of the optimizer run of every timetable (existing timetables keep NULL)"""
+    migration.add_column('timetable', 'seed', 'BIGINT')
+
+def job_control(migration):
+    """Priority, cancellation and request reuse columns of optimization jobs"""
+    if 'optimization_job' not in migration.tables():
+        print("  Table 'optimization_job' not found; it is created with all columns on startup.")
+        return
+    for name, definition in {
+        'priority': "INTEGER NOT NULL DEFAULT 0",
+        'cancel_requested': "BOOLEAN NOT NULL DEFAULT 0",
+        'request_key': "VARCHAR(64)",
+        'flight_key': "VARCHAR(64)",
+        'follows': "VARCHAR(32) REFERENCES optimization_job (id)",
+    }.items():
+        migration.add_column('optimization_job', name, definition)
+    # SQLite cannot add a UNIQUE column, so the flight key gets a unique index
+    migration.create_index('ix_optimization_job_request_key', 'optimization_job', ('request_key',))
+    migration.create_index('ix_optimization_job_flight_key', 'optimization_job', ('flight_key',), unique=True)
+
+def time_slot_unique(migration):
+    """Unique (day, start_time) key of the exam calendar's slot upsert"""
+    if 'time_slot' not in migration.tables():
+        return
+    # The first slot of each (day, start_time) is kept and takes over the references to its copies
+    kept = dict(migration.conn.execute("""
+        SELECT copy.id, MIN(first.id) FROM time_slot copy
+        JOIN time_slot first ON first.day = copy.day AND first.start_time = copy.start_time
+        GROUP BY copy.id HAVING copy.id > MIN(first.id)
+    """))
+    copies = "SELECT id FROM time_slot WHERE id NOT IN (SELECT MIN(id) FROM time_slot GROUP BY day, start_time)"
+    if kept and 'timetable_entry' in migration.tables():
+        moved = migration.backfill('timetable_entry', """time_slot_id = (
+            SELECT MIN(first.id) FROM time_slot copy
+            JOIN time_slot first ON first.day = copy.day AND first.start_time = copy.start_time
+            WHERE copy.id = timetable_entry.time_slot_id)""", f"time_slot_id IN ({copies})")
+        if moved:
+            print(f"  Moved {moved} timetable entries to the kept copy of their time slot.")
+    if kept and 'data' in migration.columns('timetable'):
+        moved = migration.rewrite('timetable', 'data', lambda value: merge_solution_slots(value, kept),
+                                  "typeof(data) = 'text'")
+        if moved:
+            print(f"  Moved the assignments of {moved} stored solutions to the kept time slots.")
+    removed = migration.delete('time_slot', f"id IN ({copies})")
+    if removed:
+        print(f"  Removed {removed} duplicate time slots.")
+    migration.create_index('uq_time_slot_day_start', 'time_slot', ('day', 'start_time'), unique=True)
+
+def merge_solution_slots(value, kept):
+    """JSON solution with the time slot ids of its assignments mapped through kept (copy id -> kept id)"""
+    solution = json.loads(value)  # json.JSONDecodeError is a ValueError
+    if not isinstance(solution, dict):
+        raise ValueError('not a solution')
+    for key in ('assignments', 'schedule'):
+        for entry in solution.get(key) or ():
+            if isinstance(entry, dict) and entry.get('time_slot_id') in kept:
+                entry['time_slot_id'] = kept[entry['time_slot_id']]
+    return json.dumps(solution)
+
+def timetable_updated_at(migration):
+    """Last change of every timetable, the ETag of its API views; existing ones get the migration time"""
+    migration.add_column('timetable', 'updated_at', 'DATETIME')
+    if 'updated_at' in migration.columns('timetable'):
+        updated = migration.backfill('timetable', 'updated_at = CURRENT_TIMESTAMP', 'updated_at IS NULL')
+        if updated:
+            print(f"  Set updated_at of {updated} timetables.")
+
+# Indexes of the lookups that otherwise scan whole tables as history accumulates
+# (declared on the models as well, so new databases get them from create_all)
+HOT_PATH_INDEXES = (
+    ('ix_timetable_entry_timetable_slot', 'timetable_entry', ('timetable_id', 'time_slot_id')),
+    ('ix_student_course_student_course', 'student_course', ('student_id', 'course_id')),
+    ('ix_student_course_course_student', 'student_course', ('course_id', 'student_id')),
+    ('ix_timetable_created_by_created_at', 'timetable', ('created_by', 'created_at')),
+    ('ix_timetable_created_at', 'timetable', ('created_at',)),
+    ('ix_time_slot_day_start', 'time_slot', ('day', 'start_time')),
+    ('ix_optimization_job_status_priority', 'optimization_job', ('status', 'priority', 'created_at')),
+    ('ix_elite_solution_fingerprint_cost', 'elite_solution', ('fingerprint', 'cost')),
+)
+
+def hot_path_indexes(migration):
+    """Composite indexes of entry, enrollment, timetable, slot, job queue and elite archive lookups"""
+    for name, table, columns in HOT_PATH_INDEXES:
+        migration.create_index(name, table, columns)
+    # Let the planner learn the new indexes' statistics (cheap, only where useful)
+    migration.conn.execute('PRAGMA optimize')
+
+def encode_solution(value):
+    """Binary form of a solution stored as JSON text"""
+    solution = timetable_codec.decode(value)  # json.JSONDecodeError is a ValueError
+    if not isinstance(solution, dict):
+        raise ValueError('not a solution')
+    try:
+        return timetable_codec.encode(solution)
+    except TypeError as e:  # assignments without ids
+        raise ValueError(str(e)) from e
+
+def timetable_data_binary(migration):
+    """Solutions stored as compressed (course, room, slot) arrays; rows holding JSON text are converted"""
+    if 'data' not in migration.columns('timetable'):
+        return
+    converted = migration.rewrite('timetable', 'data', encode_solution, "typeof(data) = 'text'")
+    if converted:
+        print(f"  Converted the data of {converted} timetables from JSON to the binary format.")
+
+def job_event_retention(migration):
+    """Progress events of finished jobs, kept before completing a job deleted them; their results hold the curves"""
+    if not {'optimization_job', 'optimization_job_event'} <= migration.tables():
+        return
+    deleted = migration.delete('optimization_job_event', "job_id NOT IN "
+                               "(SELECT id FROM optimization_job WHERE status IN ('queued', 'running'))")
+    if deleted:
+        print(f"  Deleted {deleted} progress events of finished jobs.")
+
+# (version, name, step), in the order they are applied; append new steps, never renumber
+MIGRATIONS = (
+    (1, 'timetable_tables', timetable_tables),
+    (2, 'course_program', course_program),
+    (3, 'timetable_seed', timetable_seed),
+    (4, 'job_control', job_control),
+    (5, 'time_slot_unique', time_slot_unique),
+    (6, 'timetable_updated_at', timetable_updated_at),
+    (7, 'hot_path_indexes', hot_path_indexes),
+    (8, 'timetable_data_binary', timetable_data_binary),
+    (9, 'job_event_retention', job_event_retention),
+)
+
+# Lookups the application runs on every request or job, for the query plan report
+HOT_QUERIES = (
+    ('Entries of a timetable', "SELECT * FROM timetable_entry WHERE timetable_id = 1 ORDER BY time_slot_id"),
+    ('Courses of a student', "SELECT course_id FROM student_course WHERE student_id = 1"),
+    ('Students of a course', "SELECT student_id FROM student_course WHERE course_id = 1"),
+    ('Timetables of a user', "SELECT id FROM timetable WHERE created_by = 1 ORDER BY created_at DESC"),
+    ('Recent timetables', "SELECT id FROM timetable ORDER BY created_at DESC LIMIT 50"),
+    ('Slots of a day', "SELECT id FROM time_slot WHERE day = '2025-01-06' ORDER BY start_time"),
+    ('Next queued job', "SELECT id FROM optimization_job WHERE status = 'queued' ORDER BY priority, created_at LIMIT 1"),
+    ('Progress events', "SELECT id, data FROM optimization_job_event WHERE job_id = 'x' AND id > 0 ORDER BY id"),
+    ('Elite solutions', "SELECT data FROM elite_solution WHERE fingerprint = 'x' ORDER BY cost LIMIT 10"),
+)
+
+def query_plans(conn):
+    """EXPLAIN QUERY PLAN of every hot query, or None where this database lacks its tables"""
+    plans = {}
+    for label, sql in HOT_QUERIES:
+        try:
+            plans[label] = '; '.join(row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}'))
+        except sqlite3.Error:
+            plans[label] = None
+    return plans
+
+def print_plans(before, after=None):
+    for label, plan in before.items():
+        if plan is None:
+            continue
+        print(f"  {label}:")
+        if after is None or after[label] == plan:
+            print(f"      {plan}")
+        else:
+            print(f"      before: {plan}")
+            print(f"      after:  {after[label]}")
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    conn.execute('PRAGMA busy_timeout = 30000')
+    # Readers are not blocked while migrations write (persistent for the database file)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS schema_migrations '
+                 '(version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at DATETIME NOT NULL)')
+    return conn
+
+def applied_versions(conn):
+    return {row[0] for row in conn.execute('SELECT version FROM schema_migrations')}
+
+def migrate(db_path=DEFAULT_DB_PATH, batch_size=500, show_plans=True):
+    """Apply the pending migrations in order; returns the versions applied"""
+    if not os.path.exists(db_path):
+        print(f"Database {db_path} not found. Please ensure the database exists.")
+        return []
+
+    conn = connect(db_path)
+    try:
+        done = applied_versions(conn)
+        pending = [migration for migration in MIGRATIONS if migration[0] not in done]
+        if not pending:
+            print(f"{db_path} is up to date (version {max(done)}).")
+            return []
+
+        before = query_plans(conn)
+        for version, name, step in pending:
+            print(f"Migration {version}: {name}")
+            step(Migration(conn, batch_size))
+            with conn:
+                conn.execute("INSERT INTO schema_migrations (version, name, applied_at) "
+                             "VALUES (?, ?, CURRENT_TIMESTAMP)", (version, name))
+        if show_plans:
+            print("\nQuery plans:")
+            print_plans(before, query_plans(conn))
+        return [version for version, _, _ in pending]
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        raise
+    finally:
+        conn.close()
+
+def upgrade(db):
+    """
+    Bring the database of a Flask-SQLAlchemy app up to date at startup:
+    db.create_all() for missing tables, then the pending migrations where the
+    database is a SQLite file. Processes starting together (web and job
+    workers) take turns through a lock file next to the database.
+    """
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        db.create_all()
+        return []
+    with open(url.database + '.migrate-lock', 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        db.create_all()
+        return migrate(url.database, show_plans=False)
+
+def status(db_path=DEFAULT_DB_PATH):
+    """Print the applied and pending migrations"""
+    if not os.path.exists(db_path):
+        print(f"Database {db_path} not found. Please ensure the database exists.")
+        return
+    conn = connect(db_path)
+    try:
+        done = applied_versions(conn)
+        for version, name, step in MIGRATIONS:
+            state = 'applied' if version in done else 'pending'
+            print(f"  {version:3d}  {name:24s} {state:8s} {step.__doc__}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Apply the pending database migrations')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite database file')
+    parser.add_argument('--status', action='store_true', help='list the migrations and whether they are applied')
+    parser.add_argument('--plans', action='store_true', help='only print the query plans of the hot lookups')
+    parser.add_argument('--batch-size', type=int, default=500, help='rows per transaction of a backfill')
+    args = parser.parse_args()
+
+    if args.status:
+        status(args.db)
+    elif args.plans:
+        if os.path.exists(args.db):
+            connection = connect(args.db)
+            print_plans(query_plans(connection))
+            connection.close()
+        else:
+            print(f"Database {args.db} not found. Please ensure the database exists.")
+    else:
+        migrate(args.db, args.batch_size)
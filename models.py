@@ -73,6 +73,7 @@ class TimeSlot(db.Model):
     end_time = db.Column(db.Time, nullable=False)
     slot_type = db.Column(db.String(20), default='Regular')  # Regular, Break, Special
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (db.Index('ix_time_slot_day_start', 'day', 'start_time'),)
     
     # Relationships
     exams = db.relationship('Exam', backref='time_slot', lazy=True)
@@ -109,14 +110,19 @@ class Timetable(db.Model):
     __tablename__ = 'timetable'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), default='Generated Timetable')
-    data = db.Column(db.Text, nullable=False)  # JSON string of timetable data
+    data = db.Column(db.LargeBinary, nullable=False)  # solution in timetable_codec format (JSON text in old rows)
     fitness_score = db.Column(db.Float, default=0.0)
     algorithm_used = db.Column(db.String(50), nullable=False)
     parameters = db.Column(db.Text)  # JSON string of algorithm parameters
+    seed = db.Column(db.BigInteger)  # Random seed of the optimizer run, replays it exactly
     status = db.Column(db.String(20), default='Generated')  # Generated, Approved, Implemented
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_timetable_created_by_created_at', 'created_by', 'created_at'),
+        db.Index('ix_timetable_created_at', 'created_at'),
+    )
     
     # Relationships
     creator = db.relationship('User', backref='timetables')
@@ -141,6 +147,10 @@ class StudentCourse(db.Model):
     semester = db.Column(db.String(20), default='Fall')
     academic_year = db.Column(db.String(10), default='2024')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_student_course_student_course', 'student_id', 'course_id'),
+        db.Index('ix_student_course_course_student', 'course_id', 'student_id'),
+    )
     
     # Relationships
     student = db.relationship('Student', backref='enrollments')
@@ -156,3 +166,37 @@ class Faculty(db.Model):
     role = db.Column(db.String(50), default='Lecturer')
     availability = db.Column(db.Text)  # JSON string of availability schedule
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class OptimizationJob(db.Model):
+    """Queued optimization run, executed by a job worker and polled through /jobs/<id>"""
+    __tablename__ = 'optimization_job'
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed, cancelled
+    priority = db.Column(db.Integer, nullable=False, default=0)  # 0 interactive, 10 overnight batch
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    parameters = db.Column(db.Text, nullable=False)  # request parameters as JSON
+    request_key = db.Column(db.String(64), index=True)  # content address of problem data, algorithm and parameters
+    flight_key = db.Column(db.String(64), unique=True)  # request key while queued or running, so identical requests merge
+    follows = db.Column(db.String(32), db.ForeignKey('optimization_job.id'))  # job whose outcome this one reuses
+    result = db.Column(db.Text)  # optimization response as JSON
+    error = db.Column(db.Text)
+    worker = db.Column(db.String(100))  # host:pid of the worker that claimed the job
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    __table_args__ = (db.Index('ix_optimization_job_status_priority', 'status', 'priority', 'created_at'),)  # queue order
+
+class OptimizationJobEvent(db.Model):
+    """Progress event of a running optimization job, streamed through /jobs/<id>/events"""
+    __tablename__ = 'optimization_job_event'
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(32), db.ForeignKey('optimization_job.id'), nullable=False, index=True)
+    data = db.Column(db.Text, nullable=False)  # iteration, fitness, violations and moves per second as JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ProblemVersion(db.Model):
+    """Single-row counter bumped by every write to the problem data; cached snapshots are checked against it"""
+    __tablename__ = 'problem_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
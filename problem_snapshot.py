@@ -0,0 +1,162 @@
+"""
+Problem snapshots: the courses, rooms, exam-period time slots, active
+constraints and (where recorded) student enrollments an optimization run
+reads, loaded once and shared by later runs.
+
+A snapshot is built from column-only queries into plain records (named
+tuples with the attributes the engines read, so nothing touches the ORM or
+its identity map while optimizing), NumPy arrays of the numeric columns and
+id -> index maps. Snapshots are cached per exam window in a TieredCache:
+an in-process LRU, and optionally a tier shared by all workers of the
+deployment (see shared_cache), so a snapshot and its TimetableProblem are
+built once per deployment rather than once per worker.
+
+Writes invalidate them through SQLAlchemy ``after_insert``/``after_update``/
+``after_delete`` events on the watched models. The events drop the local
+in-process tier at once and, in the writing transaction, bump a one-row
+version counter that is part of every cache key, so worker processes notice
+edits made by the web process and never read a snapshot of older data. A
+repeat load is one primary key read and a dictionary lookup.
+Writes that bypass the ORM unit of work (raw SQL, bulk query updates) are
+not seen and need ``SnapshotCache.invalidate(db)``.
+"""
+
+import hashlib
+import json
+from collections import namedtuple
+import numpy as np
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from shared_cache import MemoryCache, TieredCache
+
+CourseRow = namedtuple('CourseRow', 'id code name students duration department program')
+RoomRow = namedtuple('RoomRow', 'id name capacity building room_type')
+TimeSlotRow = namedtuple('TimeSlotRow', 'id day start_time end_time')
+ConstraintRow = namedtuple('ConstraintRow', 'id constraint_type parameters')
+
+class ProblemSnapshot:
+    """Immutable view of one problem instance: records, numeric arrays and index maps"""
+
+    def __init__(self, courses, rooms, time_slots, constraints=(), enrollments=None):
+        self.courses = tuple(courses)
+        self.rooms = tuple(rooms)
+        self.time_slots = tuple(time_slots)
+        self.constraints = tuple(constraints)
+        # Student ids per course id, for engines splitting along the student conflict graph
+        self.enrollments = {course_id: frozenset(students) for course_id, students in (enrollments or {}).items()}
+
+        self.course_ids = np.array([course.id for course in self.courses], dtype=np.int64)
+        self.course_students = np.array([course.students or 0 for course in self.courses], dtype=np.int64)
+        self.course_durations = np.array([course.duration or 0 for course in self.courses], dtype=np.int64)
+        self.room_ids = np.array([room.id for room in self.rooms], dtype=np.int64)
+        self.room_capacities = np.array([room.capacity for room in self.rooms], dtype=np.int64)
+        self.slot_ids = np.array([slot.id for slot in self.time_slots], dtype=np.int64)
+        for array in (self.course_ids, self.course_students, self.course_durations,
+                      self.room_ids, self.room_capacities, self.slot_ids):
+            array.flags.writeable = False
+
+        self.course_index = {course.id: i for i, course in enumerate(self.courses)}
+        self.room_index = {room.id: i for i, room in enumerate(self.rooms)}
+        self.slot_index = {slot.id: i for i, slot in enumerate(self.time_slots)}
+
+        # Content address of the data, part of the key of an optimization request
+        content = [self.courses, self.rooms, self.time_slots, self.constraints]
+        if self.enrollments:
+            content.append(sorted((course_id, sorted(students)) for course_id, students in self.enrollments.items()))
+        self.digest = hashlib.sha256(json.dumps(content, default=str).encode()).hexdigest()
+        self._problem = None
+
+    @classmethod
+    def from_database(cls, db, course_model, room_model, slot_model, constraint_model, days=None,
+                      enrollment_model=None):
+        """
+        Build a snapshot with column-only queries. Time slots are those of the
+        given exam days (all of them without days); enrollments are read from
+        enrollment_model (course_id, student_id) when given.
+        """
+        def rows(record, statement):
+            return [record(*row) for row in db.session.execute(statement)]
+
+        slots = select(*(getattr(slot_model, name) for name in TimeSlotRow._fields))
+        if days is None:
+            slots = slots.order_by(slot_model.id)
+        else:
+            slots = slots.where(slot_model.day.in_(days)).order_by(slot_model.day, slot_model.start_time)
+        enrollments = {}
+        if enrollment_model is not None:
+            for course_id, student_id in db.session.execute(
+                    select(enrollment_model.course_id, enrollment_model.student_id)):
+                enrollments.setdefault(course_id, set()).add(student_id)
+
+        return cls(
+            rows(CourseRow, select(*(getattr(course_model, name) for name in CourseRow._fields))
+                 .order_by(course_model.id)),
+            rows(RoomRow, select(*(getattr(room_model, name) for name in RoomRow._fields))
+                 .order_by(room_model.id)),
+            rows(TimeSlotRow, slots),
+            rows(ConstraintRow, select(*(getattr(constraint_model, name) for name in ConstraintRow._fields))
+                 .where(constraint_model.is_active.isnot(False)).order_by(constraint_model.id)),
+            enrollments,
+        )
+
+    def problem(self):
+        """Index-based TimetableProblem of the snapshot, built on first use and shared afterwards"""
+        if self._problem is None:
+            from algorithms.delta_evaluator import TimetableProblem
+            self._problem = TimetableProblem(self.courses, self.rooms, self.time_slots)
+        return self._problem
+
+class SnapshotCache:
+    """Cache of problem snapshots keyed on the shared data version counter"""
+
+    def __init__(self, version_model, shared=None, ttl=24 * 3600):
+        self.version_model = version_model
+        self.cache = TieredCache(MemoryCache(maxsize=8), shared, namespace='snapshot')
+        self.ttl = ttl
+
+    def watch(self, *models):
+        """Invalidate on every ORM insert, update or delete of the models"""
+        for model in models:
+            for name in ('after_insert', 'after_update', 'after_delete'):
+                event.listen(model, name, self._changed)
+
+    def _changed(self, mapper, connection, target):
+        self.cache.local.clear()
+        # Same connection and transaction as the write: the new version commits with the data
+        table = self.version_model.__table__
+        connection.execute(update(table).where(table.c.id == 1).values(version=table.c.version + 1))
+
+    def current_version(self, db):
+        """Committed data version; creates the counter on first use"""
+        table = self.version_model.__table__
+        query = select(table.c.version).where(table.c.id == 1)
+        version = db.session.execute(query).scalar()
+        if version is None:
+            try:
+                db.session.execute(insert(table).values(id=1, version=0))
+                db.session.commit()
+            except IntegrityError:
+                # Created by another process meanwhile
+                db.session.rollback()
+            version = db.session.execute(query).scalar()
+        return version
+
+    def get(self, db, key, build):
+        """Cached snapshot for key, or the one build() returns when the data changed since"""
+        # The version is read before the data, so a concurrent write only causes an extra rebuild
+        version = self.current_version(db)
+
+        def build_once():
+            snapshot = build()
+            snapshot.problem()  # shared along with the snapshot
+            return snapshot
+        return self.cache.get_or_compute(self.cache.key(version, key), build_once, self.ttl)
+
+    def invalidate(self, db=None):
+        """Drop the cached snapshots; with db, also in every other process (commits)"""
+        self.cache.local.clear()
+        if db is not None:
+            self.current_version(db)
+            table = self.version_model.__table__
+            db.session.execute(update(table).where(table.c.id == 1).values(version=table.c.version + 1))
+            db.session.commit()
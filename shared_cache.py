@@ -0,0 +1,235 @@
+"""
+Two-tier cache for expensive precomputed data (problem snapshots and the
+index structures built from them).
+
+The local tier is an in-process LRU holding live objects. The shared tier is
+reached by every web and job worker of a deployment: Redis in production, a
+directory of files on one host or in tests. Values cross the shared tier in
+a binary form (pickle protocol 5, which writes NumPy arrays as raw buffers,
+compressed with zlib), so an array is copied, not converted to text. Keys are
+namespaced and carry the serialization format version; callers add the data
+version (e.g. the problem version counter) to their keys, so a change of data
+or format never reads a stale entry and old entries simply expire.
+
+Unpickling runs code, so shared entries are signed: each blob carries an
+HMAC-SHA256 over its key and content, keyed on the application's
+SECRET_KEY, and a blob whose signature does not verify is a miss that never
+reaches pickle. Whoever can write to the cache but lacks the secret key can
+neither plant an entry nor move one to another key.
+"""
+
+import hashlib
+import hmac
+import os
+import pickle
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+FORMAT = 1  # bump when the layout of cached values changes
+# Placeholder keys shipped with the apps and .env.example; everyone can sign with them
+DEFAULT_SECRETS = frozenset({'your-secret-key-here', 'your_secret_key_here', 'dev-secret-key-change-in-production'})
+_MISSING = object()
+
+def encode(value):
+    """Binary form of a value for the shared tier"""
+    return zlib.compress(pickle.dumps(value, protocol=5), 1)
+
+def decode(blob):
+    return pickle.loads(zlib.decompress(blob))
+
+class MemoryCache:
+    """In-process LRU of live objects with optional per-entry TTL"""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self.lock:
+            self.entries[key] = (None if ttl is None else time.time() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+class FileCache:
+    """
+    Shared tier in a directory: one file per key (named by its hash), written
+    atomically, with its expiry time in the first line. Stands in for Redis
+    in tests and serves all processes of a single host.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as handle:
+                expires_at = float(handle.readline())
+                blob = handle.read()
+        except (OSError, ValueError):
+            return None
+        if expires_at and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return blob
+
+    def set(self, key, blob, ttl=None):
+        expires_at = 0 if ttl is None else time.time() + ttl
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(descriptor, 'wb') as handle:
+            handle.write(f"{expires_at}\n".encode())
+            handle.write(blob)
+        os.replace(temporary, self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+class RedisCache:
+    """Shared tier in Redis; entries expire through Redis itself"""
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError('A redis:// cache URL requires the redis package. Please install it: pip install redis')
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, blob, ttl=None):
+        self.client.set(key, blob, ex=None if ttl is None else max(1, int(ttl)))
+
+    def delete(self, key):
+        self.client.delete(key)
+
+class SignedTier:
+    """Shared tier wrapper signing every blob with an HMAC of its key and content"""
+
+    def __init__(self, tier, secret):
+        if not secret:
+            raise ValueError('A shared cache tier needs the secret key to sign its entries')
+        self.tier = tier
+        self.secret = secret.encode() if isinstance(secret, str) else secret
+
+    def _signature(self, key, blob):
+        return hmac.new(self.secret, key.encode() + b'\0' + blob, hashlib.sha256).digest()
+
+    def get(self, key):
+        signed = self.tier.get(key)
+        if signed is None:
+            return None
+        size = hashlib.sha256().digest_size
+        signature, blob = signed[:size], signed[size:]
+        if not hmac.compare_digest(signature, self._signature(key, blob)):
+            return None
+        return blob
+
+    def set(self, key, blob, ttl=None):
+        self.tier.set(key, self._signature(key, blob) + blob, ttl)
+
+    def delete(self, key):
+        self.tier.delete(key)
+
+class TieredCache:
+    """Local LRU in front of an optional shared tier; shared hits are promoted to the local tier"""
+
+    def __init__(self, local=None, shared=None, namespace='timetabling'):
+        self.local = local or MemoryCache()
+        self.shared = shared
+        self.namespace = namespace
+
+    def key(self, *parts):
+        """Versioned key: namespace, serialization format and the caller's parts"""
+        return ':'.join([self.namespace, f'f{FORMAT}', *map(str, parts)])
+
+    def get(self, key, default=None):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.shared is not None:
+            try:
+                blob = self.shared.get(key)
+                if blob is not None:
+                    value = decode(blob)
+                    self.local.set(key, value)
+                    return value
+            except Exception:
+                # An unreachable or corrupt shared tier is only a miss
+                pass
+        return default
+
+    def set(self, key, value, ttl=None):
+        self.local.set(key, value, ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, encode(value), ttl)
+            except Exception:
+                pass
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """Cached value of key; otherwise compute() once here and publish it to both tiers"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        self.local.delete(key)
+        if self.shared is not None:
+            try:
+                self.shared.delete(key)
+            except Exception:
+                pass
+
+def shared_tier(url, secret):
+    """
+    Signed shared tier of a cache URL: redis://... or rediss://...,
+    file:///directory, or None when unset. secret is the application's
+    SECRET_KEY, which all workers sharing the tier must have in common;
+    an unset or placeholder key is refused (ValueError).
+    """
+    if not url:
+        return None
+    if not secret or secret in DEFAULT_SECRETS:
+        raise ValueError('A shared cache tier needs a SECRET_KEY of its own: with the default key '
+                         'anyone who can write to the cache can forge entries')
+    scheme = urlparse(url).scheme
+    if scheme in ('redis', 'rediss', 'unix'):
+        return SignedTier(RedisCache(url), secret)
+    if scheme == 'file':
+        return SignedTier(FileCache(urlparse(url).path), secret)
+    raise ValueError(f"Unsupported cache URL '{url}'")
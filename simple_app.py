@@ -1,20 +1,49 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, make_response, send_file
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, make_response, send_file, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
-from datetime import datetime, time, date, timedelta
+from datetime import datetime
 import json
-import random
 import math
 import csv
 import io
 import tempfile
+from algorithms.deadline import Deadline, parse_time_budget
+from algorithms.rng import parse_seed, make_rng
+from algorithms.progress import ProgressReporter
+from algorithms.elite_archive import EliteArchive, problem_fingerprint, encode_solution, decode_solution
+import jobs
+import exam_calendar
+import timetable_store
+from timetable_api import (timetable_page, strong_etag, not_modified, cached_response, requested_fields,
+                           field_value, list_response)
+from problem_snapshot import ProblemSnapshot, SnapshotCache, TimeSlotRow
+import shared_cache
+import migrate
 
 app = Flask(__name__)
-app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///timetabling.db'
+# Signs sessions and shared cache entries; set it in production (a shared cache refuses the default)
+app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or 'sqlite:///timetabling.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Wall-clock budget for a single optimization run (seconds); runs execute in the job workers,
+# outside gunicorn's --timeout 120
+app.config['OPTIMIZATION_TIME_BUDGET'] = 600
+app.config['OPTIMIZATION_WORKERS'] = 2  # job worker processes started with the development server
+app.config['OPTIMIZATION_MAX_RUNNING'] = 2  # jobs running at once over all workers sharing the database
+app.config['OPTIMIZATION_MAX_RUNNING_PER_USER'] = 1  # further jobs of the same user wait in the queue
+app.config['OPTIMIZATION_MAX_PENDING_PER_USER'] = 5  # queued or running jobs a user may have
+app.config['PROGRESS_INTERVAL'] = 0.5  # seconds between published progress events of a run
+app.config['PROGRESS_STREAM_SECONDS'] = 30  # a progress stream reconnects after this, freeing its web worker
+app.config['EXAM_PERIOD_START'] = None  # first exam day (YYYY-MM-DD); None starts the window today
+app.config['EXAM_PERIOD_DAYS'] = 7
+app.config['ELITE_ARCHIVE_SIZE'] = 10  # solutions kept per problem fingerprint
+app.config['SCENARIO_SWEEP_MAX'] = 20  # scenarios in one /scenarios request
+app.config['SCENARIO_SWEEP_WORKERS'] = 2  # processes a sweep job solves scenarios with
+app.config['TIMETABLES_PAGE_SIZE'] = 50  # timetables per listing page (the API allows up to 200)
+# Cache tier shared by all workers (redis://host:6379/0 or file:///directory); unset keeps caches per process
+app.config['CACHE_URL'] = os.environ.get('CACHE_URL')
 
 db = SQLAlchemy(app)
 login_manager = LoginManager()
@@ -53,6 +82,7 @@ class Course(db.Model):
     students = db.Column(db.Integer, default=0)
     duration = db.Column(db.Integer, default=120)
     department = db.Column(db.String(100), default='IT')
+    program = db.Column(db.String(200), default='General')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Room(db.Model):
@@ -74,6 +104,7 @@ class TimeSlot(db.Model):
     end_time = db.Column(db.Time, nullable=False)
     slot_type = db.Column(db.String(20), default='Regular')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (db.UniqueConstraint('day', 'start_time', name='uq_time_slot_day_start'),)
 
 class Constraint(db.Model):
     """Constraint model for scheduling rules"""
@@ -95,6 +126,8 @@ class Timetable(db.Model):
     fitness_score = db.Column(db.Float, nullable=False)
     constraint_violations = db.Column(db.Integer, nullable=False)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    seed = db.Column(db.BigInteger)  # Random seed of the optimizer run, replays it exactly
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # ETag of its API views
     # Simplified model to match existing database structure
 
 class TimetableEntry(db.Model):
@@ -105,12 +138,63 @@ class TimetableEntry(db.Model):
     course_id = db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False)
     room_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=False)
     time_slot_id = db.Column(db.Integer, db.ForeignKey('time_slot.id'), nullable=False)
+    __table_args__ = (db.Index('ix_timetable_entry_timetable_slot', 'timetable_id', 'time_slot_id'),)
 
     # Relationships (do not change DB schema)
     course = db.relationship('Course', lazy='joined')
     room = db.relationship('Room', lazy='joined')
     time_slot = db.relationship('TimeSlot', lazy='joined')
 
+class EliteSolution(db.Model):
+    """Archive of the best distinct solutions per problem fingerprint, used to seed new runs"""
+    __tablename__ = 'elite_solution'
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False, index=True)
+    cost = db.Column(db.Float, nullable=False)  # full fitness, lower is better
+    constraint_violations = db.Column(db.Integer, nullable=False)
+    algorithm_used = db.Column(db.String(50), nullable=False)
+    data = db.Column(db.Text, nullable=False)  # compact solution as JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (db.Index('ix_elite_solution_fingerprint_cost', 'fingerprint', 'cost'),)
+
+class OptimizationJob(db.Model):
+    """Queued optimization run, executed by a job worker and polled through /jobs/<id>"""
+    __tablename__ = 'optimization_job'
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed, cancelled
+    priority = db.Column(db.Integer, nullable=False, default=0)  # 0 interactive, 10 overnight batch
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    parameters = db.Column(db.Text, nullable=False)  # request parameters as JSON
+    request_key = db.Column(db.String(64), index=True)  # content address of problem data, algorithm and parameters
+    flight_key = db.Column(db.String(64), unique=True)  # request key while queued or running, so identical requests merge
+    follows = db.Column(db.String(32), db.ForeignKey('optimization_job.id'))  # job whose outcome this one reuses
+    result = db.Column(db.Text)  # optimization response as JSON
+    error = db.Column(db.Text)
+    worker = db.Column(db.String(100))  # host:pid of the worker that claimed the job
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    __table_args__ = (db.Index('ix_optimization_job_status_priority', 'status', 'priority', 'created_at'),)  # queue order
+
+class OptimizationJobEvent(db.Model):
+    """Progress event of a running optimization job, streamed through /jobs/<id>/events"""
+    __tablename__ = 'optimization_job_event'
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(32), db.ForeignKey('optimization_job.id'), nullable=False, index=True)
+    data = db.Column(db.Text, nullable=False)  # iteration, fitness, violations and moves per second as JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ProblemVersion(db.Model):
+    """Single-row counter bumped by every write to the problem data; cached snapshots are checked against it"""
+    __tablename__ = 'problem_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Problem snapshots, built once per deployment with a shared cache tier and dropped whenever courses, rooms, slots or constraints change
+snapshot_cache = SnapshotCache(ProblemVersion, shared=shared_cache.shared_tier(app.config['CACHE_URL'], app.config['SECRET_KEY']))
+snapshot_cache.watch(Course, Room, TimeSlot, Constraint)
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -217,7 +301,7 @@ def dashboard():
     """Research dashboard with algorithm configuration and results"""
     courses = Course.query.all()
     rooms = Room.query.all()
-    time_slots = TimeSlot.query.all()
+    time_slots = exam_time_slots()
     constraints = Constraint.query.all()
     
     return render_template('dashboard.html', 
@@ -235,8 +319,9 @@ def manage_courses():
         code = request.form.get('code')
         students = int(request.form.get('students', 0))
         duration = int(request.form.get('duration', 120))
+        program = request.form.get('program') or 'General'
         
-        course = Course(name=name, code=code, students=students, duration=duration)
+        course = Course(name=name, code=code, students=students, duration=duration, program=program)
         db.session.add(course)
         db.session.commit()
         flash('Course added successfully!')
@@ -287,20 +372,115 @@ def manage_constraints():
     constraints = Constraint.query.all()
     return render_template('constraints.html', constraints=constraints)
 
+# Timetable columns of the API, in response order; ?fields= selects a subset
+TIMETABLE_FIELDS = ('id', 'name', 'algorithm_used', 'fitness_score', 'constraint_violations', 'created_by', 'seed',
+                    'updated_at')
+
 @app.route('/timetables')
 @login_required
 def view_timetables():
-    """View all generated timetables"""
-    timetables = Timetable.query.all()
-    return render_template('timetables.html', timetables=timetables)
+    """View generated timetables, newest first, one page at a time"""
+    after = request.args.get('after', type=int)
+    timetables, next_after = timetable_page(db, Timetable, after, app.config['TIMETABLES_PAGE_SIZE'],
+                                            ('name', 'algorithm_used', 'fitness_score'))
+    return render_template('timetables.html', timetables=timetables, next_after=next_after, after=after)
 
 @app.route('/timetable/<int:timetable_id>')
 @login_required
 def view_timetable(timetable_id):
-    """View a specific timetable"""
+    """View a specific timetable; unchanged pages are revalidated with a 304"""
+    updated_at = db.session.query(Timetable.updated_at).filter(Timetable.id == timetable_id).scalar()
+    # Entries show course, room and slot details, so their edits change the page too
+    etag = strong_etag('html', timetable_id, updated_at, snapshot_cache.current_version(db), current_user.id)
+    if not session.get('_flashes'):
+        unchanged = not_modified(etag)
+        if unchanged:
+            return unchanged
     timetable = Timetable.query.get_or_404(timetable_id)
     entries = TimetableEntry.query.filter_by(timetable_id=timetable_id).all()
-    return render_template('timetable_detail.html', timetable=timetable, entries=entries)
+    return cached_response(make_response(render_template('timetable_detail.html', timetable=timetable,
+                                                         entries=entries)), etag)
+
+@app.route('/api/timetables')
+@login_required
+def api_timetables():
+    """
+    JSON list of timetables, newest first. ?limit= (1-200) rows per page,
+    ?after= the cursor of the next page (given in 'next' and the Link
+    header), ?fields= a comma-separated subset of TIMETABLE_FIELDS.
+    """
+    return list_response(db, Timetable, TIMETABLE_FIELDS, app.config['TIMETABLES_PAGE_SIZE'])
+
+@app.route('/api/timetables/<int:timetable_id>')
+@login_required
+def api_timetable(timetable_id):
+    """JSON view of one timetable: ?fields= as for the list, ?include=entries adds its exam assignments"""
+    try:
+        fields = requested_fields(TIMETABLE_FIELDS)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    include_entries = 'entries' in request.args.get('include', '').split(',')
+    
+    updated_at = db.session.query(Timetable.updated_at).filter(Timetable.id == timetable_id).first()
+    if updated_at is None:
+        return jsonify({'success': False, 'error': 'Timetable not found'}), 404
+    version = snapshot_cache.current_version(db) if include_entries else None
+    etag = strong_etag('detail', timetable_id, updated_at[0], fields, include_entries, version)
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+    
+    row = db.session.query(*[getattr(Timetable, name) for name in fields]).filter(Timetable.id == timetable_id).one()
+    payload = {name: field_value(row, name) for name in fields}
+    if include_entries:
+        entries = (db.session.query(TimetableEntry.course_id, Course.code, Course.name, TimetableEntry.room_id,
+                                    Room.name, TimetableEntry.time_slot_id, TimeSlot.day, TimeSlot.start_time,
+                                    TimeSlot.end_time)
+                   .join(Course, Course.id == TimetableEntry.course_id)
+                   .join(Room, Room.id == TimetableEntry.room_id)
+                   .join(TimeSlot, TimeSlot.id == TimetableEntry.time_slot_id)
+                   .filter(TimetableEntry.timetable_id == timetable_id)
+                   .order_by(TimeSlot.day, TimeSlot.start_time, Room.name))
+        payload['entries'] = [{
+            'course_id': course_id, 'course_code': code, 'course_name': course_name,
+            'room_id': room_id, 'room_name': room_name,
+            'time_slot_id': slot_id, 'day': day, 'start_time': start.strftime('%H:%M'), 'end_time': end.strftime('%H:%M')
+        } for course_id, code, course_name, room_id, room_name, slot_id, day, start, end in entries]
+    return cached_response(jsonify(payload), etag)
+
+@app.route('/timetable/<int:timetable_id>/reoptimize', methods=['POST'])
+@login_required
+def reoptimize_timetable(timetable_id):
+    """
+    Queue a repair of a published timetable after data edits, keeping it as
+    stable as possible; a job worker runs it while the client polls /jobs/<id>
+    """
+    Timetable.query.get_or_404(timetable_id)
+    data = request.get_json(silent=True) or {}
+    try:
+        parameters = {
+            'algorithm': 'reoptimize',
+            'timetable_id': timetable_id,
+            'changes': {entity: [int(record_id) for record_id in data.get(entity) or []]
+                        for entity in ('courses', 'rooms', 'time_slots')},
+            'time_budget': parse_time_budget(data.get('time_budget'), app.config['OPTIMIZATION_TIME_BUDGET']),
+        }
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid re-optimization request: {e}'}), 400
+    
+    limited = pending_limit_error(current_user.id)
+    if limited:
+        return limited
+    
+    # It edits the stored timetable, so it is never answered by or merged with another request
+    job = jobs.enqueue(db, OptimizationJob, parameters, current_user.id, 'interactive')
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'queue_position': jobs.queue_position(db, OptimizationJob, job),
+        'status_url': url_for('optimization_job_status', job_id=job.id),
+    }), 202
 
 @app.route('/export/<int:timetable_id>')
 @login_required
@@ -554,155 +734,85 @@ def settings():
     """User settings page"""
     return render_template('settings.html', user=current_user)
 
-def refresh_time_slots(days_ahead: int = 7):
-    """Rebuild time slots to cover today + next days_ahead-1 using real dates.
-    Stores ISO dates (YYYY-MM-DD) in TimeSlot.day to avoid schema changes."""
-    # Clear existing time slots to avoid stale past dates
-    TimeSlot.query.delete()
-    db.session.commit()
+def exam_time_slots():
+    """Time slots of the configured exam period; created once per period, their ids never change"""
+    days = exam_calendar.exam_window(app.config['EXAM_PERIOD_START'], app.config['EXAM_PERIOD_DAYS'])
+    return exam_calendar.window_slots(db, TimeSlot, days)
 
-    start = date.today()
-    for offset in range(days_ahead):
-        d = start + timedelta(days=offset)
-        day_label = d.isoformat()  # e.g., 2025-09-02
-        # Morning slots
-        slots = [
-            TimeSlot(day=day_label, start_time=time(8, 0), end_time=time(10, 0), slot_type='Regular'),
-            TimeSlot(day=day_label, start_time=time(10, 30), end_time=time(12, 30), slot_type='Regular'),
-            # Afternoon slots
-            TimeSlot(day=day_label, start_time=time(14, 0), end_time=time(16, 0), slot_type='Regular'),
-            TimeSlot(day=day_label, start_time=time(16, 30), end_time=time(18, 30), slot_type='Regular'),
-        ]
-        for s in slots:
-            db.session.add(s)
-    db.session.commit()
+def problem_snapshot():
+    """Courses, rooms, exam-period slots and active constraints as a cached ProblemSnapshot"""
+    days = exam_calendar.exam_window(app.config['EXAM_PERIOD_START'], app.config['EXAM_PERIOD_DAYS'])
+    def build():
+        exam_calendar.ensure_slots(db, TimeSlot, days)
+        return ProblemSnapshot.from_database(db, Course, Room, TimeSlot, Constraint, days)
+    return snapshot_cache.get(db, tuple(days), build)
 
 @app.route('/optimize', methods=['POST'])
 @login_required
 def optimize_timetable():
-    """Run the optimization algorithms and generate actual timetables"""
+    """Queue an optimization run; a job worker generates the timetable while the client polls /jobs/<id>"""
     try:
         # Get form data
-        algorithm = request.form.get('algorithm', 'hybrid')
-        population_size = int(request.form.get('population_size', 50))
-        generations = int(request.form.get('generations', 100))
-        mutation_rate = float(request.form.get('mutation_rate', 0.1))
-        temperature = float(request.form.get('temperature', 1000))
-        cooling_rate = float(request.form.get('cooling_rate', 0.95))
+        parameters = {
+            'algorithm': request.form.get('algorithm', 'hybrid'),
+            'population_size': int(request.form.get('population_size', 50)),
+            'generations': int(request.form.get('generations', 100)),
+            'mutation_rate': float(request.form.get('mutation_rate', 0.1)),
+            'temperature': float(request.form.get('temperature', 1000)),
+            'cooling_rate': float(request.form.get('cooling_rate', 0.95)),
+            'time_budget': parse_time_budget(request.form.get('time_budget'), app.config['OPTIMIZATION_TIME_BUDGET']),
+            'parameter_profile': request.form.get('parameter_profile', 'manual'),
+            'seed': parse_seed(request.form.get('seed')),
+            # An entered seed replays a run exactly, so it must not depend on what the archive holds by now
+            'archive_seeding': not request.form.get('seed')
+        }
         
         # Check if we have data to work with
-        courses = Course.query.all()
-        rooms = Room.query.all()
-        constraints = Constraint.query.all()
-        
-        if not courses:
+        if not Course.query.first():
             return jsonify({
                 'success': False,
                 'error': 'No courses found. Please add some courses first.'
             }), 400
             
-        if not rooms:
+        if not Room.query.first():
             return jsonify({
                 'success': False,
                 'error': 'No rooms found. Please add some rooms first.'
             }), 400
         
-        # Always refresh time slots to reflect current date (next 7 days)
-        refresh_time_slots(days_ahead=7)
-        time_slots = TimeSlot.query.all()
-        
-        if not time_slots:
+        priority = request.form.get('priority', 'interactive')
+        if priority not in jobs.PRIORITIES:
             return jsonify({
                 'success': False,
-                'error': 'No time slots available. Please try again.'
+                'error': f"Unknown priority '{priority}'."
             }), 400
         
-        # Start timing
-        import time as _time
-        start_time_ts = _time.time()
-        
-        # Generate timetable using the selected algorithm
-        if algorithm == 'genetic':
-            timetable_entries, fitness_score, violations = genetic_algorithm_timetabling(
-                courses, rooms, time_slots, population_size, generations, mutation_rate
-            )
-        elif algorithm == 'simulated_annealing':
-            timetable_entries, fitness_score, violations = simulated_annealing_timetabling(
-                courses, rooms, time_slots, temperature, cooling_rate, generations
-            )
-        else:  # hybrid
-            timetable_entries, fitness_score, violations = hybrid_algorithm_timetabling(
-                courses, rooms, time_slots, population_size, generations, mutation_rate, temperature, cooling_rate
-            )
-        
-        execution_time = _time.time() - start_time_ts
-        
-        # Save the generated timetable to database
-        timetable_name = f"{algorithm.title()} Timetable - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        timetable = Timetable(
-            name=timetable_name,
-            algorithm_used=algorithm,
-            fitness_score=fitness_score,
-            constraint_violations=violations,
-            created_by=current_user.id
-        )
-        db.session.add(timetable)
-        db.session.flush()  # Get the ID
-        
-        # Save timetable entries
-        for entry in timetable_entries:
-            db_entry = TimetableEntry(
-                timetable_id=timetable.id,
-                course_id=entry['course_id'],
-                room_id=entry['room_id'],
-                time_slot_id=entry['time_slot_id']
-            )
-            db.session.add(db_entry)
-        
-        db.session.commit()
-        
-        # Generate fitness scores for chart (simulate improvement over generations)
-        fitness_scores = []
-        for gen in range(min(generations, 20)):
-            improvement = (gen / generations) * 0.8
-            noise = (hash(f"{gen}_{algorithm}") % 100) / 1000
-            current_fitness = 1000 * (1 - improvement + noise)
-            fitness_scores.append(max(current_fitness, 200))
-        
-        # Count actual courses and time slots used
-        courses_scheduled = len(set(entry['course_id'] for entry in timetable_entries))
-        time_slots_used = len(set(entry['time_slot_id'] for entry in timetable_entries))
-        rooms_used = len(set(entry['room_id'] for entry in timetable_entries))
-        
-        # Generate dynamic message based on actual results
-        algorithm_name = {
-            'genetic': 'Genetic Algorithm',
-            'simulated_annealing': 'Simulated Annealing',
-            'hybrid': 'Hybrid GA+SA'
-        }.get(algorithm, algorithm.title())
-        
-        # Create detailed message with real statistics
-        message = f"Generated {courses_scheduled} course examinations using {algorithm_name}. "
-        message += f"Utilized {rooms_used} examination rooms across {time_slots_used} time slots. "
-        message += f"Fitness score: {fitness_score:.1f}, Violations: {violations}. "
-        message += f"Execution time: {execution_time:.2f} seconds."
+        limited = pending_limit_error(current_user.id)
+        if limited:
+            return limited
         
+        # Identical requests reuse a stored result or join the run already under way
+        key = optimization_request_key(parameters, explicit_seed=bool(request.form.get('seed')))
+        job = jobs.enqueue(db, OptimizationJob, parameters, current_user.id, priority,
+                           key=key, reusable=reusable_result)
         return jsonify({
             'success': True,
-            'algorithm': algorithm,
-            'algorithm_name': algorithm_name,
-            'execution_time': f"{execution_time:.2f}s",
-            'best_fitness': f"{fitness_score:.1f}",
-            'constraint_violations': violations,
-            'fitness_scores': fitness_scores,
-            'generations_completed': len(fitness_scores),
-            'timetable_id': timetable.id,
-            'courses_scheduled': courses_scheduled,
-            'rooms_used': rooms_used,
-            'time_slots_used': time_slots_used,
-            'total_entries': len(timetable_entries),
-            'message': message
-        })
+            'job_id': job.id,
+            'status': job.status,
+            'cached': job.status == jobs.SUCCEEDED,
+            'merged': job.follows is not None and job.status != jobs.SUCCEEDED,
+            'priority': priority,
+            'queue_position': jobs.queue_position(db, OptimizationJob, job),
+            'status_url': url_for('optimization_job_status', job_id=job.id),
+            'seed': json.loads(db.session.get(OptimizationJob, job.follows).parameters)['seed']
+                    if job.follows else parameters['seed']
+        }), 202
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
         
     except Exception as e:
         return jsonify({
@@ -710,8 +820,403 @@ def optimize_timetable():
             'error': f'Optimization failed: {str(e)}'
         }), 500
 
-def genetic_algorithm_timetabling(courses, rooms, time_slots, population_size, generations, mutation_rate):
-    """Basic genetic algorithm for timetable generation"""
+def pending_limit_error(user_id):
+    """429 response when the user already has as many runs queued or running as allowed, else None"""
+    pending = OptimizationJob.query.filter(OptimizationJob.created_by == user_id,
+                                           OptimizationJob.status.in_((jobs.QUEUED, jobs.RUNNING))).count()
+    if pending >= app.config['OPTIMIZATION_MAX_PENDING_PER_USER']:
+        return jsonify({
+            'success': False,
+            'error': f'You already have {pending} optimization runs queued or running. '
+                     'Wait for one to finish or cancel it.'
+        }), 429
+    return None
+
+def scenario_overrides(changes):
+    """Validated overrides of one entity: ids to remove, attribute updates by id and records to add"""
+    return {
+        'remove': [int(record_id) for record_id in changes.get('remove', [])],
+        'update': {str(int(record_id)): dict(values) for record_id, values in (changes.get('update') or {}).items()},
+        'add': [dict(values) for values in changes.get('add', [])],
+    }
+
+@app.route('/scenarios', methods=['POST'])
+@login_required
+def optimize_scenarios():
+    """
+    Queue a sweep of what-if scenarios as one job. The JSON body holds the base
+    parameters of /optimize and 'scenarios', each with a name, optional
+    algorithm, parameters and time_budget, and overrides of 'courses', 'rooms'
+    and 'time_slots' ({'remove': [ids], 'update': {id: {...}}, 'add': [{...}]}).
+    The job result is a comparison table against the unchanged data.
+    """
+    from algorithms.scenarios import SCENARIO_ENGINES, ENTITIES
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        base = {
+            'algorithm': data.get('algorithm', 'tabu'),
+            'population_size': int(data.get('population_size', 50)),
+            'generations': int(data.get('generations', 100)),
+            'mutation_rate': float(data.get('mutation_rate', 0.1)),
+            'temperature': float(data.get('temperature', 1000)),
+            'cooling_rate': float(data.get('cooling_rate', 0.95)),
+        }
+        time_budget = parse_time_budget(data.get('time_budget'), app.config['OPTIMIZATION_TIME_BUDGET'])
+        seed = parse_seed(data.get('seed'))
+        requested = list(data.get('scenarios') or [])
+        if data.get('baseline', True):
+            requested.insert(0, {'name': 'Baseline'})
+        
+        scenarios = []
+        for number, scenario in enumerate(requested, 1):
+            algorithm = scenario.get('algorithm', base['algorithm'])
+            if algorithm not in SCENARIO_ENGINES:
+                raise ValueError(f"Unknown scenario algorithm '{algorithm}'.")
+            parameters = {**base, **(scenario.get('parameters') or {})}
+            names = ('population_size', 'generations', 'mutation_rate')
+            if algorithm == 'hybrid':
+                names += ('temperature', 'cooling_rate')
+            scenarios.append({
+                'name': str(scenario.get('name') or f'Scenario {number}'),
+                'algorithm': algorithm,
+                'parameters': {name: parameters[name] for name in names},
+                'time_budget': parse_time_budget(scenario.get('time_budget'), time_budget),
+                **{entity: scenario_overrides(scenario.get(entity) or {}) for entity in ENTITIES},
+            })
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({'success': False, 'error': f'Invalid scenario request: {e}'}), 400
+    
+    if not data.get('scenarios'):
+        return jsonify({'success': False, 'error': 'No scenarios given.'}), 400
+    if len(scenarios) > app.config['SCENARIO_SWEEP_MAX']:
+        return jsonify({
+            'success': False,
+            'error': f"At most {app.config['SCENARIO_SWEEP_MAX']} scenarios can be compared at once."
+        }), 400
+    if not Course.query.first() or not Room.query.first():
+        return jsonify({'success': False, 'error': 'Add courses and rooms before comparing scenarios.'}), 400
+    
+    priority = data.get('priority', 'batch')
+    if priority not in jobs.PRIORITIES:
+        return jsonify({'success': False, 'error': f"Unknown priority '{priority}'."}), 400
+    limited = pending_limit_error(current_user.id)
+    if limited:
+        return limited
+    
+    parameters = {
+        'algorithm': 'scenarios',
+        'scenarios': scenarios,
+        'time_budget': time_budget,
+        'seed': seed
+    }
+    key = optimization_request_key(parameters, explicit_seed=bool(data.get('seed')))
+    job = jobs.enqueue(db, OptimizationJob, parameters, current_user.id, priority,
+                       key=key, reusable=reusable_result)
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'cached': job.status == jobs.SUCCEEDED,
+        'scenarios': [scenario['name'] for scenario in scenarios],
+        'priority': priority,
+        'queue_position': jobs.queue_position(db, OptimizationJob, job),
+        'status_url': url_for('optimization_job_status', job_id=job.id),
+    }), 202
+
+@app.route('/jobs/<job_id>')
+@login_required
+def optimization_job_status(job_id):
+    """Poll a queued optimization run; the result holds the generated timetable once it succeeded"""
+    job = OptimizationJob.query.get_or_404(job_id)
+    if job.created_by != current_user.id and current_user.role != 'admin':
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify(jobs.job_status(job, jobs.queue_position(db, OptimizationJob, job)))
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_optimization_job(job_id):
+    """Cancel a queued run, or stop a running one at its next check keeping the best timetable so far"""
+    job = OptimizationJob.query.get_or_404(job_id)
+    if job.created_by != current_user.id and current_user.role != 'admin':
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if not jobs.request_cancel(db, OptimizationJob, job_id):
+        return jsonify({'success': False, 'error': 'The optimization run has already finished.'}), 409
+    db.session.refresh(job)
+    return jsonify(jobs.job_status(job))
+
+@app.route('/jobs/<job_id>/events')
+@login_required
+def optimization_job_events(job_id):
+    """Live progress of an optimization run as Server-Sent Events (best fitness, violations, moves per second)"""
+    job = OptimizationJob.query.get_or_404(job_id)
+    if job.created_by != current_user.id and current_user.role != 'admin':
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    last_event_id = int(request.headers.get('Last-Event-ID') or request.args.get('after') or 0)
+    stream = jobs.stream_events(db, OptimizationJob, OptimizationJobEvent, job_id, last_event_id,
+                                max_seconds=app.config['PROGRESS_STREAM_SECONDS'], events_of=job.follows)
+    return Response(stream_with_context(stream), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def optimization_request_key(parameters, explicit_seed):
+    """
+    Content address of an optimization request: the problem data the run
+    reads, the algorithm and its parameters. The seed only counts when the
+    user chose it; otherwise any earlier run of the same request will do.
+    """
+    return jobs.request_key({
+        'problem': problem_snapshot().digest,
+        'parameters': {name: value for name, value in parameters.items() if name != 'seed' or explicit_seed},
+    })
+
+def reusable_result(result):
+    """A stored result can answer a new request when its run was not cut short and its timetable still exists"""
+    if result.get('progress', {}).get('stopped_by') not in ('completed', 'optimal'):
+        return False
+    # A scenario sweep compares hypothetical data and saves no timetable
+    return 'scenarios' in result or db.session.get(Timetable, result.get('timetable_id')) is not None
+
+def process_optimization_job(parameters, job, cancelled):
+    """Job worker handler: run the queued optimization, publishing its progress events, and return its response"""
+    callback = lambda event: jobs.publish_event(db, OptimizationJobEvent, job.id, event)
+    if parameters['algorithm'] == 'scenarios':
+        return run_scenario_sweep(parameters, callback=callback, cancelled=cancelled)
+    if parameters['algorithm'] == 'reoptimize':
+        return run_reoptimization(parameters, callback=callback, cancelled=cancelled)
+    return run_optimization(parameters, job.created_by, callback=callback, cancelled=cancelled)
+
+def job_worker(**kwargs):
+    """Entry point of an optimization worker process (see worker.py)"""
+    return jobs.run_worker(app, db, OptimizationJob, process_optimization_job,
+                           max_runtime=2 * app.config['OPTIMIZATION_TIME_BUDGET'] + 60,
+                           max_running=app.config['OPTIMIZATION_MAX_RUNNING'],
+                           max_running_per_user=app.config['OPTIMIZATION_MAX_RUNNING_PER_USER'],
+                           event_model=OptimizationJobEvent, **kwargs)
+
+def run_optimization(parameters, user_id, callback=None, cancelled=None):
+    """
+    Run the optimization algorithms and generate actual timetables, passing
+    progress events to callback; setting the cancelled flag stops the run early
+    """
+    algorithm = parameters['algorithm']
+    population_size = parameters['population_size']
+    generations = parameters['generations']
+    mutation_rate = parameters['mutation_rate']
+    temperature = parameters['temperature']
+    cooling_rate = parameters['cooling_rate']
+    time_budget = parameters['time_budget']
+    parameter_profile = parameters['parameter_profile']
+    seed = parameters['seed']
+    
+    # Plain records of the data, cached until it changes; the engines never touch the ORM
+    snapshot = problem_snapshot()
+    courses, rooms = snapshot.courses, snapshot.rooms
+    if not courses:
+        raise ValueError('No courses found. Please add some courses first.')
+    if not rooms:
+        raise ValueError('No rooms found. Please add some rooms first.')
+    
+    # Slots of the exam period; earlier periods' slots stay for their timetables
+    time_slots = snapshot.time_slots
+    if not time_slots:
+        raise ValueError('No time slots available. Please try again.')
+    
+    # Use the offline-tuned parameters for this class of instance when requested
+    profile_name = None
+    if parameter_profile == 'auto':
+        from algorithms.tuning import select_profile
+        profile_name, tuned = select_profile(algorithm, courses, rooms, time_slots)
+        if tuned:
+            population_size = tuned['population_size']
+            generations = tuned['generations']
+            mutation_rate = tuned['mutation_rate']
+            temperature = tuned['temperature']
+            cooling_rate = tuned['cooling_rate']
+    
+    # Start timing; every algorithm returns its best solution once the budget is spent
+    deadline = Deadline(time_budget=time_budget, cancelled=cancelled)
+    
+    # The published events are also the convergence curve of the result
+    events = []
+    def record(event):
+        events.append(event)
+        if callback:
+            callback(event)
+    reporter = ProgressReporter(record, app.config['PROGRESS_INTERVAL'])
+    
+    # Population-based runs start from the archived solutions of earlier runs, unless replaying a seed
+    initial_solutions = []
+    if algorithm in ('genetic', 'hybrid') and parameters.get('archive_seeding', True):
+        initial_solutions = load_elite_seeds(courses, rooms, time_slots, population_size // 2, seed)
+    
+    # Generate timetable using the selected algorithm
+    if algorithm == 'genetic':
+        timetable_entries, fitness_score, violations, progress = genetic_algorithm_timetabling(
+            courses, rooms, time_slots, population_size, generations, mutation_rate, deadline, initial_solutions,
+            seed, reporter
+        )
+    elif algorithm == 'simulated_annealing':
+        timetable_entries, fitness_score, violations, progress = simulated_annealing_timetabling(
+            courses, rooms, time_slots, temperature, cooling_rate, generations, deadline, seed, reporter
+        )
+    elif algorithm in PACKAGE_ENGINES:
+        timetable_entries, fitness_score, violations, progress = package_engine_timetabling(
+            algorithm, courses, rooms, time_slots, population_size, generations, mutation_rate, deadline, seed,
+            reporter
+        )
+    else:  # hybrid
+        timetable_entries, fitness_score, violations, progress = hybrid_algorithm_timetabling(
+            courses, rooms, time_slots, population_size, generations, mutation_rate, temperature, cooling_rate,
+            deadline, initial_solutions, seed, reporter
+        )
+    
+    execution_time = deadline.elapsed()
+    
+    # Save the generated timetable to database
+    timetable_name = f"{algorithm.title()} Timetable - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    timetable = Timetable(
+        name=timetable_name,
+        algorithm_used=algorithm,
+        fitness_score=fitness_score,
+        constraint_violations=violations,
+        created_by=user_id,
+        seed=seed
+    )
+    db.session.add(timetable)
+    db.session.flush()  # Get the ID
+    
+    # Save timetable entries in one bulk insert
+    timetable_store.save_entries(db, TimetableEntry, timetable.id, timetable_entries)
+    
+    objective = evaluate_solution(courses, rooms, time_slots, timetable_entries, snapshot.problem())
+    archive_solution(courses, rooms, time_slots, timetable_entries, algorithm, objective)
+    db.session.commit()
+    
+    # Convergence curve for the chart: the best fitness of every published progress event
+    fitness_scores = [event['best_fitness'] for event in events]
+    
+    # Count actual courses and time slots used
+    courses_scheduled = len(set(entry['course_id'] for entry in timetable_entries))
+    time_slots_used = len(set(entry['time_slot_id'] for entry in timetable_entries))
+    rooms_used = len(set(entry['room_id'] for entry in timetable_entries))
+    
+    # Generate dynamic message based on actual results
+    algorithm_name = {
+        'genetic': 'Genetic Algorithm',
+        'simulated_annealing': 'Simulated Annealing',
+        'tabu': 'Tabu Search',
+        'late_acceptance': 'Late Acceptance Hill Climbing',
+        'great_deluge': 'Great Deluge',
+        'memetic': 'Memetic Algorithm',
+        'portfolio': 'Algorithm Portfolio',
+        'decomposition': 'Decomposition by Program',
+        'exact': 'Exact MIP (CBC)',
+        'hybrid': 'Hybrid GA+SA'
+    }.get(algorithm, algorithm.title())
+    
+    # Create detailed message with real statistics
+    message = f"Generated {courses_scheduled} course examinations using {algorithm_name}. "
+    message += f"Utilized {rooms_used} examination rooms across {time_slots_used} time slots. "
+    message += f"Fitness score: {fitness_score:.1f}, Violations: {violations}. "
+    message += f"Execution time: {execution_time:.2f} seconds."
+    if profile_name:
+        message += f" Tuned parameter profile: {profile_name}."
+    if progress.get('winner'):
+        message += f" Best engine: {progress['winner'].replace('_', ' ').title()}."
+    if objective['gap'] == 0:
+        message += " Proven optimal: the objective meets its lower bound."
+    if progress['stopped_by'] == 'cancelled':
+        message += f" Cancelled after {progress['iterations_completed']} of {progress['iterations_planned']} iterations; this is the best timetable found until then."
+    if progress['stopped_by'] == 'deadline':
+        message += f" Time budget of {time_budget:.0f}s reached after {progress['iterations_completed']} of {progress['iterations_planned']} iterations."
+    
+    return {
+        'success': True,
+        'algorithm': algorithm,
+        'algorithm_name': algorithm_name,
+        'execution_time': f"{execution_time:.2f}s",
+        'best_fitness': f"{fitness_score:.1f}",
+        'constraint_violations': violations,
+        'objective': objective['fitness'],
+        'lower_bound': objective['lower_bound'],
+        'optimality_gap': objective['gap'],
+        'fitness_scores': fitness_scores,
+        'progress_events': events,
+        'generations_completed': progress['iterations_completed'],
+        'progress': progress,
+        'winner': progress.get('winner'),
+        'parameter_profile': profile_name,
+        'seeded_from_archive': len(initial_solutions),
+        'seed': seed,
+        'parameters': {
+            'population_size': population_size,
+            'generations': generations,
+            'mutation_rate': mutation_rate,
+            'temperature': temperature,
+            'cooling_rate': cooling_rate
+        },
+        'timetable_id': timetable.id,
+        'courses_scheduled': courses_scheduled,
+        'rooms_used': rooms_used,
+        'time_slots_used': time_slots_used,
+        'total_entries': len(timetable_entries),
+        'message': message
+    }
+    
+
+def run_scenario_sweep(parameters, callback=None, cancelled=None):
+    """
+    Solve the scenarios of a sweep on the current problem snapshot, several
+    at once, and return their comparison table; nothing is saved
+    """
+    from algorithms.scenarios import ScenarioSweep
+    
+    snapshot = problem_snapshot()
+    if not snapshot.courses or not snapshot.rooms:
+        raise ValueError('No courses or rooms found. Please add some first.')
+    
+    events = []
+    def record(event):
+        events.append(event)
+        if callback:
+            callback(event)
+    reporter = ProgressReporter(record, app.config['PROGRESS_INTERVAL'])
+    
+    # The time budget is shared out over the waves of scenarios; each one's share starts when it is taken up
+    deadline = Deadline(cancelled=cancelled)
+    sweep = ScenarioSweep(snapshot.courses, snapshot.rooms, snapshot.time_slots, [], seed=parameters['seed'],
+                          callback=reporter)
+    rows, progress = sweep.optimize(parameters['scenarios'], workers=app.config['SCENARIO_SWEEP_WORKERS'],
+                                    deadline=deadline, time_budget=parameters['time_budget'])
+    
+    solved = [row for row in rows if row.get('valid')]
+    message = f"Compared {len(solved)} of {len(rows)} scenarios in {deadline.elapsed():.2f} seconds."
+    if solved:
+        best = min(solved, key=lambda row: row['fitness'])
+        message += f" Best: {best['name']} with {best['constraint_violations']} violations."
+    if progress['stopped_by'] == 'cancelled':
+        message += " Cancelled; every scenario shows the best timetable found until then."
+    elif any('fitness' in row and not row['valid'] for row in rows):
+        message += " Some scenarios were stopped before their time budget and are left out of the comparison."
+    elif progress['stopped_by'] == 'deadline':
+        message += " Some scenarios used their whole time budget."
+    
+    return {
+        'success': True,
+        'algorithm': 'scenarios',
+        'scenarios': rows,
+        'progress': progress,
+        'progress_events': events,
+        'seed': parameters['seed'],
+        'execution_time': f"{deadline.elapsed():.2f}s",
+        'message': message
+    }
+
+def genetic_algorithm_timetabling(courses, rooms, time_slots, population_size, generations, mutation_rate, deadline=None, initial_solutions=None, seed=None, callback=None):
+    """Basic genetic algorithm for timetable generation, optionally seeded with archived solutions"""
+    deadline = Deadline.resolve(deadline)
+    rng = make_rng(seed)
+    reporter = ProgressReporter.resolve(callback)
     
     # Simple constraint checking
     def check_constraints(assignment):
@@ -726,50 +1231,63 @@ def genetic_algorithm_timetabling(courses, rooms, time_slots, population_size, g
         
         return violations
     
-    # Generate initial population
-    population = []
-    for _ in range(population_size):
+    # Generate initial population, starting with the archived solutions (course id -> (room id, slot id))
+    population = [dict(solution) for solution in (initial_solutions or [])[:population_size]]
+    for _ in range(population_size - len(population)):
         assignment = {}
         for course in courses:
-            room = random.choice(rooms)
-            time_slot = random.choice(time_slots)
+            room = rooms[rng.integers(len(rooms))]
+            time_slot = time_slots[rng.integers(len(time_slots))]
             assignment[course.id] = (room.id, time_slot.id)
         population.append(assignment)
     
     best_solution = None
     best_fitness = float('inf')
+    generations_completed = 0
+    
+    # No assignment can have fewer collisions than exams beyond the (room, slot) pairs
+    min_collisions = max(0, len(courses) - len(rooms) * len(time_slots))
     
     # Evolution loop
     for generation in range(generations):
         # Evaluate fitness
+        total_violations = 0
         for solution in population:
             violations = check_constraints(solution)
+            total_violations += violations
             if violations < best_fitness:
                 best_fitness = violations
                 best_solution = solution.copy()
+        reporter.update(generation + 1, best_fitness, total_violations / len(population), best_fitness,
+                        moves=len(population))
         
         # Selection and crossover
         new_population = []
         for _ in range(population_size):
-            parent1 = random.choice(population)
-            parent2 = random.choice(population)
+            parent1 = population[rng.integers(len(population))]
+            parent2 = population[rng.integers(len(population))]
             
             # Simple crossover
             child = {}
             for course_id in courses:
-                if random.random() < 0.5:
+                if rng.random() < 0.5:
                     child[course_id.id] = parent1.get(course_id.id, (0, 0))
                 else:
                     child[course_id.id] = parent2.get(course_id.id, (0, 0))
             
             # Mutation
-            if random.random() < mutation_rate:
-                course_id = random.choice(list(child.keys()))
-                child[course_id] = (random.choice(rooms).id, random.choice(time_slots).id)
+            if rng.random() < mutation_rate:
+                course_id = list(child.keys())[rng.integers(len(child))]
+                child[course_id] = (rooms[rng.integers(len(rooms))].id, time_slots[rng.integers(len(time_slots))].id)
             
             new_population.append(child)
         
         population = new_population
+        generations_completed += 1
+        
+        # Stop once no better solution can exist, or keep the best so far once the time budget is spent
+        if best_fitness <= min_collisions or deadline.expired():
+            break
     
     # Convert best solution to timetable entries
     entries = []
@@ -782,10 +1300,15 @@ def genetic_algorithm_timetabling(courses, rooms, time_slots, population_size, g
     
     # Calculate proper fitness score (lower violations = higher fitness)
     fitness_score = max(1000 - (best_fitness * 100), 100)
-    return entries, fitness_score, best_fitness
+    reporter.update(generations_completed, best_fitness, violations=best_fitness, moves=0, force=True)
+    progress = deadline.progress(generations_completed, generations, best_fitness <= min_collisions)
+    return entries, fitness_score, best_fitness, progress
 
-def simulated_annealing_timetabling(courses, rooms, time_slots, temperature, cooling_rate, iterations):
+def simulated_annealing_timetabling(courses, rooms, time_slots, temperature, cooling_rate, iterations, deadline=None, seed=None, callback=None):
     """Basic simulated annealing for timetable generation"""
+    deadline = Deadline.resolve(deadline)
+    rng = make_rng(seed)
+    reporter = ProgressReporter.resolve(callback)
     
     def check_constraints(assignment):
         violations = 0
@@ -802,26 +1325,28 @@ def simulated_annealing_timetabling(courses, rooms, time_slots, temperature, coo
     # Generate initial solution
     current_solution = {}
     for course in courses:
-        room = random.choice(rooms)
-        time_slot = random.choice(time_slots)
+        room = rooms[rng.integers(len(rooms))]
+        time_slot = time_slots[rng.integers(len(time_slots))]
         current_solution[course.id] = (room.id, time_slot.id)
     
     current_fitness = check_constraints(current_solution)
     best_solution = current_solution.copy()
     best_fitness = current_fitness
+    min_collisions = max(0, len(courses) - len(rooms) * len(time_slots))
     
     # Annealing loop
+    iterations_completed = 0
     for iteration in range(iterations):
         # Generate neighbor
         neighbor = current_solution.copy()
-        course_id = random.choice(list(neighbor.keys()))
-        neighbor[course_id] = (random.choice(rooms).id, random.choice(time_slots).id)
+        course_id = list(neighbor.keys())[rng.integers(len(neighbor))]
+        neighbor[course_id] = (rooms[rng.integers(len(rooms))].id, time_slots[rng.integers(len(time_slots))].id)
         
         neighbor_fitness = check_constraints(neighbor)
         
         # Accept or reject
         delta = neighbor_fitness - current_fitness
-        if delta < 0 or random.random() < math.exp(-delta / temperature):
+        if delta < 0 or rng.random() < math.exp(-delta / temperature):
             current_solution = neighbor
             current_fitness = neighbor_fitness
             
@@ -831,6 +1356,12 @@ def simulated_annealing_timetabling(courses, rooms, time_slots, temperature, coo
         
         # Cool down
         temperature *= cooling_rate
+        iterations_completed += 1
+        reporter.update(iterations_completed, best_fitness, violations=best_fitness)
+        
+        # Stop once no better solution can exist; check the time budget once per 100 moves
+        if best_fitness <= min_collisions or (iteration % 100 == 99 and deadline.expired()):
+            break
     
     # Convert best solution to timetable entries
     entries = []
@@ -843,31 +1374,242 @@ def simulated_annealing_timetabling(courses, rooms, time_slots, temperature, coo
     
     # Calculate proper fitness score (lower violations = higher fitness)
     fitness_score = max(1000 - (best_fitness * 100), 100)
-    return entries, fitness_score, best_fitness
+    reporter.update(iterations_completed, best_fitness, violations=best_fitness, moves=0, force=True)
+    progress = deadline.progress(iterations_completed, iterations, best_fitness <= min_collisions)
+    return entries, fitness_score, best_fitness, progress
+
+# Engines that run on the incremental evaluator from the algorithms package
+PACKAGE_ENGINES = ('tabu', 'late_acceptance', 'great_deluge', 'memetic', 'portfolio', 'decomposition', 'exact')
 
-def hybrid_algorithm_timetabling(courses, rooms, time_slots, population_size, generations, mutation_rate, temperature, cooling_rate):
-    """Hybrid approach combining GA and SA"""
-    # Start with GA to get a good initial solution
-    ga_entries, ga_fitness, ga_violations = genetic_algorithm_timetabling(
-        courses, rooms, time_slots, population_size, generations // 2, mutation_rate
+def package_engine_timetabling(algorithm, courses, rooms, time_slots, population_size, generations, mutation_rate, deadline=None, seed=None, callback=None):
+    """Engines from the algorithms package (tabu, late acceptance, great deluge, memetic, portfolio, decomposition, exact)"""
+    from algorithms.tabu_search import TabuSearch
+    from algorithms.late_acceptance import LateAcceptanceHillClimbing
+    from algorithms.great_deluge import GreatDeluge
+    from algorithms.memetic_algorithm import MemeticAlgorithm
+    from algorithms.portfolio import PortfolioSolver
+    from algorithms.decomposition import DecompositionSolver
+    from algorithms.exact import ExactSolver
+    
+    optimizer_class = {
+        'tabu': TabuSearch,
+        'late_acceptance': LateAcceptanceHillClimbing,
+        'great_deluge': GreatDeluge,
+        'memetic': MemeticAlgorithm,
+        'portfolio': PortfolioSolver,
+        'decomposition': DecompositionSolver,
+        'exact': ExactSolver
+    }[algorithm]
+    optimizer = optimizer_class(courses, rooms, time_slots, [], seed=seed, callback=callback)
+    best_timetable, _ = optimizer.optimize_with_parameters(
+        population_size=population_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        deadline=Deadline.resolve(deadline)
+    )
+    
+    # Convert best solution to timetable entries
+    entries = []
+    for assignment in best_timetable['assignments']:
+        entries.append({
+            'course_id': assignment['course_id'],
+            'room_id': assignment['room_id'],
+            'time_slot_id': assignment['time_slot_id']
+        })
+    
+    # Calculate proper fitness score (lower violations = higher fitness)
+    violations = best_timetable['constraint_violations']
+    fitness_score = max(1000 - (violations * 100), 100)
+    return entries, fitness_score, violations, optimizer.progress
+
+def hybrid_algorithm_timetabling(courses, rooms, time_slots, population_size, generations, mutation_rate, temperature, cooling_rate, deadline=None, initial_solutions=None, seed=None, callback=None):
+    """Hybrid approach combining GA and SA, each phase on its own spawned random stream"""
+    deadline = Deadline.resolve(deadline)
+    ga_stream, sa_stream = make_rng(seed).spawn(2)
+    reporter = ProgressReporter.resolve(callback)
+    
+    # Start with GA to get a good initial solution (half of the time budget)
+    ga_entries, ga_fitness, ga_violations, ga_progress = genetic_algorithm_timetabling(
+        courses, rooms, time_slots, population_size, generations // 2, mutation_rate, deadline.split(0.5),
+        initial_solutions, ga_stream, reporter
     )
     
     # Refine with SA
-    sa_entries, sa_fitness, sa_violations = simulated_annealing_timetabling(
-        courses, rooms, time_slots, temperature, cooling_rate, generations // 2
+    sa_entries, sa_fitness, sa_violations, sa_progress = simulated_annealing_timetabling(
+        courses, rooms, time_slots, temperature, cooling_rate, generations // 2, deadline, sa_stream, reporter
     )
     
+    # Report overall progress together with each phase
+    progress = deadline.progress(
+        ga_progress['iterations_completed'] + sa_progress['iterations_completed'],
+        ga_progress['iterations_planned'] + sa_progress['iterations_planned'],
+        ga_progress['stopped_by'] == 'optimal' or sa_progress['stopped_by'] == 'optimal'
+    )
+    progress['phases'] = {'genetic': ga_progress, 'simulated_annealing': sa_progress}
+    
     # Return the better solution (higher fitness score is better)
     if ga_fitness >= sa_fitness:
-        return ga_entries, ga_fitness, ga_violations
+        return ga_entries, ga_fitness, ga_violations, progress
     else:
-        return sa_entries, sa_fitness, sa_violations
+        return sa_entries, sa_fitness, sa_violations, progress
+
+def load_elite_seeds(courses, rooms, time_slots, limit, seed=None):
+    """
+    Archived solutions for the current data as course id -> (room id, slot id).
+    
+    Uses the archive of the same problem fingerprint; when courses, rooms or
+    the exam calendar changed, falls back to the recently archived problem
+    sharing most courses (at least half) and remaps its solutions.
+    """
+    if limit <= 0:
+        return []
+    
+    fingerprint = problem_fingerprint(courses, rooms, time_slots)
+    rows = EliteSolution.query.filter_by(fingerprint=fingerprint).order_by(EliteSolution.cost).limit(limit).all()
+    
+    if not rows:
+        course_ids = {course.id for course in courses}
+        best_overlap, best_fingerprint = 0.0, None
+        recent = EliteSolution.query.order_by(EliteSolution.created_at.desc()).limit(100).all()
+        for row in recent:
+            archived_ids = set(json.loads(row.data)['courses'])
+            overlap = len(course_ids & archived_ids) / max(1, len(course_ids | archived_ids))
+            if overlap > best_overlap:
+                best_overlap, best_fingerprint = overlap, row.fingerprint
+        if best_overlap < 0.5:
+            return []
+        rows = EliteSolution.query.filter_by(fingerprint=best_fingerprint).order_by(EliteSolution.cost).limit(limit).all()
+    
+    rng = make_rng(seed)
+    return [decode_solution(json.loads(row.data), courses, rooms, time_slots, rng)[0] for row in rows]
+
+def evaluate_solution(courses, rooms, time_slots, entries, problem=None):
+    """
+    Score a generated timetable with the package's full fitness function,
+    against the lower bound no timetable of this data can beat.
+    """
+    from algorithms.delta_evaluator import TimetableProblem, DeltaEvaluator
+    from algorithms.bounds import lower_bound
+    
+    problem = problem or TimetableProblem(courses, rooms, time_slots)
+    evaluator = DeltaEvaluator(problem, *problem.from_timetable({'assignments': entries}))
+    bound = lower_bound(problem)['fitness']
+    return {
+        'fitness': evaluator.fitness,
+        'violations': evaluator.violations,
+        'lower_bound': bound,
+        'gap': max(0.0, evaluator.fitness - bound)
+    }
+
+def archive_solution(courses, rooms, time_slots, entries, algorithm, objective=None):
+    """Offer a generated timetable to the elite archive of its problem fingerprint"""
+    # Rank every engine's result by the same full fitness function
+    objective = objective or evaluate_solution(courses, rooms, time_slots, entries)
+    encoded = encode_solution(entries, time_slots)
+    
+    fingerprint = problem_fingerprint(courses, rooms, time_slots)
+    rows = EliteSolution.query.filter_by(fingerprint=fingerprint).all()
+    archive = EliteArchive([{'cost': row.cost, 'solution': json.loads(row.data)} for row in rows],
+                           capacity=app.config['ELITE_ARCHIVE_SIZE'])
+    action, index = archive.offer(objective['fitness'], encoded)
+    
+    if action == 'replace':
+        db.session.delete(rows[index])
+    if action is not None:
+        db.session.add(EliteSolution(
+            fingerprint=fingerprint,
+            cost=objective['fitness'],
+            constraint_violations=objective['violations'],
+            algorithm_used=algorithm,
+            data=json.dumps(encoded)
+        ))
+    return action
+
+def run_reoptimization(parameters, callback=None, cancelled=None):
+    """Re-optimize a stored timetable for a queued request and return the response of its job"""
+    deadline = Deadline(time_budget=parameters['time_budget'], cancelled=cancelled)
+    events = []
+    def record(event):
+        events.append(event)
+        if callback:
+            callback(event)
+    reporter = ProgressReporter(record, app.config['PROGRESS_INTERVAL'])
+    timetable, solution = reoptimize(parameters['timetable_id'], parameters['changes'], deadline, callback=reporter)
+    progress = solution['progress']
+    
+    return {
+        'success': True,
+        'algorithm': 'reoptimize',
+        'timetable_id': timetable.id,
+        'best_fitness': f"{timetable.fitness_score:.1f}",
+        'constraint_violations': timetable.constraint_violations,
+        'placed': progress['placed'],
+        'moved': progress['moved'],
+        'kept': progress['kept'],
+        'execution_time': f"{progress['elapsed_seconds']:.2f}s",
+        'progress': progress,
+        'progress_events': events,
+        'message': f"Placed {progress['placed']} exams and moved {progress['moved']} published exams; "
+                   f"{progress['kept']} exams kept their slot. Violations: {timetable.constraint_violations}."
+    }
+
+def reoptimize(timetable_id, changes=None, deadline=None, callback=None):
+    """
+    Re-optimize a stored timetable in place after data edits.
+    
+    changes may list course ids to unpin ('courses') and room or time slot ids
+    taken out of service ('rooms', 'time_slots'). Courses added since the
+    timetable was generated, and exams whose room or slot no longer exists,
+    are placed; all other exams stay where they were unless they clash.
+    """
+    from algorithms.reoptimization import Reoptimizer
+    
+    changes = changes or {}
+    timetable = db.session.get(Timetable, timetable_id)
+    if timetable is None:
+        raise ValueError(f'Timetable {timetable_id} no longer exists.')
+    unavailable_rooms = set(changes.get('rooms', []))
+    unavailable_slots = set(changes.get('time_slots', []))
+    
+    # Plain records of the cached snapshot, like run_optimization; the optimizer never touches the ORM
+    snapshot = problem_snapshot()
+    courses = list(snapshot.courses)
+    rooms = [room for room in snapshot.rooms if room.id not in unavailable_rooms]
+    published = [{'course_id': course_id, 'room_id': room_id, 'time_slot_id': slot_id}
+                 for course_id, room_id, slot_id in db.session.query(
+                     TimetableEntry.course_id, TimetableEntry.room_id, TimetableEntry.time_slot_id)
+                 .filter(TimetableEntry.timetable_id == timetable_id)]
+    # The exam period's slots plus those of the timetable, which may belong to an earlier period
+    time_slots = {slot.id: slot for slot in snapshot.time_slots}
+    earlier = {entry['time_slot_id'] for entry in published} - set(time_slots)
+    if earlier:
+        time_slots.update((row.id, TimeSlotRow(*row)) for row in db.session.query(
+            *(getattr(TimeSlot, name) for name in TimeSlotRow._fields)).filter(TimeSlot.id.in_(earlier)))
+    time_slots = [slot for slot in time_slots.values() if slot.id not in unavailable_slots]
+    
+    optimizer = Reoptimizer(courses, rooms, time_slots, [], seed=timetable.seed, callback=callback)
+    solution, _ = optimizer.optimize(published, changed_courses=changes.get('courses', []), deadline=deadline)
+    
+    # Replace the entries of the same timetable, so links to it stay valid
+    timetable_store.replace_entries(db, TimetableEntry, timetable_id, solution['assignments'])
+    
+    violations = solution['constraint_violations']
+    timetable.constraint_violations = violations
+    timetable.fitness_score = max(1000 - (violations * 100), 100)
+    timetable.updated_at = datetime.utcnow()  # its entries changed even when the scores did not
+    db.session.commit()
+    return timetable, solution
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        # Tables, plus the columns and indexes that create_all does not add to existing ones
+        migrate.upgrade(db)
         
         # Database initialized with empty tables
         print("Database tables created successfully!")
         print("Please register your first user through the web interface.")
+    
+    # Job workers run the queued optimizations; with the reloader, only its serving child starts them
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        jobs.start_workers(job_worker, app.config['OPTIMIZATION_WORKERS'])
     app.run(debug=True, host='0.0.0.0', port=5000)
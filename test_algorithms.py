@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the optimization algorithms on a small synthetic instance
+"""
+
+import random
+import time
+from types import SimpleNamespace
+import numpy as np
+
+from benchmark import build_instance
+from algorithms.genetic_algorithm import GeneticAlgorithm
+from algorithms.simulated_annealing import SimulatedAnnealing
+from algorithms.hybrid_optimizer import HybridOptimizer
+from algorithms.delta_evaluator import TimetableProblem, DeltaEvaluator
+from algorithms.tabu_search import TabuSearch
+from algorithms.late_acceptance import LateAcceptanceHillClimbing
+from algorithms.great_deluge import GreatDeluge
+from algorithms.memetic_algorithm import MemeticAlgorithm
+from algorithms.portfolio import PortfolioSolver, ENGINES, run_engine
+from algorithms.decomposition import DecompositionSolver, partition_courses
+from algorithms.reoptimization import Reoptimizer
+from algorithms.elite_archive import EliteArchive, encode_solution, decode_solution, problem_fingerprint
+from algorithms.bounds import lower_bound
+from algorithms.exact import ExactSolver, exact_repair, solver_available
+from algorithms.tuning import tune, select_profile, instance_features, instance_class
+from algorithms.scenarios import ScenarioSweep, apply_overrides, scenario_budgets
+from algorithms.deadline import Deadline, parse_time_budget
+from algorithms.rng import parse_seed
+
+def test_delta_evaluator_matches_full_fitness():
+    """Incremental fitness must equal the dictionary-based fitness after every move"""
+    random.seed(7)
+    courses, rooms, time_slots = build_instance(30, 4, 3)
+    ga = GeneticAlgorithm(courses, rooms, time_slots, [])
+    problem = TimetableProblem(courses, rooms, time_slots)
+    evaluator = DeltaEvaluator(problem, *problem.random_solution(7))
+
+    for _ in range(200):
+        course = random.randrange(problem.n_courses)
+        room = random.randrange(problem.n_rooms)
+        slot = random.randrange(problem.n_slots)
+
+        delta = evaluator.move_delta(course, room, slot)
+        assert abs(evaluator.batch_deltas(course)[room, slot] - delta) < 1e-9
+
+        before = evaluator.fitness
+        evaluator.apply_move(course, room, slot)
+        timetable = evaluator.to_timetable()
+
+        assert abs(evaluator.fitness - before - delta) < 1e-6
+        assert ga._calculate_fitness(timetable) == evaluator.fitness
+        assert timetable['constraint_violations'] == evaluator.violations
+
+    print("✅ Delta evaluator matches full fitness evaluation")
+
+def test_tabu_search():
+    """Tabu search should return a complete timetable no worse than its start"""
+    courses, rooms, time_slots = build_instance(30, 4, 3)
+    optimizer = TabuSearch(courses, rooms, time_slots, [], seed=7)
+    solution, history = optimizer.optimize(max_iterations=100)
+
+    assert len(solution['assignments']) == len(courses)
+    assert solution['fitness'] <= history[0]
+    assert solution['fitness'] == GeneticAlgorithm(courses, rooms, time_slots, [])._calculate_fitness(solution)
+    print(f"✅ Tabu search completed - fitness {solution['fitness']}")
+
+def test_fast_single_solution_engines():
+    """Late acceptance and great deluge should stay within their time limit"""
+    courses, rooms, time_slots = build_instance(30, 4, 3)
+    for optimizer_class in (LateAcceptanceHillClimbing, GreatDeluge):
+        optimizer = optimizer_class(courses, rooms, time_slots, [], seed=7)
+        start = time.time()
+        solution, history = optimizer.optimize(max_iterations=1000000, time_budget=0.5)
+
+        assert time.time() - start < 1.5
+
+        assert len(solution['assignments']) == len(courses)
+        assert solution['fitness'] <= history[0]
+        assert solution['fitness'] == GeneticAlgorithm(courses, rooms, time_slots, [])._calculate_fitness(solution)
+        print(f"✅ {optimizer_class.__name__} completed - fitness {solution['fitness']}")
+
+def test_memetic_algorithm():
+    """Memetic algorithm should give the same kind of result in-process and on a process pool"""
+    courses, rooms, time_slots = build_instance(30, 4, 3)
+    for workers in (1, 2):
+        optimizer = MemeticAlgorithm(courses, rooms, time_slots, [], seed=7)
+        solution, history = optimizer.optimize(population_size=6, generations=3, workers=workers)
+
+        assert len(solution['assignments']) == len(courses)
+        assert solution['fitness'] == GeneticAlgorithm(courses, rooms, time_slots, [])._calculate_fitness(solution)
+        print(f"✅ Memetic algorithm with {workers} worker(s) - fitness {solution['fitness']}")
+
+def test_portfolio_solver():
+    """Portfolio should stop all engines once one reaches the quality target and name the winner"""
+    courses, rooms, time_slots = build_instance(15, 4, 5)
+    optimizer = PortfolioSolver(courses, rooms, time_slots, [])
+    solution, _ = optimizer.optimize(population_size=20, generations=100000, time_budget=10)
+
+    # The quality target ended the race ('optimal' when the winner reached the lower bound on the way),
+    # cutting the other engines short long before their move budget
+    assert solution['progress']['stopped_by'] in ('target', 'optimal'), solution['progress']
+    assert 'completed' not in {engine['stopped_by'] for engine in solution['progress']['engines'].values()}
+    assert solution['constraint_violations'] == 0
+    assert solution['winner'] in solution['progress']['engines']
+    assert solution['progress']['engines'][solution['winner']]['fitness'] == solution['fitness']
+    assert solution['fitness'] == GeneticAlgorithm(courses, rooms, time_slots, [])._calculate_fitness(solution)
+    print(f"✅ Portfolio won by {solution['winner']} - fitness {solution['fitness']}")
+
+def test_parameter_tuning():
+    """Tuned profiles should be keyed by instance class and selected for similar instances"""
+    small = build_instance(15, 4, 5, seed=1)
+    profiles = tune(['genetic'], [small], configurations=4, min_budget=0.05)
+    key = instance_class(instance_features(*small))
+
+    assert list(profiles['genetic']) == [key]
+    assert select_profile('genetic', *small, profiles=profiles) == (key, profiles['genetic'][key]['parameters'])
+
+    # An untuned class falls back to the closest tuned profile, untuned engines get nothing
+    larger = build_instance(60, 4, 5, seed=1)
+    assert instance_class(instance_features(*larger)) != key
+    assert select_profile('genetic', *larger, profiles=profiles)[0] == key
+    assert select_profile('tabu', *small, profiles=profiles) == (None, None)
+    print(f"✅ Parameter tuning - {key}: {profiles['genetic'][key]['parameters']}")
+
+def test_decomposition_solver():
+    """Blocks should follow the programs and the merged, repaired timetable should be exact"""
+    courses, rooms, time_slots = build_instance(60, 6, 20)
+    blocks = partition_courses(courses)
+    assert sorted(name for name, _ in blocks) == sorted(set(course.program for course in courses))
+
+    # Conflict graph components: courses 0-9 and 10-19 are linked through students, 20-59 share none
+    enrollments = {course.id: {course.id} for course in courses}
+    for i in range(10):
+        enrollments[courses[i].id] |= {'a', 'b' if i % 2 else 'c'}
+        enrollments[courses[10 + i].id] |= {'d', 'e'}
+    components = partition_courses(courses, enrollments=enrollments, min_block_size=1, max_blocks=100)
+    assert sorted(members for _, members in components)[:2] == [list(range(10)), list(range(10, 20))]
+    assert len(components) == 42
+    pairs = partition_courses(courses, enrollments=enrollments, min_shared_students=2, min_block_size=1,
+                              max_blocks=100)
+    assert sorted(members for _, members in pairs)[:3] == [[0, 2, 4, 6, 8], [1, 3, 5, 7, 9], list(range(10, 20))]
+
+    # Full-institution scale: a student -> courses index instead of all course pairs
+    large = [SimpleNamespace(id=i) for i in range(3000)]
+    rng = np.random.default_rng(7)
+    large_enrollments = {i: set(rng.choice(20000, 40, replace=False).tolist()) for i in range(3000)}
+    assert sum(len(members) for _, members in partition_courses(large, enrollments=large_enrollments)) == 3000
+
+    for workers in (1, 2):
+        optimizer = DecompositionSolver(courses, rooms, time_slots, [], seed=7)
+        solution, _ = optimizer.optimize(workers=workers, time_budget=5)
+
+        assert len(solution['assignments']) == len(courses)
+        assert len(solution['progress']['blocks']) == len(blocks)
+        assert solution['fitness'] == GeneticAlgorithm(courses, rooms, time_slots, [])._calculate_fitness(solution)
+        print(f"✅ Decomposition with {workers} worker(s) - fitness {solution['fitness']}")
+
+def test_reoptimization_keeps_published_exams():
+    """New courses and a closed room should be absorbed without moving the other exams"""
+    courses, rooms, time_slots = build_instance(60, 6, 20)
+    published, _ = TabuSearch(courses, rooms, time_slots, [], seed=7).optimize(max_iterations=500)
+
+    extended = courses + build_instance(64, 6, 20, seed=1)[0][60:]
+    open_rooms = rooms[1:]
+    solution, _ = Reoptimizer(extended, open_rooms, time_slots, [], seed=7).optimize(published['assignments'])
+
+    displaced = [a for a in published['assignments'] if a['room_id'] == rooms[0].id]
+    assert solution['progress']['placed'] == len(displaced) + 4
+    assert solution['progress']['moved'] == 0
+    assert solution['constraint_violations'] == published['constraint_violations']
+    assert solution['fitness'] == GeneticAlgorithm(extended, open_rooms, time_slots, [])._calculate_fitness(solution)
+
+    kept = {a['course_id']: a for a in solution['assignments']}
+    for assignment in published['assignments']:
+        if assignment['room_id'] != rooms[0].id:
+            assert kept[assignment['course_id']] == assignment
+    print(f"✅ Re-optimization - {solution['progress']}")
+
+def test_elite_archive():
+    """Archive should keep distinct good solutions and remap them onto changed data"""
+    courses, rooms, time_slots = build_instance(30, 4, 5)
+    ga = GeneticAlgorithm(courses, rooms, time_slots, [], seed=7)
+    solutions = [ga._generate_random_timetable() for _ in range(4)]
+    encoded = [encode_solution(solution['assignments'], time_slots) for solution in solutions]
+
+    archive = EliteArchive(capacity=2)
+    assert archive.offer(10.0, encoded[0]) == ('add', None)
+    assert archive.offer(5.0, encoded[1]) == ('add', None)
+    assert archive.offer(20.0, encoded[2]) == (None, None)
+    assert archive.offer(1.0, encoded[2]) == ('replace', 0)
+    assert archive.offer(2.0, encoded[2]) == (None, None)  # near-duplicate of a better entry
+    assert [entry['cost'] for entry in archive.best(2)] == [1.0, 5.0]
+
+    # Same data: solution restored exactly; new slot ids and a new course: remapped
+    mapping, intact = decode_solution(encoded[0], courses, rooms, time_slots)
+    assert intact == 1.0
+    assert all(mapping[a['course_id']] == (a['room_id'], a['time_slot_id']) for a in solutions[0]['assignments'])
+
+    extended, _, moved_slots = build_instance(31, 4, 5)
+    for slot in moved_slots:
+        slot.id += 100
+        slot.day = slot.day.replace('2025-01', '2025-02')
+    mapping, intact = decode_solution(encoded[0], extended, rooms, moved_slots)
+    assert len(mapping) == 31 and abs(intact - 30 / 31) < 1e-9
+    assert mapping[1][1] == next(a['time_slot_id'] for a in solutions[0]['assignments'] if a['course_id'] == 1) + 100
+    assert problem_fingerprint(courses, rooms, time_slots) != problem_fingerprint(extended, rooms, moved_slots)
+    print("✅ Elite archive keeps distinct solutions and remaps them")
+
+def test_lower_bound():
+    """Lower bound should never exceed a solution's fitness and end the search once reached"""
+    courses, rooms, time_slots = build_instance(30, 4, 5)
+    problem = TimetableProblem(courses, rooms, time_slots)
+    bound = lower_bound(problem)
+    assert bound['violations'] == len(courses) - problem.n_time_keys
+    for seed in range(20):
+        assert DeltaEvaluator(problem, *problem.random_solution(seed)).fitness >= bound['fitness']
+    assert lower_bound(TimetableProblem(*build_instance(10, 2, 5)))['fitness'] == 0
+
+    for optimizer_class in (TabuSearch, SimulatedAnnealing, LateAcceptanceHillClimbing):
+        optimizer = optimizer_class(courses, rooms, time_slots, [], seed=7)
+        solution, _ = optimizer.optimize(max_iterations=1000000, time_budget=5)
+
+        assert solution['fitness'] == bound['fitness']
+        assert solution['progress']['stopped_by'] == 'optimal'
+        assert solution['progress']['gap'] == 0
+        assert solution['progress']['elapsed_seconds'] < 5
+    print(f"✅ Search stops at the lower bound - {bound}")
+
+def test_exact_solver():
+    """Exact mode should prove optimality on a small instance and repair conflicts in place"""
+    if not solver_available():
+        print("⚠️ PuLP/CBC not installed, skipping exact solver test")
+        return
+
+    courses, rooms, time_slots = build_instance(30, 4, 3)
+    solution, history = ExactSolver(courses, rooms, time_slots, [], seed=7).optimize(time_budget=30,
+                                                                                       respect_capacity=False)
+    assert len(solution['assignments']) == len(courses)
+    assert solution['fitness'] <= history[0]
+    assert solution['fitness'] == lower_bound(TimetableProblem(courses, rooms, time_slots))['fitness']
+    assert solution['progress']['stopped_by'] == 'optimal'
+
+    problem = TimetableProblem(*build_instance(80, 8, 5))
+    room_of, slot_of = problem.random_solution(7)
+    start = DeltaEvaluator(problem, room_of, slot_of).fitness
+    _, _, fitness, _ = exact_repair(problem, room_of, slot_of, max_variables=500, deadline=None, seed=7)
+    assert fitness < start
+    print(f"✅ Exact solver completed - {solution['progress']}")
+
+def test_seeded_runs_are_reproducible():
+    """The same seed should replay a run exactly, whatever the number of worker processes"""
+    courses, rooms, time_slots = build_instance(40, 4, 3)
+    parameters = {'population_size': 10, 'generations': 10, 'mutation_rate': 0.1}
+
+    def placements(solution):
+        return [(a['course_id'], a['room_id'], a['time_slot_id']) for a in solution['assignments']]
+
+    for engine in ENGINES:
+        if engine == 'exact' and not solver_available():
+            continue
+        first, _ = run_engine(engine, courses, rooms, time_slots, parameters, seed=11)
+        second, _ = run_engine(engine, courses, rooms, time_slots, parameters, seed=11)
+        assert placements(first) == placements(second), engine
+
+    runs = [MemeticAlgorithm(courses, rooms, time_slots, [], seed=11).optimize(
+        population_size=6, generations=3, workers=workers)[0] for workers in (1, 2)]
+    assert placements(runs[0]) == placements(runs[1])
+
+    # Request seeds must be valid NumPy seeds that fit the BigInteger column
+    assert parse_seed('42') == 42 and parse_seed(2 ** 63 - 1) == 2 ** 63 - 1
+    assert 0 <= parse_seed(None) < 2 ** 63 and 0 <= parse_seed('') < 2 ** 63
+    for invalid in ('-1', 2 ** 63, 'abc', '1.5'):
+        try:
+            parse_seed(invalid)
+            assert False, f'seed {invalid!r} must be rejected'
+        except ValueError:
+            pass
+    print("✅ Seeded runs are reproducible")
+
+def test_time_budget_is_respected():
+    """Every optimizer should stop at its time budget and report how far it got"""
+    courses, rooms, time_slots = build_instance(80, 8, 5)
+    runs = [
+        (GeneticAlgorithm, {'population_size': 30, 'generations': 10000}),
+        (SimulatedAnnealing, {'max_iterations': 10000000, 'min_temperature': 0}),
+        (HybridOptimizer, {'population_size': 30, 'generations': 10000}),
+        (TabuSearch, {'max_iterations': 100000}),
+        (LateAcceptanceHillClimbing, {'max_iterations': 10000000}),
+        (GreatDeluge, {'max_iterations': 10000000}),
+        (MemeticAlgorithm, {'population_size': 10, 'generations': 10000, 'workers': 1}),
+    ]
+    for optimizer_class, parameters in runs:
+        optimizer = optimizer_class(courses, rooms, time_slots, [], seed=7)
+        optimizer.lower_bound = float('-inf')  # the bound is easy to reach here, keep searching
+        start = time.time()
+        solution, _ = optimizer.optimize(time_budget=0.5, **parameters)
+
+        assert time.time() - start < 3.0
+        assert solution['progress']['stopped_by'] == 'deadline'
+        assert solution['progress']['iterations_completed'] < solution['progress']['iterations_planned']
+        print(f"✅ {optimizer_class.__name__} stopped at deadline - {solution['progress']}")
+
+    # Request budgets: capped, defaulted, and never unbounded
+    assert parse_time_budget('30', 600) == 30.0 and parse_time_budget('9000', 600) == 600.0
+    assert parse_time_budget(None, 600) == parse_time_budget('', 600) == 600.0
+    for invalid in ('nan', 'inf', '-inf', '-5', '0', 'abc'):
+        try:
+            parse_time_budget(invalid, 600)
+            assert False, f'time budget {invalid!r} must be rejected'
+        except ValueError:
+            pass
+
+def test_scenario_sweep():
+    """Scenarios should apply their overrides, run in parallel and compare against the first one"""
+    courses, rooms, time_slots = build_instance(30, 3, 5)
+    parameters = {'population_size': 10, 'generations': 20, 'mutation_rate': 0.1}
+    saturday = {'add': [{'day': '2025-01-11', 'start_time': '08:00', 'end_time': '10:00'}]}
+    scenarios = [
+        {'name': 'Baseline', 'algorithm': 'tabu', 'parameters': parameters},
+        {'name': 'No hall', 'algorithm': 'tabu', 'parameters': parameters, 'rooms': {'remove': [1]}},
+        {'name': 'Saturday', 'algorithm': 'tabu', 'parameters': parameters, 'time_slots': saturday},
+        {'name': 'No rooms', 'algorithm': 'tabu', 'parameters': parameters, 'rooms': {'remove': [1, 2, 3]}},
+    ]
+
+    overrides = {'rooms': {'update': {'2': {'capacity': 500}}}, 'time_slots': saturday}
+    _, changed_rooms, changed_slots = apply_overrides(courses, rooms, time_slots, overrides)
+    assert changed_rooms[1].capacity == 500 and rooms[1].capacity != 500 and changed_rooms[0] is rooms[0]
+    assert changed_slots[-1].id < 0 and str(changed_slots[-1].start_time) == '08:00:00'
+
+    runs = [ScenarioSweep(courses, rooms, time_slots, [], seed=3).optimize(scenarios, workers=workers, time_budget=20)
+            for workers in (1, 2)]
+    for rows, progress in runs:
+        assert [row['name'] for row in rows] == [scenario['name'] for scenario in scenarios]
+        assert rows[1]['rooms'] == 2 and rows[2]['time_slots'] == len(time_slots) + 1
+        assert rows[2]['fitness_change'] < 0 and rows[0]['fitness_change'] == 0
+        assert 'error' in rows[3] and progress['iterations_completed'] == 3
+    assert [row.get('fitness') for row in runs[0][0]] == [row.get('fitness') for row in runs[1][0]]
+
+    # More scenarios than workers: each wave gets its share, and every scenario its whole budget
+    assert scenario_budgets([{}, {'time_budget': 0.5}, {'time_budget': 9}], workers=2, time_budget=4) == [2, 0.5, 2]
+    courses, rooms, time_slots = build_instance(80, 4, 6)  # no engine run here reaches the lower bound
+    endless = {'population_size': 20, 'generations': 10 ** 6, 'mutation_rate': 0.1}
+    waves = [{'name': f'Wave scenario {i}', 'algorithm': 'genetic', 'parameters': endless, 'time_budget': 1.5}
+             for i in range(5)]
+    rows, progress = ScenarioSweep(courses, rooms, time_slots, [], seed=3).optimize(waves, workers=2, time_budget=1.5)
+    assert all(row['valid'] and row['stopped_by'] == 'deadline' for row in rows)
+    assert all(row['time_budget'] == 0.5 and row['elapsed_seconds'] >= 0.45 for row in rows), rows
+    assert 'fitness_change' in rows[-1]
+
+    # A run the sweep stops before its budget is marked invalid and not compared
+    short = [{**scenario, 'time_budget': 0.3} for scenario in waves[:2]]
+    rows, progress = ScenarioSweep(courses, rooms, time_slots, [], seed=3).optimize(
+        short, workers=1, deadline=Deadline(time_budget=0.5))
+    assert rows[0]['valid'] and not rows[1]['valid'] and 'invalid_reason' in rows[1]
+    assert 'fitness_change' not in rows[1] and progress['stopped_by'] == 'deadline'
+    print(f"✅ Scenario sweep - {[(row['name'], row.get('constraint_violations')) for row in runs[1][0]]}")
+
+if __name__ == '__main__':
+    print("Testing optimization algorithms...")
+    print("=" * 50)
+    test_delta_evaluator_matches_full_fitness()
+    test_tabu_search()
+    test_fast_single_solution_engines()
+    test_memetic_algorithm()
+    test_portfolio_solver()
+    test_parameter_tuning()
+    test_decomposition_solver()
+    test_reoptimization_keeps_published_exams()
+    test_elite_archive()
+    test_lower_bound()
+    test_exact_solver()
+    test_seeded_runs_are_reproducible()
+    test_time_budget_is_respected()
+    test_scenario_sweep()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Test script for the exam-period calendar
+"""
+
+import pytest
+import exam_calendar
+from simple_app import db, TimeSlot
+
+def test_exam_calendar(app):
+    """Slots are created once per window, only for missing days, and keep their ids"""
+    sessions = len(exam_calendar.SESSIONS)
+
+    with app.app_context():
+        window = exam_calendar.exam_window('2025-01-06', 5)
+        assert window[0] == '2025-01-06' and window[-1] == '2025-01-10'
+
+        slots = exam_calendar.window_slots(db, TimeSlot, window)
+        assert len(slots) == 5 * sessions
+        assert [(slot.day, slot.start_time) for slot in slots] == sorted((slot.day, slot.start_time) for slot in slots)
+        ids = {(slot.day, slot.start_time): slot.id for slot in slots}
+
+        # A current window is only read
+        assert exam_calendar.ensure_slots(db, TimeSlot, window) == 0
+        assert [slot.id for slot in exam_calendar.window_slots(db, TimeSlot, window)] == [slot.id for slot in slots]
+
+        # Moving the window adds the new day only; earlier slots and their ids stay
+        moved = exam_calendar.exam_window('2025-01-07', 5)
+        assert exam_calendar.ensure_slots(db, TimeSlot, moved) == sessions
+        assert TimeSlot.query.count() == 6 * sessions
+        for slot in exam_calendar.window_slots(db, TimeSlot, moved):
+            assert ids.get((slot.day, slot.start_time), slot.id) == slot.id
+    print("✅ Exam calendar slots are created once and keep their ids")
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main(['-q', '-s', __file__]))
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Test script for the database-backed optimization job queue
+"""
+
+import json
+import time
+from datetime import datetime, timedelta, time as clock_time
+import pytest
+import jobs
+from simple_app import (db, job_worker, Course, Room, TimeSlot, Timetable, TimetableEntry, EliteSolution,
+                        OptimizationJob as Job, OptimizationJobEvent as Event)
+from algorithms.progress import ProgressReporter
+from algorithms.deadline import Deadline
+
+def test_job_queue(app):
+    """Jobs are claimed once, in order, and keep their result or error"""
+
+    def handler(parameters, job, cancelled):
+        if parameters['size'] < 0:
+            raise ValueError('negative size')
+        return {'doubled': parameters['size'] * 2}
+
+    with app.app_context():
+        ids = [jobs.enqueue(db, Job, {'size': size}, created_by=1).id for size in (1, -1, 3)]
+        assert [job.status for job in Job.query.all()] == [jobs.QUEUED] * 3
+
+        first = jobs.claim_next(db, Job, 'test:1')
+        assert first.id == ids[0] and first.status == jobs.RUNNING
+        first.status = jobs.QUEUED  # hand it back to the worker below
+        db.session.commit()
+
+    assert jobs.run_worker(app, db, Job, handler, stop_when_idle=True) == 3
+
+    with app.app_context():
+        statuses = [jobs.job_status(db.session.get(Job, job_id)) for job_id in ids]
+        assert [status['status'] for status in statuses] == [jobs.SUCCEEDED, jobs.FAILED, jobs.SUCCEEDED]
+        assert statuses[0]['result'] == {'doubled': 2} and statuses[2]['result'] == {'doubled': 6}
+        assert statuses[1]['error'] == 'negative size'
+        assert jobs.claim_next(db, Job, 'test:1') is None
+
+        # A job whose worker died is failed once it exceeds the maximum runtime
+        lost = jobs.enqueue(db, Job, {'size': 2}, created_by=1)
+        jobs.claim_next(db, Job, 'test:2')
+        lost.started_at = datetime.utcnow() - timedelta(seconds=120)
+        db.session.commit()
+        assert jobs.fail_stale_jobs(db, Job, max_runtime=60) == 1
+        assert db.session.get(Job, lost.id).status == jobs.FAILED
+    print("✅ Job queue claims, runs and records jobs")
+
+def test_progress_stream(app):
+    """Rate-limited progress events are streamed in order, resumed after the last event id, and dropped at completion"""
+    streamed = {}
+
+    def handler(parameters, job, cancelled):
+        events = []
+        def record(event):
+            events.append(event)
+            jobs.publish_event(db, Event, job.id, event)
+        reporter = ProgressReporter(record, min_interval=60)
+        for iteration, fitness in enumerate([30, 20, 25, 10], 1):
+            reporter.update(iteration, fitness, moves=5, force=iteration % 2 == 1)
+        reporter.update(4, 10, moves=0, force=True)
+        # Streams while the job still runs
+        streamed['all'] = list(jobs.stream_events(db, Job, Event, job.id, max_seconds=0, poll_interval=0))
+        streamed['resumed'] = list(jobs.stream_events(db, Job, Event, job.id, last_event_id=2,
+                                                      max_seconds=0, poll_interval=0))
+        return {'best': reporter.best_fitness, 'progress_events': events}
+
+    with app.app_context():
+        job_id = jobs.enqueue(db, Job, {}, created_by=1).id
+    jobs.run_worker(app, db, Job, handler, stop_when_idle=True, event_model=Event)
+
+    progress = [json.loads(chunk.split('data: ')[1]) for chunk in streamed['all'] if 'event: progress' in chunk]
+    # Only the forced updates pass the rate limit; the best never goes back up
+    assert [event['iteration'] for event in progress] == [1, 3, 4]
+    assert [event['best_fitness'] for event in progress] == [30, 20, 10]
+    assert progress[-1]['moves'] == 20
+    assert sum('event: progress' in chunk for chunk in streamed['resumed']) == 1
+
+    with app.app_context():
+        # One copy of the curve remains, in the result
+        assert Event.query.filter_by(job_id=job_id).count() == 0
+        chunks = list(jobs.stream_events(db, Job, Event, job_id, poll_interval=0))
+        assert not any('event: progress' in chunk for chunk in chunks)
+        done = json.loads(chunks[-1].split('data: ')[1])
+        assert 'event: done' in chunks[-1] and done['result']['best'] == 10
+        assert done['result']['progress_events'] == progress
+    print("✅ Progress events are rate limited, streamed and dropped once the job completes")
+
+def test_priorities_limits_and_cancellation(app):
+    """Interactive jobs go first within the caps, and cancelled runs stop at their next deadline check"""
+
+    with app.app_context():
+        batch = jobs.enqueue(db, Job, {}, created_by=1, priority='batch')
+        first = jobs.enqueue(db, Job, {}, created_by=1)
+        second = jobs.enqueue(db, Job, {}, created_by=1)
+        other = jobs.enqueue(db, Job, {}, created_by=2)
+        assert [jobs.queue_position(db, Job, job) for job in (first, second, other, batch)] == [0, 1, 2, 3]
+
+        # One running job per user, two overall
+        claimed = [jobs.claim_next(db, Job, 'test', max_running=2, max_running_per_user=1) for _ in range(3)]
+        assert [job and job.id for job in claimed] == [first.id, other.id, None]
+        jobs.complete(db, claimed[1], result={})
+        assert jobs.claim_next(db, Job, 'test', max_running=2, max_running_per_user=1) is None
+        jobs.complete(db, claimed[0], result={})
+        assert jobs.claim_next(db, Job, 'test', max_running=2, max_running_per_user=1).id == second.id
+
+        # A queued job is cancelled at once, a finished one no longer
+        assert jobs.request_cancel(db, Job, batch.id)
+        assert db.session.get(Job, batch.id).status == jobs.CANCELLED
+        assert not jobs.request_cancel(db, Job, first.id)
+        jobs.complete(db, db.session.get(Job, second.id), result={})
+        running = jobs.enqueue(db, Job, {}, created_by=1).id
+
+    def handler(parameters, job, cancelled):
+        clock = Deadline(time_budget=30, cancelled=cancelled)
+        jobs.request_cancel(db, Job, job.id)
+        iterations = 0
+        while not clock.expired():
+            time.sleep(0.01)
+            iterations += 1
+        return {'stopped_by': clock.progress(iterations, 10 ** 6)['stopped_by']}
+
+    jobs.run_worker(app, db, Job, handler, stop_when_idle=True, cancel_poll_interval=0.05)
+    with app.app_context():
+        status = jobs.job_status(db.session.get(Job, running))
+        assert status['status'] == jobs.CANCELLED and status['cancel_requested']
+        assert status['result'] == {'stopped_by': 'cancelled'}
+    print("✅ Priorities, concurrency limits and cancellation work")
+
+def test_identical_requests_share_one_run(app):
+    """Identical requests in flight merge into one run, and later ones reuse its stored result"""
+    runs = []
+
+    def handler(parameters, job, cancelled):
+        runs.append(job.id)
+        return {'size': parameters['size'], 'complete': parameters['size'] > 0}
+
+    def reusable(result):
+        return result['complete']
+
+    with app.app_context():
+        key = jobs.request_key({'data': [1, 2, 3], 'size': 4})
+        assert key == jobs.request_key({'size': 4, 'data': [1, 2, 3]})
+        leader = jobs.enqueue(db, Job, {'size': 4}, created_by=1, priority='batch', key=key, reusable=reusable)
+        follower = jobs.enqueue(db, Job, {'size': 4}, created_by=2, key=key, reusable=reusable)
+        assert follower.follows == leader.id and leader.priority == jobs.PRIORITIES['interactive']
+        assert jobs.queue_position(db, Job, follower) == 0
+        leader_id, follower_id = leader.id, follower.id
+
+    assert jobs.run_worker(app, db, Job, handler, stop_when_idle=True) == 1
+    with app.app_context():
+        assert runs == [leader_id]
+        assert jobs.job_status(db.session.get(Job, follower_id))['result'] == {'size': 4, 'complete': True}
+
+        # A stored result answers at once; a result the predicate rejects is run again
+        cached = jobs.enqueue(db, Job, {'size': 4}, created_by=3, key=key, reusable=reusable)
+        assert cached.status == jobs.SUCCEEDED and json.loads(cached.result)['size'] == 4
+        other = jobs.request_key({'size': -1})
+        first = jobs.enqueue(db, Job, {'size': -1}, created_by=1, key=other, reusable=reusable)
+        second = jobs.enqueue(db, Job, {'size': -1}, created_by=2, key=other, reusable=reusable)
+        assert second.follows == first.id
+
+        # Followers of a cancelled run are queued to run on their own
+        jobs.claim_next(db, Job, 'test')
+        jobs.request_cancel(db, Job, first.id)
+        jobs.complete(db, db.session.get(Job, first.id), result={'size': -1, 'complete': False}, cancelled=True)
+        second = db.session.get(Job, second.id)
+        assert second.status == jobs.QUEUED and second.follows is None
+        assert jobs.enqueue(db, Job, {'size': -1}, created_by=3, key=other, reusable=reusable).status == jobs.QUEUED
+    print("✅ Identical requests share one run")
+
+def add_courses_and_rooms(app, courses=12, rooms=3):
+    with app.app_context():
+        db.session.add_all([Course(name=f'Course {i}', code=f'C{i}', students=30) for i in range(courses)])
+        db.session.add_all([Room(name=f'Room {i}', capacity=50) for i in range(rooms)])
+        db.session.commit()
+
+def test_optimize_routes(app, client):
+    """/optimize queues a run that /jobs/<id> reports and /jobs/<id>/cancel stops"""
+    form = {'algorithm': 'tabu', 'generations': '20', 'population_size': '10', 'time_budget': '10', 'seed': '7'}
+    assert client.post('/optimize', data=form).status_code == 400  # no courses yet
+    add_courses_and_rooms(app)
+    for bad in ({'time_budget': 'nan'}, {'time_budget': '-1'}, {'seed': '-1'}, {'seed': str(2 ** 63)}):
+        response = client.post('/optimize', data={**form, **bad})
+        assert response.status_code == 400 and not response.get_json()['success'], bad
+
+    response = client.post('/optimize', data=form)
+    assert response.status_code == 202
+    queued = response.get_json()
+    assert queued['status'] == jobs.QUEUED and queued['queue_position'] == 0 and queued['seed'] == 7
+    status = client.get(queued['status_url']).get_json()
+    assert status['status'] == jobs.QUEUED and status['queue_position'] == 0
+
+    assert job_worker(stop_when_idle=True) == 1
+    status = client.get(queued['status_url']).get_json()
+    assert status['status'] == jobs.SUCCEEDED and status['result']['timetable_id']
+    assert status['result']['seed'] == 7 and status['result']['progress_events']
+    with app.app_context():
+        assert Event.query.count() == 0
+
+    # A queued run is cancelled at once; a finished one can no longer be
+    other = client.post('/optimize', data={**form, 'seed': '8'}).get_json()
+    cancelled = client.post(f"/jobs/{other['job_id']}/cancel")
+    assert cancelled.status_code == 200 and cancelled.get_json()['status'] == jobs.CANCELLED
+    assert client.post(f"/jobs/{other['job_id']}/cancel").status_code == 409
+    assert client.post(f"/jobs/{queued['job_id']}/cancel").status_code == 409
+    assert client.get('/jobs/unknown').status_code == 404
+    assert job_worker(stop_when_idle=True) == 0
+    print("✅ Optimization routes queue, report and cancel runs")
+
+def test_seed_replay(app, client):
+    """An entered seed replays a genetic run exactly; only runs without one start from the elite archive"""
+    add_courses_and_rooms(app, courses=60)
+    form = {'algorithm': 'genetic', 'generations': '2', 'population_size': '10', 'time_budget': '60'}
+
+    def run(**fields):
+        queued = client.post('/optimize', data={**form, **fields}).get_json()
+        assert job_worker(stop_when_idle=True) == 1
+        result = client.get(queued['status_url']).get_json()['result']
+        with app.app_context():
+            entries = TimetableEntry.query.filter_by(timetable_id=result['timetable_id'])
+            schedule = sorted((e.course_id, e.room_id, e.time_slot_id) for e in entries)
+            # Without its timetable the stored result cannot answer a repeated request
+            entries.delete()
+            db.session.delete(db.session.get(Timetable, result['timetable_id']))
+            db.session.commit()
+        return result, schedule
+
+    first, schedule = run(seed='11')
+    assert first['seeded_from_archive'] == 0
+    assert run()[0]['seeded_from_archive'] > 0  # a run without a seed builds on the archive
+    with app.app_context():
+        assert EliteSolution.query.count() >= 1
+    replay, replayed = run(seed='11')
+    assert replay['seeded_from_archive'] == 0 and replayed == schedule
+    print("✅ An entered seed replays its run whatever the archive holds")
+
+def test_reoptimize_route(app, client, monkeypatch):
+    """A queued repair places new courses from snapshot records, keeping exams of an earlier period"""
+    import algorithms.reoptimization
+    add_courses_and_rooms(app)
+    queued = client.post('/optimize', data={'algorithm': 'tabu', 'generations': '20', 'time_budget': '10',
+                                            'seed': '7'}).get_json()
+    assert job_worker(stop_when_idle=True) == 1
+    timetable_id = client.get(queued['status_url']).get_json()['result']['timetable_id']
+    with app.app_context():
+        # One exam was held in an earlier exam period, whose slot is no longer in the snapshot
+        earlier = TimeSlot(day='2000-01-03', start_time=clock_time(8), end_time=clock_time(10))
+        db.session.add(earlier)
+        db.session.add(Course(name='New course', code='NEW', students=30))
+        db.session.flush()
+        entry = TimetableEntry.query.filter_by(timetable_id=timetable_id).first()
+        entry.time_slot_id, earlier_id, kept_course = earlier.id, earlier.id, entry.course_id
+        db.session.commit()
+
+    records = []
+    class Recording(algorithms.reoptimization.Reoptimizer):
+        def __init__(self, courses, rooms, time_slots, *args, **kwargs):
+            records.extend([*courses, *rooms, *time_slots])
+            super().__init__(courses, rooms, time_slots, *args, **kwargs)
+    monkeypatch.setattr(algorithms.reoptimization, 'Reoptimizer', Recording)
+
+    response = client.post(f'/timetable/{timetable_id}/reoptimize', json={'time_budget': 10})
+    assert response.status_code == 202
+    assert job_worker(stop_when_idle=True) == 1
+    result = client.get(response.get_json()['status_url']).get_json()['result']
+    assert result['timetable_id'] == timetable_id and result['placed'] >= 1
+    assert records and not any(isinstance(record, db.Model) for record in records)
+    with app.app_context():
+        entries = {e.course_id: e.time_slot_id for e in TimetableEntry.query.filter_by(timetable_id=timetable_id)}
+        assert len(entries) == 13 and entries[kept_course] == earlier_id
+    print("✅ Re-optimization repairs a timetable from snapshot records")
+
+def test_scenario_route(app, client):
+    """/scenarios validates the sweep and queues it as one job returning a comparison table"""
+    add_courses_and_rooms(app)
+    assert client.post('/scenarios', json={'scenarios': []}).status_code == 400
+    for algorithm in ('unknown', 'memetic', 'portfolio'):  # memetic and portfolio start pools of their own
+        assert client.post('/scenarios', json={'scenarios': [{'algorithm': algorithm}]}).status_code == 400
+    assert client.post('/scenarios', json={'scenarios': [{}], 'time_budget': 'inf'}).status_code == 400
+
+    with app.app_context():
+        room_id = Room.query.first().id
+    response = client.post('/scenarios', json={
+        'algorithm': 'tabu', 'generations': 20, 'time_budget': 10, 'seed': 3,
+        'scenarios': [{'name': 'One room less', 'rooms': {'remove': [room_id]}}],
+    })
+    assert response.status_code == 202
+    queued = response.get_json()
+    assert queued['scenarios'] == ['Baseline', 'One room less'] and queued['status'] == jobs.QUEUED
+
+    assert job_worker(stop_when_idle=True) == 1
+    status = client.get(queued['status_url']).get_json()
+    assert status['status'] == jobs.SUCCEEDED, status
+    rows = status['result']['scenarios']
+    assert [row['name'] for row in rows] == ['Baseline', 'One room less']
+    assert [row['rooms'] for row in rows] == [3, 2]
+    assert all(row['valid'] and row['time_budget'] == 10 for row in rows)  # two workers: one wave
+    print("✅ Scenario sweeps are validated, queued and compared")
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main(['-q', '-s', __file__]))
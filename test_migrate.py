@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the versioned schema migrations
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+import migrate
+import timetable_codec
+
+def build_database():
+    """SQLite file with the schema of a database from before the migrations, with some history"""
+    path = os.path.join(tempfile.mkdtemp(), 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(80));
+        CREATE TABLE course (id INTEGER PRIMARY KEY, code VARCHAR(20), department VARCHAR(100));
+        CREATE TABLE time_slot (id INTEGER PRIMARY KEY, day VARCHAR(20), start_time TIME, end_time TIME);
+        CREATE TABLE student_course (id INTEGER PRIMARY KEY, student_id INTEGER, course_id INTEGER);
+        CREATE TABLE timetable (
+            id INTEGER PRIMARY KEY, name VARCHAR(200), algorithm_used VARCHAR(50), fitness_score REAL,
+            constraint_violations INTEGER, created_by INTEGER, created_at DATETIME, data TEXT
+        );
+        CREATE TABLE optimization_job (
+            id VARCHAR(32) PRIMARY KEY, status VARCHAR(20), parameters TEXT, created_by INTEGER, created_at DATETIME
+        );
+        CREATE TABLE optimization_job_event (id INTEGER PRIMARY KEY, job_id VARCHAR(32), data TEXT);
+        CREATE TABLE timetable_entry (
+            id INTEGER PRIMARY KEY, timetable_id INTEGER, course_id INTEGER, room_id INTEGER, time_slot_id INTEGER
+        );
+        INSERT INTO optimization_job (id, status, parameters, created_by) VALUES
+            ('done', 'succeeded', '{}', 1), ('live', 'running', '{}', 1);
+    """)
+    # Events of a finished job are dropped, those of the running one kept
+    conn.executemany("INSERT INTO optimization_job_event (job_id, data) VALUES (?, '{}')",
+                     [('done',)] * 20 + [('live',)] * 3)
+    conn.executemany("INSERT INTO course (code, department) VALUES (?, ?)",
+                     [(f'C{i}', ('IT', 'ACC', 'General')[i % 3]) for i in range(30)])
+    # Two copies of one slot; only the first is kept, and what referred to the second moves to it
+    conn.executemany("INSERT INTO time_slot (day, start_time, end_time) VALUES (?, ?, ?)",
+                     [('2025-01-06', '08:00', '10:00'), ('2025-01-06', '08:00', '10:00'),
+                      ('2025-01-06', '11:00', '13:00')])
+    conn.executemany("INSERT INTO timetable_entry (timetable_id, course_id, room_id, time_slot_id) VALUES (1, ?, 2, ?)",
+                     [(course, 2 if course % 2 else 3) for course in range(10)])
+    conn.executemany("INSERT INTO student_course (student_id, course_id) VALUES (?, ?)",
+                     [(student, course) for student in range(20) for course in range(5)])
+    solution = json.dumps({'assignments': [{'course_id': 1, 'course_name': 'C1', 'room_id': 2, 'time_slot_id': 2}],
+                           'fitness': 1.0})
+    conn.executemany("INSERT INTO timetable (name, algorithm_used, fitness_score, constraint_violations, "
+                     "created_by, created_at, data) VALUES ('T', 'tabu', 1.0, 0, 1, '2025-01-01', ?)",
+                     [(solution,)] * 24 + [('not a solution',)])
+    conn.commit()
+    conn.close()
+    return path
+
+def test_migrations():
+    """Pending migrations are applied once, in order, with batched backfills and the hot-path indexes"""
+    path = build_database()
+    applied = migrate.migrate(path, batch_size=7)
+    assert applied == [version for version, _, _ in migrate.MIGRATIONS]
+
+    conn = sqlite3.connect(path)
+    m = migrate.Migration(conn)
+    assert {'timetable_entry', 'schema_migrations'} <= m.tables()
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    # Columns added and backfilled in batches smaller than the tables
+    assert {'seed', 'updated_at'} <= set(m.columns('timetable'))
+    assert conn.execute("SELECT COUNT(*) FROM timetable WHERE updated_at IS NULL").fetchone()[0] == 0
+    programs = dict(conn.execute("SELECT department, MIN(program) FROM course GROUP BY department"))
+    assert programs == {'IT': 'Software Engineering', 'ACC': 'Bachelor of Accountancy', 'General': 'General Studies'}
+    assert conn.execute("SELECT id FROM time_slot ORDER BY id").fetchall() == [(1,), (3,)]
+    assert conn.execute("SELECT time_slot_id, COUNT(*) FROM timetable_entry GROUP BY time_slot_id").fetchall() == \
+        [(1, 5), (3, 5)]
+    assert conn.execute("SELECT job_id, COUNT(*) FROM optimization_job_event GROUP BY job_id").fetchall() == \
+        [('live', 3)]
+
+    # Solutions converted from JSON to the binary format; unreadable rows are kept
+    kinds = dict(conn.execute("SELECT typeof(data), COUNT(*) FROM timetable GROUP BY typeof(data)"))
+    assert kinds == {'blob': 24, 'text': 1}
+    stored = timetable_codec.decode(conn.execute("SELECT data FROM timetable WHERE id = 1").fetchone()[0])
+    assert stored['fitness'] == 1.0 and stored['assignments'] == [{'course_id': 1, 'room_id': 2, 'time_slot_id': 1}]
+
+    # Indexes of the hot lookups, skipped where this database lacks the table
+    indexes = {name for table in m.tables() for name in m.indexes(table)}
+    assert {'ix_timetable_entry_timetable_slot', 'ix_student_course_student_course',
+            'ix_student_course_course_student', 'ix_timetable_created_by_created_at',
+            'ix_timetable_created_at', 'uq_time_slot_day_start'} <= indexes
+    assert 'ix_time_slot_day_start' not in indexes  # the unique index covers it
+    assert 'ix_optimization_job_status_priority' in indexes
+    assert 'ix_elite_solution_fingerprint_cost' not in indexes
+
+    # The plans now search the indexes instead of scanning the tables
+    plans = migrate.query_plans(conn)
+    assert 'USING INDEX ix_timetable_entry_timetable_slot' in plans['Entries of a timetable']
+    assert 'ix_student_course_student_course' in plans['Courses of a student']
+    assert 'ix_student_course_course_student' in plans['Students of a course']
+    assert 'ix_timetable_created_by_created_at' in plans['Timetables of a user']
+    assert 'ix_optimization_job_status_priority' in plans['Next queued job']
+    assert plans['Elite solutions'] is None
+    conn.close()
+
+    # Every version is recorded, so a second run changes nothing
+    assert migrate.migrate(path) == []
+    print("✅ Migrations are applied once, with batched backfills and hot-path indexes")
+
+def test_upgrade():
+    """Applications bring an existing database up to date when they start"""
+    path = build_database()
+    application = Flask(__name__)
+    application.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    db = SQLAlchemy(application)
+    with application.app_context():
+        assert migrate.upgrade(db) == [version for version, _, _ in migrate.MIGRATIONS]
+        assert migrate.upgrade(db) == []
+    conn = sqlite3.connect(path)
+    assert {'seed', 'updated_at'} <= set(migrate.Migration(conn).columns('timetable'))
+    conn.close()
+
+if __name__ == '__main__':
+    print("Testing schema migrations...")
+    print("=" * 50)
+    test_migrations()
+    test_upgrade()
@@ -35,6 +35,7 @@ def test_routes():
             ('/rooms', 'Rooms'),
             ('/constraints', 'Constraints'),
             ('/timetables', 'Timetables'),
+            ('/api/timetables', 'Timetables API'),
             ('/profile', 'Profile'),
             ('/settings', 'Settings'),
         ]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for cached problem snapshots
+"""
+
+from datetime import time
+import pytest
+from problem_snapshot import ProblemSnapshot, SnapshotCache, CourseRow
+from simple_app import db, snapshot_cache, Course, Room, TimeSlot, Constraint, ProblemVersion
+
+def add_problem(app):
+    """Three courses, two rooms, three exam days and one active constraint"""
+    with app.app_context():
+        db.session.add_all([Course(name=f'Course {i}', code=f'C{i}', students=10 * i) for i in range(1, 4)])
+        db.session.add_all([Room(name='Hall', capacity=100), Room(name='Lab', capacity=30)])
+        db.session.add_all([TimeSlot(day=day, start_time=time(8), end_time=time(10))
+                            for day in ('2025-01-06', '2025-01-07', '2025-01-08')])
+        db.session.add_all([Constraint(name='Rooms', constraint_type='hard', description='No double booking'),
+                            Constraint(name='Gaps', constraint_type='soft', description='Spread exams',
+                                       is_active=False)])
+        db.session.commit()
+
+def test_problem_snapshot(app):
+    """Snapshots hold plain records, are reused until the data changes, and notice writes of other processes"""
+    add_problem(app)
+    models = (Course, Room, TimeSlot, Constraint)
+    days = ('2025-01-06', '2025-01-07')
+    # The application's cache watches the models
+    cache = snapshot_cache
+    # A second process: same database, its own cache, no writes of its own
+    other = SnapshotCache(ProblemVersion)
+
+    with app.app_context():
+        builds = []
+        def build():
+            builds.append(1)
+            return ProblemSnapshot.from_database(db, *models, days)
+
+        snapshot = cache.get(db, days, build)
+        assert all(isinstance(course, CourseRow) for course in snapshot.courses)
+        assert snapshot.course_students.tolist() == [10, 20, 30]
+        assert snapshot.room_capacities.tolist() == [100, 30]
+        assert [slot.day for slot in snapshot.time_slots] == list(days)
+        assert [constraint.constraint_type for constraint in snapshot.constraints] == ['hard']
+        assert snapshot.course_index[snapshot.courses[2].id] == 2
+        assert snapshot.problem() is snapshot.problem() and snapshot.problem().n_slots == 2
+
+        # Repeat loads are served from the cache, here and in the other process
+        assert cache.get(db, days, build) is snapshot and len(builds) == 1
+        remote = other.get(db, days, build)
+        assert other.get(db, days, build) is remote and len(builds) == 2
+
+        # An ORM write invalidates both caches and changes the content address
+        db.session.get(Room, 2).capacity = 40
+        db.session.commit()
+        updated = cache.get(db, days, build)
+        assert updated is not snapshot and updated.room_capacities.tolist() == [100, 40]
+        assert updated.digest != snapshot.digest
+        assert other.get(db, days, build).room_capacities.tolist() == [100, 40]
+
+        # Writes outside the ORM are announced explicitly
+        current = other.get(db, days, build)
+        cache.invalidate(db)
+        assert other.get(db, days, build) is not current
+    print("✅ Problem snapshots are cached and invalidated on writes")
+
+def test_app_problem_snapshot(legacy_app):
+    """app.py reads courses, rooms, all slots and enrollments through its snapshot cache and the shared tier"""
+    import app as application
+    from models import Course, Room, TimeSlot, Student, StudentCourse, ProblemVersion
+
+    with legacy_app.app_context():
+        db = application.db
+        db.session.add_all([Course(name=f'Course {i}', code=f'C{i}', students=10) for i in range(1, 4)])
+        db.session.add(Room(name='Hall', capacity=100))
+        db.session.add_all([TimeSlot(day=day, start_time=time(8), end_time=time(10)) for day in ('Monday', 'Tuesday')])
+        db.session.add(Student(student_id='S1', name='Student', email='s1@example.com'))
+        db.session.commit()
+        parameters = {'algorithm': 'tabu', 'seed': 1}
+
+        snapshot = application.problem_snapshot()
+        assert application.problem_snapshot() is snapshot
+        # Published to the shared tier, where the other workers of the deployment find it
+        worker = SnapshotCache(ProblemVersion, shared=application.snapshot_cache.cache.shared)
+        assert worker.get(db, 'all', lambda: None).digest == snapshot.digest
+        assert [slot.day for slot in snapshot.time_slots] == ['Monday', 'Tuesday'] and snapshot.enrollments == {}
+        key = application.optimization_request_key(parameters, explicit_seed=False)
+        assert application.optimization_request_key(parameters, explicit_seed=False) == key
+
+        # Enrollments are part of the problem: a new one changes the snapshot and the request key
+        db.session.add_all([StudentCourse(student_id=1, course_id=1), StudentCourse(student_id=1, course_id=2)])
+        db.session.commit()
+        updated = application.problem_snapshot()
+        assert updated is not snapshot and updated.enrollments == {1: {1}, 2: {1}}
+        assert application.optimization_request_key(parameters, explicit_seed=False) != key
+    print("✅ app.py optimization runs read cached problem snapshots")
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main(['-q', '-s', __file__]))
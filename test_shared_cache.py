@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the two-tier cache
+"""
+
+import tempfile
+import time
+import numpy as np
+import shared_cache
+from shared_cache import MemoryCache, FileCache, SignedTier, TieredCache
+
+planted_calls = []
+
+def plant():
+    """Code a planted cache entry would run when unpickled"""
+    planted_calls.append(1)
+
+class Planted:
+    def __reduce__(self):
+        return (plant, ())
+
+def test_shared_cache():
+    """LRU eviction, TTLs, binary round trips and sharing through the file-backed tier"""
+    local = MemoryCache(maxsize=2)
+    local.set('a', 1)
+    local.set('b', 2)
+    local.get('a')
+    local.set('c', 3)
+    assert local.get('b') is None and local.get('a') == 1 and local.get('c') == 3
+    local.set('short', 4, ttl=0.05)
+    time.sleep(0.1)
+    assert local.get('short') is None
+
+    # Two workers: separate local tiers, one shared directory
+    directory = tempfile.mkdtemp()
+    first = TieredCache(MemoryCache(), shared_cache.shared_tier('file://' + directory, 'secret'), namespace='test')
+    second = TieredCache(MemoryCache(), SignedTier(FileCache(directory), 'secret'), namespace='test')
+    value = {'ids': np.arange(1000, dtype=np.int64), 'name': 'snapshot'}
+    computed = []
+    def compute():
+        computed.append(1)
+        return value
+
+    key = first.key(7, 'window')
+    assert key == f'test:f{shared_cache.FORMAT}:7:window'
+    assert first.get_or_compute(key, compute) is value
+    copy = second.get_or_compute(key, compute)
+    assert len(computed) == 1 and np.array_equal(copy['ids'], value['ids']) and copy['ids'].dtype == np.int64
+    assert second.get(key) is copy  # promoted to the local tier
+
+    # Versioned keys never meet, expired shared entries are misses
+    assert second.get(first.key(8, 'window')) is None
+    first.set('expiring', 1, ttl=0.05)
+    time.sleep(0.1)
+    assert TieredCache(MemoryCache(), SignedTier(FileCache(directory), 'secret')).get('expiring') is None
+
+    # A corrupt shared entry is only a miss
+    SignedTier(FileCache(directory), 'secret').set('broken', b'not a cached value')
+    assert TieredCache(MemoryCache(), SignedTier(FileCache(directory), 'secret')).get('broken', 'miss') == 'miss'
+
+    # Entries not signed with the secret key never reach pickle
+    FileCache(directory).set('planted', shared_cache.encode(Planted()))
+    SignedTier(FileCache(directory), 'other secret').set('forged', shared_cache.encode(Planted()))
+    FileCache(directory).set('moved', FileCache(directory).get(key))
+    reader = TieredCache(MemoryCache(), SignedTier(FileCache(directory), 'secret'))
+    assert [reader.get(name, 'miss') for name in ('planted', 'forged', 'moved')] == ['miss'] * 3
+    assert not planted_calls and reader.get(key)['name'] == 'snapshot'
+    shared_cache.decode(shared_cache.encode(Planted()))
+    assert planted_calls  # what the signature check kept from running
+    for secret in ('', 'dev-secret-key-change-in-production', 'your-secret-key-here'):
+        try:
+            shared_cache.shared_tier('file://' + directory, secret)
+            assert False, 'a shared tier without a secret key of its own must be refused'
+        except ValueError:
+            pass
+    print("✅ Two-tier cache shares signed values between workers")
+
+if __name__ == '__main__':
+    print("Testing shared cache...")
+    print("=" * 50)
+    test_shared_cache()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the binary timetable storage format
+"""
+
+import json
+import time
+import pytest
+import timetable_codec
+
+def engine_solution(size):
+    """Solution dict as the engines return it, with names and times copied into every assignment"""
+    return {
+        'assignments': [{
+            'course_id': i + 1, 'course_name': f'Course {i + 1}', 'room_id': i % 12 + 1,
+            'room_name': f'Lecture Hall {i % 12 + 1}', 'time_slot_id': i % 28 + 1, 'day': '2025-06-09',
+            'start_time': '08:00:00', 'end_time': '10:00:00', 'students': 40 + i % 90, 'duration': 120,
+        } for i in range(size)],
+        'fitness': 1250.5,
+        'constraint_violations': 0,
+        'progress': {'stopped_by': 'completed', 'iterations_completed': 300},
+    }
+
+def test_timetable_codec(legacy_app):
+    """Solutions round-trip through the compact format, and legacy JSON rows read the same way"""
+    solution = engine_solution(1000)
+    legacy = json.dumps(solution)
+    blob = timetable_codec.encode(solution)
+    assert timetable_codec.is_encoded(blob) and not timetable_codec.is_encoded(legacy)
+    assert len(legacy) > 10 * len(blob), (len(legacy), len(blob))
+
+    stored = timetable_codec.decode(blob)
+    assert stored['fitness'] == 1250.5 and stored['progress']['stopped_by'] == 'completed'
+    assert 'assignments' in stored and 'schedule' not in stored
+    assert stored['assignments'][3] == {'course_id': 4, 'room_id': 4, 'time_slot_id': 4}
+    course_ids, room_ids, slot_ids = timetable_codec.assignment_ids(stored)
+    assert course_ids.tolist() == list(range(1, 1001)) and not course_ids.flags.writeable
+
+    # Old rows and exports listing a 'schedule' give the same ids
+    for old in (legacy, legacy.encode(), json.dumps({'schedule': solution['assignments']})):
+        ids = timetable_codec.assignment_ids(timetable_codec.decode(old))
+        assert [array.tolist() for array in ids] == [course_ids.tolist(), room_ids.tolist(), slot_ids.tolist()]
+    assert timetable_codec.decode(None) == {}
+    assert timetable_codec.decode(timetable_codec.encode(stored)) == stored
+
+    # Reading the assignments is much cheaper than parsing the JSON text
+    started = time.perf_counter()
+    for _ in range(20):
+        json.loads(legacy)['assignments']
+    parse_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(20):
+        timetable_codec.assignment_ids(timetable_codec.decode(blob))
+    decode_time = time.perf_counter() - started
+    print(f"   {len(legacy)} -> {len(blob)} bytes, {parse_time * 50:.2f} -> {decode_time * 50:.2f} ms per read")
+    assert decode_time < parse_time
+
+    # Newer formats are refused rather than misread
+    try:
+        timetable_codec.decode(blob[:3] + bytes([timetable_codec.FORMAT + 1]) + blob[4:])
+        assert False, 'a newer format must not decode'
+    except ValueError:
+        pass
+
+    # Binary and legacy text rows share one column
+    from app import db
+    from models import Timetable
+    with legacy_app.app_context():
+        db.session.add(Timetable(id=1, data=blob, algorithm_used='tabu', created_by=1))
+        db.session.commit()
+        db.session.execute(db.text("INSERT INTO timetable (id, data, algorithm_used, created_by) "
+                                   "VALUES (2, :data, 'tabu', 1)"), {'data': legacy})
+        db.session.commit()
+        new, old = db.session.get(Timetable, 1), db.session.get(Timetable, 2)
+        assert isinstance(old.data, str) and timetable_codec.decode(old.data) == solution
+        assert timetable_codec.decode(new.data)['assignments'] == [
+            {key: entry[key] for key in ('course_id', 'room_id', 'time_slot_id')} for entry in solution['assignments']]
+    print("✅ Timetables are stored compactly and old JSON rows still read")
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main(['-q', '-s', __file__]))
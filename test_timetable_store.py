@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk persistence of timetable entries
+"""
+
+import time
+import numpy as np
+import pytest
+import timetable_store
+from simple_app import db, TimetableEntry
+
+def test_timetable_store(app):
+    """Dict and array solutions are written in bulk and replaced per timetable"""
+    size = 5000
+    assignments = [{'course_id': i, 'room_id': i % 40, 'time_slot_id': i % 28} for i in range(size)]
+
+    with app.app_context():
+        started = time.time()
+        assert timetable_store.save_entries(db, TimetableEntry, 1, assignments) == size
+        db.session.commit()
+        elapsed = time.time() - started
+        stored = TimetableEntry.query.filter_by(timetable_id=1).order_by(TimetableEntry.course_id).all()
+        assert [(e.course_id, e.room_id, e.time_slot_id) for e in stored] == \
+            [(a['course_id'], a['room_id'], a['time_slot_id']) for a in assignments]
+
+        # numpy arrays are written as plain ints
+        courses = np.arange(10, dtype=np.int64)
+        assert timetable_store.save_arrays(db, TimetableEntry, 2, courses, courses % 3, courses % 4) == 10
+        db.session.commit()
+        assert sorted(e.room_id for e in TimetableEntry.query.filter_by(timetable_id=2)) == sorted((courses % 3).tolist())
+        try:
+            timetable_store.save_arrays(db, TimetableEntry, 2, courses, courses[:5], courses)
+            assert False, "arrays of different lengths must be rejected"
+        except ValueError:
+            pass
+
+        # Replacing touches only the given timetable
+        timetable_store.replace_entries(db, TimetableEntry, 1, assignments[:3])
+        db.session.commit()
+        assert TimetableEntry.query.filter_by(timetable_id=1).count() == 3
+        assert TimetableEntry.query.filter_by(timetable_id=2).count() == 10
+        assert timetable_store.save_entries(db, TimetableEntry, 3, []) == 0
+    print(f"✅ {size} entries saved in bulk in {elapsed * 1000:.1f} ms")
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main(['-q', '-s', __file__]))
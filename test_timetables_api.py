@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for the timetable listing: keyset pages, sparse fieldsets and revalidation
+"""
+
+from datetime import time as clock_time
+import pytest
+from simple_app import db, Timetable
+
+def add_timetables(app, user, count):
+    with app.app_context():
+        timetables = [Timetable(name=f'Timetable {i}', algorithm_used='tabu', fitness_score=float(i),
+                                constraint_violations=0, created_by=user) for i in range(count)]
+        db.session.add_all(timetables)
+        db.session.commit()
+        return [timetable.id for timetable in timetables]
+
+def test_api_timetables(app, user, client):
+    """Pages follow the keyset cursor, fields are validated, unchanged pages answer 304"""
+    ids = add_timetables(app, user, 5)
+
+    first = client.get('/api/timetables?limit=2')
+    assert first.status_code == 200
+    page = first.get_json()
+    assert [row['id'] for row in page['timetables']] == ids[::-1][:2]
+    assert page['limit'] == 2 and page['next'] and f'after={ids[3]}' in page['next']
+    assert first.headers['Link'] == f'<{page["next"]}>; rel="next"'
+
+    second = client.get(page['next']).get_json()
+    assert [row['id'] for row in second['timetables']] == ids[::-1][2:4]
+    last = client.get(second['next']).get_json()
+    assert [row['id'] for row in last['timetables']] == ids[:1] and last['next'] is None
+
+    # Sparse fieldsets: only the named columns, unknown names are refused
+    names = client.get('/api/timetables?fields=name&limit=2').get_json()
+    assert names['timetables'] == [{'name': 'Timetable 4'}, {'name': 'Timetable 3'}]
+    assert 'fields=name' in names['next']
+    refused = client.get('/api/timetables?fields=name,bogus')
+    assert refused.status_code == 400 and 'bogus' in refused.get_json()['error']
+
+    # Revalidation: the same page is a 304 until one of its rows changes
+    etag = first.headers['ETag']
+    assert etag and first.headers['Cache-Control'] == 'private, no-cache'
+    unchanged = client.get('/api/timetables?limit=2', headers={'If-None-Match': etag})
+    assert unchanged.status_code == 304 and unchanged.headers['ETag'] == etag and not unchanged.data
+    with app.app_context():
+        db.session.get(Timetable, ids[-1]).name = 'Renamed'
+        db.session.commit()
+    changed = client.get('/api/timetables?limit=2', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    assert changed.get_json()['timetables'][0]['name'] == 'Renamed'
+    print("✅ Timetable listing pages by keyset and revalidates")
+
+def test_timetables_view(app, user, client):
+    """The listing page shows one keyset page and links the next"""
+    ids = add_timetables(app, user, 3)
+    app.config['TIMETABLES_PAGE_SIZE'] = 2
+    try:
+        page = client.get('/timetables').get_data(as_text=True)
+        assert 'Timetable 2' in page and 'Timetable 1' in page and 'Timetable 0' not in page
+        assert f'after={ids[1]}' in page
+        page = client.get(f'/timetables?after={ids[1]}').get_data(as_text=True)
+        assert 'Timetable 0' in page and 'Timetable 1' not in page
+    finally:
+        app.config['TIMETABLES_PAGE_SIZE'] = 50
+
+def test_app_api_timetables(legacy_app):
+    """app.py serves the same keyset-paged, revalidated API, with entries decoded from the stored solution"""
+    import app as application
+    import timetable_codec
+    from models import Course, Room, TimeSlot, Timetable as LegacyTimetable, User
+
+    with legacy_app.app_context():
+        database = application.db
+        account = User(username='tester', email='tester@example.com')
+        account.set_password('secret')
+        database.session.add(account)
+        database.session.add(Course(name='Algebra', code='MAT101'))
+        database.session.add(Room(name='Hall', capacity=100))
+        database.session.add(TimeSlot(day='Monday', start_time=clock_time(8), end_time=clock_time(10)))
+        database.session.commit()
+        solution = timetable_codec.encode({'assignments': [{'course_id': 1, 'room_id': 1, 'time_slot_id': 1}]})
+        database.session.add_all([LegacyTimetable(name=f'Timetable {i}', data=solution, algorithm_used='tabu',
+                                                  created_by=account.id) for i in range(3)])
+        database.session.commit()
+
+    client = legacy_app.test_client()
+    client.post('/login', data={'email': 'tester@example.com', 'password': 'secret'})
+    first = client.get('/api/timetables?limit=2&fields=name,status')
+    page = first.get_json()
+    assert page['timetables'] == [{'name': 'Timetable 2', 'status': 'Generated'},
+                                  {'name': 'Timetable 1', 'status': 'Generated'}]
+    assert client.get(page['next']).get_json()['timetables'] == [{'name': 'Timetable 0', 'status': 'Generated'}]
+    assert client.get('/api/timetables?fields=data').status_code == 400  # the solution is not a listed field
+    assert client.get('/api/timetables?limit=2&fields=name,status',
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    detail = client.get('/api/timetables/1?include=entries')
+    assert detail.get_json()['entries'] == [{
+        'course_id': 1, 'course_code': 'MAT101', 'course_name': 'Algebra', 'room_id': 1, 'room_name': 'Hall',
+        'time_slot_id': 1, 'day': 'Monday', 'start_time': '08:00', 'end_time': '10:00'}]
+    assert client.get('/api/timetables/1?include=entries',
+                      headers={'If-None-Match': detail.headers['ETag']}).status_code == 304
+    with legacy_app.app_context():
+        application.db.session.get(Room, 1).name = 'Main hall'  # entries show room names
+        application.db.session.commit()
+    changed = client.get('/api/timetables/1?include=entries', headers={'If-None-Match': detail.headers['ETag']})
+    assert changed.status_code == 200 and changed.get_json()['entries'][0]['room_name'] == 'Main hall'
+    assert client.get('/api/timetables/99').status_code == 404
+    print("✅ app.py serves the timetable API")
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main(['-q', '-s', __file__]))
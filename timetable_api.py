@@ -0,0 +1,92 @@
+"""
+Timetable API helpers shared by both applications: keyset pages of
+column-only rows, sparse fieldsets (?fields=) and strong entity tags, so
+clients revalidating an unchanged list or timetable get a 304 without a
+body.
+
+Functions take the application's db and Timetable model, since each
+application defines its own.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from flask import Response, jsonify, request, url_for
+
+MAX_PAGE_SIZE = 200  # rows of one API page
+
+def timetable_page(db, model, after=None, limit=50, fields=('name',)):
+    """
+    One page of timetables, newest first, by keyset: the rows with an id below
+    the cursor (the last id of the previous page). Only the requested columns
+    are read. Returns the rows and the cursor of the next page, or None.
+    """
+    columns = [getattr(model, name) for name in dict.fromkeys(('id', 'updated_at') + tuple(fields))]
+    query = db.session.query(*columns).order_by(model.id.desc())
+    if after is not None:
+        query = query.filter(model.id < after)
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], rows[limit - 1].id if len(rows) > limit else None
+
+def strong_etag(*parts):
+    """Strong entity tag of a representation built from the given parts"""
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()[:32]
+
+def not_modified(etag):
+    """304 response when the client's If-None-Match already holds etag, else None"""
+    if request.if_none_match.contains_weak(etag) or request.if_none_match.star_tag:
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return None
+
+def cached_response(response, etag):
+    """Attach the entity tag; clients revalidate every time, which costs a 304 while nothing changed"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def requested_fields(available):
+    """Sparse fieldset of ?fields=a,b (all available fields when absent); ValueError for unknown names"""
+    fields = [name for name in request.args.get('fields', '').split(',') if name]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}")
+    return tuple(fields) or tuple(available)
+
+def field_value(row, name):
+    """JSON value of a timetable column"""
+    value = getattr(row, name)
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def list_response(db, model, available, page_size):
+    """
+    JSON list of timetables for the current request: ?limit= (1-200) rows per
+    page, ?after= the cursor of the next page (given in 'next' and the Link
+    header), ?fields= a subset of available. A 400 for bad parameters, a 304
+    when the client holds the page already.
+    """
+    try:
+        fields = requested_fields(available)
+        limit = min(max(int(request.args.get('limit', page_size)), 1), MAX_PAGE_SIZE)
+        after = request.args.get('after', type=int)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    rows, next_after = timetable_page(db, model, after, limit, fields)
+    etag = strong_etag('list', fields, limit, after, [(row.id, row.updated_at) for row in rows])
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+
+    next_url = url_for(request.endpoint, after=next_after, limit=limit,
+                       fields=request.args.get('fields') or None) if next_after is not None else None
+    response = jsonify({
+        'timetables': [{name: field_value(row, name) for name in fields} for row in rows],
+        'next': next_url,
+        'limit': limit
+    })
+    if next_url:
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return cached_response(response, etag)
@@ -0,0 +1,111 @@
+"""
+Compact binary storage of a timetable solution (``Timetable.data``).
+
+A solution is stored as three integer arrays, the course, room and time
+slot id of every assignment, plus its metadata (fitness, violations,
+progress report, ...). The names, times, student counts and durations the
+engines copy into each assignment are left out; they are read from the
+referenced rows when the timetable is shown or exported.
+
+Layout: a fixed header (magic, format version, number of assignments,
+metadata length) followed by a zlib-compressed body holding the metadata as
+compact JSON and the three arrays as little-endian int64. Decoding is lazy:
+the body is decompressed on first access, the arrays are views into it and
+the metadata is parsed only when a metadata key is read.
+
+Rows written before this format hold the solution as JSON text; ``decode``
+returns those as plain dicts, so old and new rows read the same way.
+"""
+
+import json
+import struct
+import zlib
+from collections.abc import Mapping
+import numpy as np
+
+MAGIC = b'TTB'
+FORMAT = 1  # bump when the layout changes; older versions stay readable
+_HEADER = struct.Struct('<3sBII')  # magic, format, assignments, metadata bytes
+_IDS = np.dtype('<i8')
+_DERIVED = ('assignments', 'schedule')  # rebuilt from the id arrays
+
+def assignment_ids(solution):
+    """Course, room and time slot id arrays of a stored or dictionary solution"""
+    if isinstance(solution, StoredTimetable):
+        return solution.arrays()
+    # Engine solutions list 'assignments'; early exports used 'schedule'
+    entries = solution.get('assignments') or solution.get('schedule') or []
+    entries = [entry for entry in entries if isinstance(entry, dict)]
+    return tuple(np.array([entry.get(name) for entry in entries], dtype=np.int64)
+                 for name in ('course_id', 'room_id', 'time_slot_id'))
+
+def encode(solution):
+    """Binary form of a solution dict (or of an already decoded solution)"""
+    course_ids, room_ids, slot_ids = assignment_ids(solution)
+    metadata = {key: value for key, value in solution.items() if key not in _DERIVED}
+    meta = json.dumps(metadata, separators=(',', ':'), default=str).encode()
+    body = meta + b''.join(np.ascontiguousarray(ids, dtype=_IDS).tobytes()
+                           for ids in (course_ids, room_ids, slot_ids))
+    return _HEADER.pack(MAGIC, FORMAT, len(course_ids), len(meta)) + zlib.compress(body, 6)
+
+def decode(value):
+    """Solution stored in Timetable.data: a lazy StoredTimetable, or a dict for legacy JSON rows"""
+    if not value:
+        return {}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        value = bytes(value)
+        if value.startswith(MAGIC):
+            return StoredTimetable(value)
+        # JSON text converted to bytes with the column type
+        value = value.decode('utf-8')
+    return json.loads(value)
+
+def is_encoded(value):
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:len(MAGIC)]) == MAGIC
+
+class StoredTimetable(Mapping):
+    """
+    Read-only, lazily decoded solution. Behaves like the solution dict it was
+    encoded from, except that 'assignments' lists only the course, room and
+    time slot ids; use ``arrays()`` to read those without building dicts.
+    """
+
+    def __init__(self, blob):
+        magic, version, self.count, self.meta_length = _HEADER.unpack_from(blob)
+        if magic != MAGIC or version > FORMAT:
+            raise ValueError(f'Unsupported timetable data format {version}; this version reads up to {FORMAT}')
+        self.version = version
+        self.blob = blob
+        self._body = None
+        self._metadata = None
+
+    def body(self):
+        if self._body is None:
+            self._body = zlib.decompress(memoryview(self.blob)[_HEADER.size:])
+        return self._body
+
+    def arrays(self):
+        """Course, room and time slot ids of the assignments, as read-only int64 arrays"""
+        ids = np.frombuffer(self.body(), dtype=_IDS, count=3 * self.count, offset=self.meta_length)
+        return ids[:self.count], ids[self.count:2 * self.count], ids[2 * self.count:]
+
+    def metadata(self):
+        if self._metadata is None:
+            self._metadata = json.loads(self.body()[:self.meta_length])
+        return self._metadata
+
+    def __len__(self):
+        return len(self.metadata()) + 1
+
+    def __iter__(self):
+        yield 'assignments'
+        yield from self.metadata()
+
+    def __contains__(self, key):
+        return key == 'assignments' or key in self.metadata()
+
+    def __getitem__(self, key):
+        if key == 'assignments':
+            return [{'course_id': course, 'room_id': room, 'time_slot_id': slot}
+                    for course, room, slot in zip(*(ids.tolist() for ids in self.arrays()))]
+        return self.metadata()[key]
@@ -0,0 +1,72 @@
+"""
+Bulk persistence of timetable entries.
+
+A solution is written as one multi-row statement instead of one ORM object
+per exam: the rows go straight to the entry table through a Core INSERT
+executed with executemany, or through COPY when the database is PostgreSQL
+under psycopg2. Nothing is loaded into the session identity map, so saving
+thousands of entries costs a single round trip. Solutions held as parallel
+id arrays (numpy or plain sequences) are written without building any
+per-entry dictionaries on the caller's side.
+"""
+
+import csv
+import io
+from sqlalchemy import delete, insert
+
+def entry_rows(timetable_id, assignments):
+    """Insert parameters of the assignments ({'course_id', 'room_id', 'time_slot_id'} dicts)"""
+    return [{'timetable_id': timetable_id,
+             'course_id': assignment['course_id'],
+             'room_id': assignment['room_id'],
+             'time_slot_id': assignment['time_slot_id']} for assignment in assignments]
+
+def save_entries(db, entry_model, timetable_id, assignments):
+    """Write the assignments of a timetable in one bulk statement; returns how many were written"""
+    return _write(db, entry_model, entry_rows(timetable_id, assignments))
+
+def save_arrays(db, entry_model, timetable_id, course_ids, room_ids, slot_ids):
+    """
+    Write a solution given as parallel arrays: entry i places course_ids[i]
+    in room_ids[i] at slot_ids[i]. numpy integer arrays are converted in one
+    pass with tolist(), which yields plain ints the drivers accept.
+    """
+    columns = [ids.tolist() if hasattr(ids, 'tolist') else list(ids)
+               for ids in (course_ids, room_ids, slot_ids)]
+    if len({len(column) for column in columns}) > 1:
+        raise ValueError("course, room and time slot arrays must have the same length")
+    rows = [{'timetable_id': timetable_id, 'course_id': course, 'room_id': room, 'time_slot_id': slot}
+            for course, room, slot in zip(*columns)]
+    return _write(db, entry_model, rows)
+
+def replace_entries(db, entry_model, timetable_id, assignments):
+    """Replace all entries of a timetable, one DELETE and one bulk INSERT"""
+    db.session.execute(delete(entry_model).where(entry_model.timetable_id == timetable_id))
+    return save_entries(db, entry_model, timetable_id, assignments)
+
+def _write(db, entry_model, rows):
+    """Bulk insert of the rows within the session's transaction; the caller commits"""
+    if not rows:
+        return 0
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql' and _copy(connection, entry_model.__table__, rows):
+        return len(rows)
+    # Core insert: executemany (batched by insertmanyvalues), no ORM objects or identity map
+    connection.execute(insert(entry_model.__table__), rows)
+    return len(rows)
+
+def _copy(connection, table, rows):
+    """COPY the rows in under psycopg2; False when the driver cannot, so the caller inserts instead"""
+    cursor = connection.connection.cursor()
+    try:
+        if not hasattr(cursor, 'copy_expert'):
+            return False
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([row[column] for column in columns] for row in rows)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH CSV", buffer)
+        return True
+    finally:
+        cursor.close()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Offline hyperparameter tuning script. Races parameter configurations of each
+algorithm on synthetic instance classes with successive halving and writes the
+winning profiles to algorithms/tuning_profiles.json, where the web application
+picks them up when the "auto" parameter profile is selected.
+"""
+
+from benchmark import build_instance
+from algorithms.tuning import tune, save_profiles, instance_features, instance_class, PROFILES_PATH
+
+# Tuning instances: (courses, rooms, exam days), two seeds each
+TUNING_INSTANCES = [
+    (25, 4, 7),
+    (30, 4, 5),
+    (80, 8, 21),
+    (80, 8, 7),
+    (200, 15, 10),
+]
+
+ALGORITHMS = ['genetic', 'simulated_annealing', 'hybrid', 'memetic']
+
+if __name__ == '__main__':
+    instances = [build_instance(num_courses, num_rooms, num_days, seed)
+                 for num_courses, num_rooms, num_days in TUNING_INSTANCES
+                 for seed in (1, 2)]
+
+    print("Tuning optimization algorithms...")
+    print("=" * 70)
+    for instance in instances[::2]:
+        features = instance_features(*instance)
+        print(f"{instance_class(features):<24}{features}")
+
+    profiles = tune(ALGORITHMS, instances)
+    save_profiles(profiles)
+
+    print("=" * 70)
+    for algorithm, classes in profiles.items():
+        for key, profile in classes.items():
+            print(f"{algorithm:<22}{key:<24}{profile['fitness']:>12.1f}  {profile['parameters']}")
+    print(f"Profiles written to {PROFILES_PATH}")
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Optimization job worker pool. Runs the optimization jobs queued by POST
+/optimize outside the web server, so long runs are not killed by gunicorn's
+request timeout:
+
+    python worker.py --workers 2
+    python worker.py --app app --workers 4
+"""
+
+import argparse
+import importlib
+import signal
+import sys
+import migrate
+from jobs import start_workers
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run queued optimization jobs')
+    parser.add_argument('--workers', type=int, default=2, help='number of worker processes')
+    parser.add_argument('--app', default='simple_app', help='application module defining job_worker')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds between polls of an empty queue')
+    args = parser.parse_args()
+
+    application = importlib.import_module(args.app)
+    # Tables and pending migrations, before any job reads the database
+    with application.app.app_context():
+        migrate.upgrade(application.db)
+
+    # Stop the worker processes too when the pool is stopped (atexit does not run on a bare SIGTERM)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    print(f"Starting {args.workers} optimization workers for {args.app}...")
+    for process in start_workers(application.job_worker, args.workers, poll_interval=args.poll_interval):
+        process.join()